@@ -0,0 +1,516 @@
+"""Cálculo y mantenimiento de balances de cuentas.
+
+Hay cuatro formas (motores) de obtener el balance de una cuenta:
+
+- `annotate_balance` ("subquery"): lo deriva de todos los registros con cuatro
+  subqueries correlacionadas por cuenta. Es la fuente de verdad, pero su costo
+  crece con el historial de cada usuario.
+- `annotate_balance_conditional` ("conditional"): el mismo cálculo en una sola
+  subquery correlacionada por cuenta, que suma un `UNION ALL` de los tramos de
+  cada FK (cada uno con su signo y su índice).
+- `annotate_balance_checkpoint` ("checkpoint"): parte del último
+  `BalanceCheckpoint` de la cuenta (balance a un cierre de período) y solo
+  suma los registros posteriores.
+- `with_stored_balance` ("ledger"): lee el balance materializado en
+  `AccountBalance`, que se actualiza con deltas en la misma transacción de
+  cada escritura de `Record`.
+
+`balance_queryset` aplica el motor elegido en `settings.BALANCE_ENGINE`.
+"""
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DecimalField,
+    Expression,
+    ExpressionWrapper,
+    F,
+    Func,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
+
+from currencies.rates import RATE_FIELD, rate_expression
+from users.versions import bump_data_version
+
+from .cache import invalidate_account_lists
+from .models import Account, AccountBalance, BalanceCheckpoint
+
+# Constantes para el cálculo de balance
+AMOUNT_FIELD = DecimalField(max_digits=15, decimal_places=2)
+ZERO_DECIMAL = Value(0, output_field=AMOUNT_FIELD)
+
+# Fecha anterior a cualquier registro (cuentas sin checkpoint)
+BEGINNING = datetime.datetime(1, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Tipos de registro que restan del balance de `account`
+OUTFLOW_TYPES = ("expense", "investment")
+
+
+def _subquery_income():
+    """Subquery para sumar ingresos de una cuenta."""
+    from records.models import Record
+
+    return Subquery(
+        Record.objects.filter(
+            account=OuterRef("pk"),
+            typeRecord="income",
+        )
+        .values("account")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+
+
+def _subquery_expenses_and_investments():
+    """Subquery para sumar gastos e inversiones de una cuenta."""
+    from records.models import Record
+
+    return Subquery(
+        Record.objects.filter(
+            account=OuterRef("pk"),
+            typeRecord__in=OUTFLOW_TYPES,
+        )
+        .values("account")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+
+
+def _subquery_transfers_received():
+    """Subquery para sumar transferencias recibidas (to_account)."""
+    from records.models import Record
+
+    return Subquery(
+        Record.objects.filter(
+            to_account=OuterRef("pk"),
+            typeRecord="transfer",
+        )
+        .values("to_account")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+
+
+def _subquery_transfers_sent():
+    """Subquery para sumar transferencias enviadas (from_account)."""
+    from records.models import Record
+
+    return Subquery(
+        Record.objects.filter(
+            from_account=OuterRef("pk"),
+            typeRecord="transfer",
+        )
+        .values("from_account")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    )
+
+
+def annotate_balance(queryset):
+    """Anota el balance calculado a un queryset de Account.
+
+    Balance = Ingresos - (Gastos + Inversiones) + Transferencias recibidas - Transferencias enviadas
+
+    Para transferencias:
+    - Las transferencias salientes (from_account) reducen el balance
+    - Las transferencias entrantes (to_account) aumentan el balance
+
+    Nota:
+    - Los registros de tipo income, expense, investment usan el campo 'account'
+    - Los registros de tipo transfer usan 'from_account' y 'to_account'
+    """
+    income = Coalesce(_subquery_income(), ZERO_DECIMAL)
+    expenses = Coalesce(_subquery_expenses_and_investments(), ZERO_DECIMAL)
+    transfers_in = Coalesce(_subquery_transfers_received(), ZERO_DECIMAL)
+    transfers_out = Coalesce(_subquery_transfers_sent(), ZERO_DECIMAL)
+
+    result = queryset.annotate(balance=income - expenses + transfers_in - transfers_out).order_by("created_at")
+    return result
+
+
+def signed_amount(account):
+    """Efecto (con signo) de cada registro sobre el balance de `account`.
+
+    `account` puede ser un PK o una referencia (`OuterRef("pk")`). Replica
+    las reglas de `annotate_balance`; los registros que no tocan la cuenta
+    valen cero.
+    """
+    return Case(
+        When(typeRecord="income", account=account, then=F("amount")),
+        When(typeRecord__in=OUTFLOW_TYPES, account=account, then=-F("amount")),
+        # Una transferencia de una cuenta a sí misma no cambia su balance
+        When(
+            typeRecord="transfer",
+            from_account=account,
+            to_account=account,
+            then=ZERO_DECIMAL,
+        ),
+        When(typeRecord="transfer", to_account=account, then=F("amount")),
+        When(typeRecord="transfer", from_account=account, then=-F("amount")),
+        default=ZERO_DECIMAL,
+        output_field=AMOUNT_FIELD,
+    )
+
+
+def touching_records(account, since=None):
+    """Filtro de los registros que pueden cambiar el balance de `account`.
+
+    Cada rama coincide con uno de los índices de `Record` (`account` +
+    `typeRecord` y los parciales de transferencias), que el planner combina
+    con un BitmapOr. Con `since` solo incluye los registros con fecha contable
+    igual o posterior; la condición va en cada rama para que sea parte del
+    range scan de su índice.
+    """
+    branches = [
+        Q(account=account, typeRecord__in=("income", *OUTFLOW_TYPES)),
+        Q(from_account=account, typeRecord="transfer"),
+        Q(to_account=account, typeRecord="transfer"),
+    ]
+    if since is not None:
+        moment = Q(GreaterThanOrEqual(Coalesce("date_time", "created_at"), since))
+        branches = [branch & moment for branch in branches]
+    return branches[0] | branches[1] | branches[2]
+
+
+def _subquery_signed_total(since=None):
+    """Subquery con la suma firmada de todos los registros que tocan una cuenta.
+
+    Filtra por cualquiera de las tres FKs y suma con `signed_amount` el efecto
+    de cada registro sobre la cuenta externa: un solo recorrido en lugar de cuatro.
+    Con `since` solo suma los registros con fecha igual o posterior.
+    """
+    from records.models import Record
+
+    account = OuterRef("pk")
+    return Subquery(
+        Record.objects.filter(touching_records(account, since))
+        .order_by()
+        # SUM sin GROUP BY: una fila con el total de todos los registros filtrados
+        .annotate(
+            total=Func(signed_amount(account), function="SUM", output_field=AMOUNT_FIELD)
+        )
+        .values("total")[:1],
+        output_field=AMOUNT_FIELD,
+    )
+
+
+# Rama del `UNION ALL` de `_leg_totals` -> FK que agrupa
+LEG_FIELDS = {"account": "account", "sent": "from_account", "received": "to_account"}
+
+
+def _leg_totals(accounts):
+    """Totales por cuenta, rama y tipo en un solo query: `UNION ALL` de tres grupos.
+
+    Cada rama agrupa por (cuenta, tipo) los registros de una FK con un
+    `SUM` simple, que PostgreSQL resuelve con un index-only scan de los
+    índices parciales de balance (incluyen `amount`); el signo se aplica al
+    sumar las filas (`_leg_sign`).
+    Devuelve filas `{"leg", "leg_type", "leg_account", "total"}`.
+    """
+    from records.models import Record
+
+    account_ids = accounts.values("pk")
+    filters = {
+        "account": Q(account__in=account_ids, typeRecord__in=("income", *OUTFLOW_TYPES)),
+        "sent": Q(from_account__in=account_ids, typeRecord="transfer"),
+        "received": Q(to_account__in=account_ids, typeRecord="transfer"),
+    }
+    legs = [
+        Record.objects.filter(condition)
+        # Las transferencias no leen `typeRecord`: ya lo fija la condición del índice
+        .values(
+            leg=Value(leg),
+            leg_type=F("typeRecord") if leg == "account" else Value("transfer"),
+            leg_account=F(LEG_FIELDS[leg]),
+        )
+        .annotate(total=Sum("amount"))
+        .order_by()
+        for leg, condition in filters.items()
+    ]
+    return legs[0].union(*legs[1:], all=True)
+
+
+def _leg_sign(leg, leg_type):
+    if leg == "account":
+        return 1 if leg_type == "income" else -1
+    return -1 if leg == "sent" else 1
+
+
+class LegSum(Expression):
+    """`(SELECT SUM(total) FROM (<tramo> UNION ALL <tramo> ...) legs)`.
+
+    Cada tramo es un queryset correlacionado (con `OuterRef`) que devuelve una
+    sola columna `total`. El ORM no puede agregar sobre un `UNION` dentro de
+    una subquery, así que la expresión compone el SQL; los tramos se resuelven
+    y compilan como cualquier `Subquery`.
+    """
+
+    def __init__(self, *legs, output_field=None):
+        super().__init__(output_field=output_field)
+        self.legs = [Subquery(leg) for leg in legs]
+
+    def get_source_expressions(self):
+        return self.legs
+
+    def set_source_expressions(self, exprs):
+        self.legs = exprs
+
+    def as_sql(self, compiler, connection):
+        parts, params = [], []
+        for leg in self.legs:
+            # Sin los paréntesis de `Subquery`: SQLite no los admite en un UNION
+            sql, leg_params = leg.query.get_compiler(connection=connection).as_sql()
+            parts.append(sql)
+            params.extend(leg_params)
+        return "(SELECT SUM(total) FROM (%s) legs)" % " UNION ALL ".join(parts), params
+
+
+def _signed_leg(condition, amount):
+    from records.models import Record
+
+    return (
+        Record.objects.filter(condition)
+        .order_by()
+        # SUM sin GROUP BY: una fila con el total del tramo
+        .annotate(total=Func(amount, function="SUM", output_field=AMOUNT_FIELD))
+        .values("total")
+    )
+
+
+def annotate_balance_conditional(queryset):
+    """Anota el mismo balance que `annotate_balance` con una sola subquery por cuenta.
+
+    La subquery suma tres tramos correlacionados (`account` con el signo según
+    el tipo, `from_account` en negativo y `to_account` en positivo), cada uno
+    un range scan de su índice de balance. El queryset sigue siendo lazy.
+    """
+    account = OuterRef("pk")
+    legs = LegSum(
+        _signed_leg(
+            Q(account=account, typeRecord__in=("income", *OUTFLOW_TYPES)),
+            Case(
+                When(typeRecord="income", then=F("amount")),
+                default=-F("amount"),
+                output_field=AMOUNT_FIELD,
+            ),
+        ),
+        _signed_leg(Q(from_account=account, typeRecord="transfer"), -F("amount")),
+        _signed_leg(Q(to_account=account, typeRecord="transfer"), F("amount")),
+        output_field=AMOUNT_FIELD,
+    )
+    return queryset.annotate(balance=Coalesce(legs, ZERO_DECIMAL)).order_by("created_at")
+
+
+def annotate_balance_checkpoint(queryset):
+    """Anota el balance como último `BalanceCheckpoint` + registros posteriores.
+
+    El costo depende de los registros desde el último cierre, no de todo el
+    historial. Sin checkpoints suma todos los registros de la cuenta.
+    """
+    latest = BalanceCheckpoint.objects.filter(account=OuterRef("pk")).order_by("-as_of")
+    return (
+        queryset.alias(
+            checkpoint_as_of=Coalesce(
+                Subquery(latest.values("as_of")[:1]), Value(BEGINNING)
+            ),
+            checkpoint_balance=Coalesce(
+                Subquery(latest.values("balance")[:1]), ZERO_DECIMAL
+            ),
+        )
+        .annotate(
+            balance=F("checkpoint_balance")
+            + Coalesce(_subquery_signed_total(since=OuterRef("checkpoint_as_of")), ZERO_DECIMAL)
+        )
+        .order_by("created_at")
+    )
+
+
+def with_stored_balance(queryset):
+    """Anota a un queryset de Account el balance materializado en `AccountBalance`.
+
+    Es una sola lectura por cuenta (LEFT JOIN), independiente del número de registros.
+    """
+    return queryset.annotate(
+        balance=Coalesce(F("ledger__balance"), ZERO_DECIMAL)
+    ).order_by("created_at")
+
+
+BALANCE_ENGINES = {
+    "ledger": with_stored_balance,
+    "subquery": annotate_balance,
+    "conditional": annotate_balance_conditional,
+    "checkpoint": annotate_balance_checkpoint,
+}
+
+
+def balance_queryset(queryset, engine=None):
+    """Anota `balance` a un queryset de Account con el motor indicado o el configurado."""
+    engine = engine or settings.BALANCE_ENGINE
+    if engine not in BALANCE_ENGINES:
+        raise ImproperlyConfigured(
+            f"BALANCE_ENGINE debe ser uno de {sorted(BALANCE_ENGINES)}, no {engine!r}."
+        )
+    return BALANCE_ENGINES[engine](queryset)
+
+
+def annotate_converted_balance(queryset, to_currency, day, to_rate):
+    """Anota `balance` y `converted_balance` (en `to_currency` con las tasas de `day`).
+
+    Las cuentas en `to_currency` usan factor 1 sin consultar tasas. Para las
+    demás, la tasa de su moneda sale de una subquery sobre `ExchangeRate` en el
+    mismo query y `to_rate` es la tasa (constante) de la moneda destino, o None
+    si no la hay. `converted_balance` es NULL si falta alguna de las dos.
+    """
+    if to_rate is None:
+        conversion = Value(None, output_field=RATE_FIELD)
+    else:
+        conversion = rate_expression("currency", Value(day)) / Value(
+            to_rate, output_field=RATE_FIELD
+        )
+    factor = Case(
+        When(currency=to_currency, then=Value(Decimal("1"), output_field=RATE_FIELD)),
+        default=conversion,
+        output_field=RATE_FIELD,
+    )
+    return balance_queryset(queryset).annotate(
+        converted_balance=ExpressionWrapper(
+            F("balance") * factor, output_field=DecimalField(max_digits=20, decimal_places=2)
+        )
+    )
+
+
+def record_deltas(record):
+    """Devuelve `{account_id: delta}` con el efecto de un registro sobre los balances.
+
+    Replica exactamente las reglas de `annotate_balance`.
+    """
+    amount = record.amount or Decimal("0")
+    if record.typeRecord == "transfer":
+        deltas = defaultdict(Decimal)
+        if record.from_account_id:
+            deltas[record.from_account_id] -= amount
+        if record.to_account_id:
+            deltas[record.to_account_id] += amount
+        return dict(deltas)
+    if not record.account_id:
+        return {}
+    if record.typeRecord == "income":
+        return {record.account_id: amount}
+    if record.typeRecord in OUTFLOW_TYPES:
+        return {record.account_id: -amount}
+    return {}
+
+
+def collect_deltas(changes):
+    """Acumula los deltas de una lista de cambios `(anterior, actual)` de registros."""
+    totals = defaultdict(Decimal)
+    for previous, current in changes:
+        if previous is not None:
+            for account_id, delta in record_deltas(previous).items():
+                totals[account_id] -= delta
+        if current is not None:
+            for account_id, delta in record_deltas(current).items():
+                totals[account_id] += delta
+    return {account_id: delta for account_id, delta in totals.items() if delta}
+
+
+def apply_deltas(deltas):
+    """Aplica deltas al balance materializado con UPDATEs atómicos.
+
+    Las cuentas se actualizan en orden de PK para que dos transacciones
+    concurrentes bloqueen las filas siempre en el mismo orden.
+    No crea filas: si falta el balance de una cuenta (p. ej. porque se está
+    borrando en cascada) el delta se ignora y `rebuild_balances` lo repara.
+    """
+    now = timezone.now()
+    for account_id in sorted(deltas):
+        AccountBalance.objects.filter(account_id=account_id).update(
+            balance=F("balance") + deltas[account_id], updated_at=now
+        )
+
+
+def compute_balances(queryset):
+    """Calcula `{account_id: balance}` para un queryset de Account.
+
+    Usa una sola pasada agrupada (`_leg_totals`) sobre los registros de esas
+    cuentas en lugar de subqueries por cuenta.
+    """
+    balances = {account_id: Decimal("0") for account_id in queryset.values_list("pk", flat=True)}
+    for row in _leg_totals(queryset):
+        if row["leg_account"] in balances:
+            balances[row["leg_account"]] += _leg_sign(row["leg"], row["leg_type"]) * (
+                row["total"] or Decimal("0")
+            )
+    return balances
+
+
+def rebuild_balances(queryset=None):
+    """Recalcula desde los registros y guarda el balance materializado de las cuentas.
+
+    Bloquea primero las filas de `AccountBalance` (en el mismo orden que
+    `apply_deltas`): una escritura de registros que ya aplicó su delta se
+    confirma antes de que se lean los registros, y las que lleguen después
+    esperan y aplican su delta sobre el balance recalculado.
+    """
+    if queryset is None:
+        queryset = Account.objects.all()
+    with transaction.atomic():
+        list(
+            AccountBalance.objects.select_for_update()
+            .filter(account__in=queryset)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        balances = compute_balances(queryset)
+        AccountBalance.objects.bulk_create(
+            [
+                AccountBalance(account_id=account_id, balance=balance)
+                for account_id, balance in balances.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["account"],
+            update_fields=["balance", "updated_at"],
+        )
+        # `bulk_create` no envía `post_save`: el listado cacheado y los ETags
+        # de los dueños se invalidan aquí
+        user_ids = set(
+            Account.objects.filter(pk__in=balances.keys()).values_list("user_id", flat=True)
+        )
+        invalidate_account_lists(user_ids)
+        bump_data_version(user_ids)
+    return len(balances)
+
+
+def find_balance_mismatches(queryset=None):
+    """Compara el balance materializado con el resultado de `annotate_balance`.
+
+    Devuelve una lista de tuplas `(account, almacenado, calculado)` con las diferencias.
+    Una cuenta sin fila en `AccountBalance` cuenta como diferencia.
+    """
+    if queryset is None:
+        queryset = Account.objects.all()
+    stored = dict(
+        AccountBalance.objects.filter(account__in=queryset).values_list(
+            "account_id", "balance"
+        )
+    )
+    mismatches = []
+    for account in annotate_balance(queryset.select_related("user")):
+        if stored.get(account.pk) != account.balance:
+            mismatches.append((account, stored.get(account.pk), account.balance))
+    return mismatches
@@ -0,0 +1,84 @@
+"""Caché del listado de cuentas (`GET /api/accounts/`) por usuario.
+
+Usa el framework de caché de Django (`ACCOUNT_LIST_CACHE`, LocMem por defecto
+o Redis si se configura `REDIS_URL`). Cada entrada guarda la lista ya
+serializada junto con la versión de datos del usuario con la que se calculó:
+
+- las señales de `Account` y `Record` (y `rebuild_balances`, que reescribe
+  `AccountBalance` sin señales) borran la entrada del usuario cuando la
+  transacción confirma;
+- al leer, una entrada con otra versión se trata como fallo, lo que cubre la
+  carrera entre una lectura lenta y una escritura concurrente.
+
+Los contadores de aciertos y fallos se guardan en la misma caché, así que con
+Redis son globales y con LocMem son por proceso.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from money.metrics import count_cache
+
+KEY_PREFIX = "accounts:list"
+STATS_KEYS = {"hits": f"{KEY_PREFIX}:stats:hits", "misses": f"{KEY_PREFIX}:stats:misses"}
+
+
+def _cache():
+    return caches[settings.ACCOUNT_LIST_CACHE]
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _count(name):
+    cache = _cache()
+    key = STATS_KEYS[name]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave expiró o fue desalojada entre `add` e `incr`
+        cache.set(key, 1, timeout=None)
+
+
+def get_account_list(user_id, version):
+    """Lista serializada de cuentas de `user_id` en `version`, o None si no está en caché."""
+    entry = _cache().get(_key(user_id))
+    if entry is not None and entry["version"] == version:
+        _count("hits")
+        count_cache("account_list", True)
+        return entry["data"]
+    _count("misses")
+    count_cache("account_list", False)
+    return None
+
+
+def set_account_list(user_id, version, data):
+    _cache().set(
+        _key(user_id),
+        {"version": version, "data": data},
+        timeout=settings.ACCOUNT_LIST_CACHE_TTL,
+    )
+
+
+def invalidate_account_lists(user_ids):
+    """Borra las entradas de los usuarios indicados al confirmar la transacción."""
+    keys = sorted({_key(user_id) for user_id in user_ids if user_id is not None})
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def cache_stats():
+    """Aciertos, fallos y tasa de aciertos del caché de listados."""
+    values = _cache().get_many(STATS_KEYS.values())
+    hits = values.get(STATS_KEYS["hits"], 0)
+    misses = values.get(STATS_KEYS["misses"], 0)
+    total = hits + misses
+    return {
+        "backend": _cache().__class__.__name__,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,161 @@
+"""Mantenimiento de `BalanceCheckpoint` (balance de cada cuenta a cada cierre de mes).
+
+- `build_checkpoints` crea los checkpoints que faltan hasta un cierre dado,
+  a partir del último checkpoint de cada cuenta: solo lee los registros
+  posteriores, agrupados por mes en la base de datos.
+- Cuando se crea, edita o borra un registro anterior a un checkpoint, el
+  receptor de `records_changed` ajusta con un delta los checkpoints
+  afectados (los de fecha posterior al registro), en la misma transacción.
+"""
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db.models import DateField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from .balances import record_deltas
+from .history import next_period
+from .models import BalanceCheckpoint
+
+
+def period_boundary(day):
+    """Primer instante de `day` en la zona horaria del proyecto."""
+    midnight = datetime.datetime.combine(day, datetime.time.min)
+    return timezone.make_aware(midnight, timezone.get_default_timezone())
+
+
+def current_month_boundary():
+    """Cierre más reciente: el inicio del mes en curso."""
+    today = timezone.localdate(timezone=timezone.get_default_timezone())
+    return period_boundary(today.replace(day=1))
+
+
+def monthly_deltas(accounts, since=None, until=None):
+    """`{account_id: {inicio_de_mes: delta}}` con los registros de `[since, until)`.
+
+    La agregación se hace en la base de datos (un query agrupado por mes,
+    tipo y cuentas); el signo de cada grupo se aplica con `record_deltas`.
+    """
+    from records.models import Record
+
+    account_ids = accounts.values("pk")
+    records = Record.objects.filter(
+        Q(account__in=account_ids)
+        | Q(from_account__in=account_ids)
+        | Q(to_account__in=account_ids)
+    ).alias(moment=Coalesce("date_time", "created_at"))
+    if since is not None:
+        records = records.filter(moment__gte=since)
+    if until is not None:
+        records = records.filter(moment__lt=until)
+    rows = (
+        records.annotate(
+            month=Trunc(
+                "moment",
+                "month",
+                output_field=DateField(),
+                tzinfo=timezone.get_default_timezone(),
+            )
+        )
+        .values("month", "typeRecord", "account_id", "from_account_id", "to_account_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    for row in rows:
+        group = SimpleNamespace(amount=row.pop("total"), **row)
+        for account_id, delta in record_deltas(group).items():
+            deltas[account_id][row["month"]] += delta
+    return deltas
+
+
+def build_checkpoints(accounts, until=None):
+    """Crea los checkpoints mensuales que faltan hasta `until` (por defecto, el mes en curso).
+
+    Cada cuenta continúa desde su último checkpoint; las cuentas sin ninguno
+    empiezan en el mes de su primer registro. Devuelve cuántos se crearon.
+    """
+    until = until or current_month_boundary()
+    tz = timezone.get_default_timezone()
+    latest = BalanceCheckpoint.objects.filter(account=OuterRef("pk")).order_by("-as_of")
+    starts = {
+        pk: (as_of, balance)
+        for pk, as_of, balance in accounts.annotate(
+            last_as_of=Subquery(latest.values("as_of")[:1]),
+            last_balance=Subquery(latest.values("balance")[:1]),
+        ).values_list("pk", "last_as_of", "last_balance")
+    }
+    if not starts:
+        return 0
+
+    # Solo hace falta leer desde el checkpoint más antiguo de los "últimos"
+    last_dates = [as_of for as_of, _ in starts.values()]
+    since = None if None in last_dates else min(last_dates)
+    deltas = monthly_deltas(accounts, since, until)
+
+    checkpoints = []
+    for account_id, (as_of, balance) in starts.items():
+        months = deltas.get(account_id, {})
+        if as_of is not None:
+            month = timezone.localtime(as_of, tz).date()
+        elif months:
+            month = min(months)
+            balance = Decimal("0")
+        else:
+            continue
+        boundary = period_boundary(next_period(month, "month"))
+        while boundary <= until:
+            balance += months.get(month, Decimal("0"))
+            checkpoints.append(
+                BalanceCheckpoint(account_id=account_id, as_of=boundary, balance=balance)
+            )
+            month = next_period(month, "month")
+            boundary = period_boundary(next_period(month, "month"))
+
+    BalanceCheckpoint.objects.bulk_create(
+        checkpoints,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["account", "as_of"],
+        update_fields=["balance"],
+    )
+    return len(checkpoints)
+
+
+def record_moment(record):
+    """Fecha contable de un registro (la misma que usan los filtros de checkpoints)."""
+    return record.date_time or record.created_at
+
+
+def collect_checkpoint_deltas(changes):
+    """Acumula `{(account_id, fecha): delta}` para una lista de cambios `(anterior, actual)`.
+
+    Un registro que cambia de fecha aporta un delta negativo en la fecha
+    anterior y uno positivo en la nueva.
+    """
+    totals = defaultdict(Decimal)
+    for previous, current in changes:
+        for record, sign in ((previous, -1), (current, 1)):
+            if record is None:
+                continue
+            moment = record_moment(record)
+            for account_id, delta in record_deltas(record).items():
+                totals[(account_id, moment)] += sign * delta
+    return {key: delta for key, delta in totals.items() if delta}
+
+
+def apply_checkpoint_deltas(deltas):
+    """Ajusta los checkpoints posteriores a cada registro con UPDATEs atómicos.
+
+    Un checkpoint incluye los registros anteriores a `as_of`, así que un
+    cambio en `moment` afecta a los de `as_of > moment`. Si el registro es
+    posterior al último checkpoint el UPDATE no toca filas.
+    """
+    for account_id, moment in sorted(deltas):
+        BalanceCheckpoint.objects.filter(account_id=account_id, as_of__gt=moment).update(
+            balance=F("balance") + deltas[(account_id, moment)]
+        )
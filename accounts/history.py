@@ -0,0 +1,110 @@
+"""Serie histórica del balance de una cuenta (balance al cierre de cada período).
+
+`balance_history` la calcula con un solo query: agrupa por período los
+registros que tocan la cuenta, suma el efecto de cada uno con
+`signed_amount` y acumula esas sumas con una función de ventana
+(`SUM(...) OVER (ORDER BY period_start)`). Los registros anteriores al rango
+se pliegan en el primer período, así que su saldo de apertura entra en la
+acumulación sin devolver filas fuera del rango.
+"""
+
+import datetime
+from decimal import Decimal
+
+from django.db.models import DateField, F, Func, Sum, Value, Window
+from django.db.models.functions import Coalesce, Greatest, Trunc
+from django.utils import timezone
+
+from reports.rollups import PERIODS, period_start
+
+from .balances import AMOUNT_FIELD, signed_amount, touching_records
+
+# Máximo de puntos de una serie (p. ej. ~2,7 años de períodos diarios)
+MAX_POINTS = 1000
+
+
+class RunningSum(Func):
+    """`SUM(...)` sobre el resultado de un agregado, para usar dentro de `Window`.
+
+    `Sum` no admite otro agregado como argumento; como función de ventana sí
+    es válido (`SUM(SUM(x)) OVER (...)`) porque se evalúa después del GROUP BY.
+    """
+
+    function = "SUM"
+    window_compatible = True
+    output_field = AMOUNT_FIELD
+
+
+def next_period(day, period):
+    """Inicio del período siguiente al que empieza en `day`."""
+    if period == "day":
+        return day + datetime.timedelta(days=1)
+    if period == "week":
+        return day + datetime.timedelta(days=7)
+    return (day + datetime.timedelta(days=31)).replace(day=1)
+
+
+def period_starts(date_from, date_to, period):
+    """Inicios de los períodos que contienen alguna fecha de `[date_from, date_to]`."""
+    day = period_start(date_from, period)
+    while day <= date_to:
+        yield day
+        day = next_period(day, period)
+
+
+def _end_of_day(day):
+    """Primer instante del día siguiente a `day` en la zona horaria del proyecto."""
+    midnight = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min)
+    return timezone.make_aware(midnight, timezone.get_default_timezone())
+
+
+def balance_history_queryset(account_id, period, date_from, date_to):
+    """Filas `{period_start, balance}` de los períodos con registros, en un solo query.
+
+    Solo incluye registros hasta el final de `date_to`; los anteriores a
+    `date_from` se agrupan en el primer período del rango.
+    """
+    from records.models import Record
+
+    first = period_start(date_from, period)
+    bucket = Greatest(
+        Trunc(
+            Coalesce("date_time", "created_at"),
+            period,
+            output_field=DateField(),
+            tzinfo=timezone.get_default_timezone(),
+        ),
+        Value(first, output_field=DateField()),
+    )
+    net = Sum(signed_amount(account_id), output_field=AMOUNT_FIELD)
+    return (
+        Record.objects.filter(touching_records(account_id))
+        .alias(moment=Coalesce("date_time", "created_at"))
+        .filter(moment__lt=_end_of_day(date_to))
+        .annotate(period_start=bucket)
+        .values("period_start")
+        # El agregado (aunque no se seleccione) es lo que agrupa por período
+        .alias(net=net)
+        .annotate(balance=Window(RunningSum(net), order_by=F("period_start").asc()))
+        .order_by("period_start")
+    )
+
+
+def balance_history(account_id, period, date_from, date_to):
+    """Balance de la cuenta al cierre de cada período de `[date_from, date_to]`.
+
+    Devuelve un punto por período, incluidos los que no tienen registros (que
+    conservan el balance del anterior).
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period debe ser uno de {PERIODS}, no {period!r}.")
+    balances = {
+        row["period_start"]: row["balance"]
+        for row in balance_history_queryset(account_id, period, date_from, date_to)
+    }
+    points = []
+    balance = Decimal("0")
+    for day in period_starts(date_from, date_to, period):
+        balance = balances.get(day, balance)
+        points.append({"period_start": day, "balance": balance})
+    return points
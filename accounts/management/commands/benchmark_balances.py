@@ -0,0 +1,130 @@
+"""Compara el tiempo de los motores de balance sobre un usuario sintético.
+
+Para cada volumen (`--records`, por defecto 10k, 100k y 1M registros por
+usuario) crea un usuario con `--accounts` cuentas y registros aleatorios de
+todos los tipos, mide cada motor de `BALANCE_ENGINES` (mediana de `--repeat`
+ejecuciones del listado de cuentas) y verifica que todos den el mismo balance.
+Todo se hace dentro de una transacción que se revierte al terminar.
+
+Los registros se insertan con `bulk_create` directo, sin emitir
+`records_changed`; el balance materializado ("ledger") se recalcula una vez
+con `rebuild_balances` y los checkpoints mensuales ("checkpoint") se crean con
+`build_checkpoints` antes de medir.
+"""
+
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.balances import BALANCE_ENGINES, balance_queryset, rebuild_balances
+from accounts.checkpoints import build_checkpoints
+from accounts.models import Account
+from currencies.registry import currency_registry
+from records.models import Record
+
+CENT = Decimal("0.01")
+TYPE_WEIGHTS = {"expense": 6, "income": 2, "transfer": 1, "investment": 1}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def generate_records(user, accounts, count, currency, seed=0):
+    """Genera `count` registros aleatorios de `user` repartidos entre `accounts`."""
+    rng = random.Random(seed)
+    types = list(TYPE_WEIGHTS)
+    weights = list(TYPE_WEIGHTS.values())
+    now = timezone.now()
+    for index in range(count):
+        record_type = rng.choices(types, weights)[0]
+        amount = Decimal(rng.randint(100, 500_000)) / 100
+        record = Record(
+            user=user,
+            title=f"bench {index}",
+            amount=amount,
+            typeRecord=record_type,
+            paymentType="cash",
+            currency_id=currency,
+            date_time=now - timezone.timedelta(minutes=index),
+        )
+        if record_type == "transfer":
+            record.from_account, record.to_account = rng.sample(accounts, 2)
+        else:
+            record.account = rng.choice(accounts)
+        yield record
+
+
+class Command(BaseCommand):
+    help = "Mide los motores de balance (ledger, subquery, conditional, checkpoint) con volúmenes sintéticos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--records",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000, 1_000_000],
+            help="Volúmenes de registros por usuario a medir.",
+        )
+        parser.add_argument("--accounts", type=int, default=8, help="Cuentas del usuario.")
+        parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones por motor.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["accounts"] < 2:
+            raise CommandError("Se necesitan al menos 2 cuentas para generar transferencias.")
+        currency = currency_registry.default_code()
+        engines = sorted(BALANCE_ENGINES)
+
+        self.stdout.write("registros  " + "  ".join(f"{engine:>12}" for engine in engines))
+        for count in options["records"]:
+            try:
+                with transaction.atomic():
+                    timings = self._measure(count, currency, engines, options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            self.stdout.write(
+                f"{count:>9}  "
+                + "  ".join(f"{timings[engine] * 1000:>10.1f}ms" for engine in engines)
+            )
+
+    def _measure(self, count, currency, engines, options):
+        User = get_user_model()
+        user = User.objects.create(username=f"benchmark-balances-{count}")
+        for index in range(options["accounts"] - 1):
+            Account.objects.create(user=user, name=f"Cuenta {index}", currency_id=currency)
+        accounts = list(Account.objects.filter(user=user))
+        Record.objects.bulk_create(
+            generate_records(user, accounts, count, currency),
+            batch_size=options["batch_size"],
+        )
+        rebuild_balances(Account.objects.filter(user=user))
+        build_checkpoints(Account.objects.filter(user=user))
+
+        timings = {}
+        results = {}
+        for engine in engines:
+            samples = []
+            for _ in range(options["repeat"]):
+                # Se mide la construcción del queryset y su evaluación
+                start = time.perf_counter()
+                queryset = balance_queryset(Account.objects.filter(user=user), engine)
+                results[engine] = {
+                    pk: balance.quantize(CENT)
+                    for pk, balance in queryset.values_list("pk", "balance")
+                }
+                samples.append(time.perf_counter() - start)
+            timings[engine] = statistics.median(samples)
+
+        reference = results["subquery"]
+        for engine, balances in results.items():
+            if balances != reference:
+                raise CommandError(f"El motor {engine!r} no coincide con 'subquery' ({count} registros).")
+        return timings
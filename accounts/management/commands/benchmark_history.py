@@ -0,0 +1,132 @@
+"""Mide la serie histórica de balance (`balance_history`) con volúmenes sintéticos.
+
+Para cada volumen (`--records`, por defecto 10k, 100k y 1M registros por
+usuario) crea un usuario con registros aleatorios (ver `benchmark_balances`),
+y para cada período compara la mediana de `--repeat` ejecuciones del query
+con función de ventana contra la alternativa de leer todos los registros de
+la cuenta y acumularlos en Python. Verifica que ambas den la misma serie.
+Todo se hace dentro de una transacción que se revierte al terminar.
+"""
+
+import statistics
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.balances import record_deltas, touching_records
+from accounts.history import MAX_POINTS, PERIODS, balance_history, period_starts
+from accounts.models import Account
+from currencies.registry import currency_registry
+from records.models import Record
+from reports.rollups import period_start
+
+from .benchmark_balances import CENT, _Rollback, generate_records
+
+
+def replay_history(account_id, period, date_from, date_to):
+    """La misma serie que `balance_history`, recorriendo los registros en Python."""
+    tz = timezone.get_default_timezone()
+    first = period_start(date_from, period)
+    net = defaultdict(Decimal)
+    records = (
+        Record.objects.filter(touching_records(account_id))
+        .annotate(moment=Coalesce("date_time", "created_at"))
+        .only("typeRecord", "amount", "account_id", "from_account_id", "to_account_id")
+    )
+    for record in records.iterator(chunk_size=5000):
+        day = timezone.localtime(record.moment, tz).date()
+        if day > date_to:
+            continue
+        bucket = max(period_start(day, period), first)
+        net[bucket] += record_deltas(record).get(account_id, Decimal("0"))
+
+    points = []
+    balance = Decimal("0")
+    for day in period_starts(date_from, date_to, period):
+        balance += net.get(day, Decimal("0"))
+        points.append({"period_start": day, "balance": balance})
+    return points
+
+
+def _quantized(points):
+    return [(point["period_start"], point["balance"].quantize(CENT)) for point in points]
+
+
+class Command(BaseCommand):
+    help = "Mide la serie histórica de balance (función de ventana vs. recorrido en Python)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--records",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000, 1_000_000],
+            help="Volúmenes de registros por usuario a medir.",
+        )
+        parser.add_argument("--accounts", type=int, default=8, help="Cuentas del usuario.")
+        parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones por variante.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["accounts"] < 2:
+            raise CommandError("Se necesitan al menos 2 cuentas para generar transferencias.")
+        currency = currency_registry.default_code()
+
+        self.stdout.write(f"registros  período  puntos  {'ventana':>12}  {'python':>12}")
+        for count in options["records"]:
+            try:
+                with transaction.atomic():
+                    rows = self._measure(count, currency, options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            for period, points, window, replay in rows:
+                self.stdout.write(
+                    f"{count:>9}  {period:>7}  {points:>6}  "
+                    f"{window * 1000:>10.1f}ms  {replay * 1000:>10.1f}ms"
+                )
+
+    def _measure(self, count, currency, options):
+        User = get_user_model()
+        user = User.objects.create(username=f"benchmark-history-{count}")
+        for index in range(options["accounts"] - 1):
+            Account.objects.create(user=user, name=f"Cuenta {index}", currency_id=currency)
+        accounts = list(Account.objects.filter(user=user))
+        Record.objects.bulk_create(
+            generate_records(user, accounts, count, currency),
+            batch_size=options["batch_size"],
+        )
+        account = accounts[0]
+        moments = Record.objects.filter(user=user).aggregate(
+            first=Coalesce(Min("date_time"), Min("created_at")),
+            last=Coalesce(Max("date_time"), Max("created_at")),
+        )
+        date_to = timezone.localtime(moments["last"], timezone.get_default_timezone()).date()
+        date_from = timezone.localtime(moments["first"], timezone.get_default_timezone()).date()
+
+        rows = []
+        for period in PERIODS:
+            # El rango se recorta a los últimos MAX_POINTS períodos
+            start = list(period_starts(date_from, date_to, period))[-MAX_POINTS:][0]
+            timings = {}
+            results = {}
+            for name, function in (("window", balance_history), ("replay", replay_history)):
+                samples = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    results[name] = function(account.pk, period, start, date_to)
+                    samples.append(time.perf_counter() - started)
+                timings[name] = statistics.median(samples)
+            if _quantized(results["window"]) != _quantized(results["replay"]):
+                raise CommandError(
+                    f"La serie por {period} no coincide con el recorrido en Python ({count} registros)."
+                )
+            rows.append((period, len(results["window"]), timings["window"], timings["replay"]))
+        return rows
@@ -0,0 +1,81 @@
+"""Crea los checkpoints mensuales de balance (pensado para un job programado).
+
+Ejecutarlo después de cada cierre de mes (p. ej. el día 1 por cron) crea
+solo los checkpoints nuevos; `--rebuild` los borra y recalcula desde cero.
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.balances import balance_queryset
+from accounts.checkpoints import build_checkpoints, current_month_boundary, period_boundary
+from accounts.models import Account, BalanceCheckpoint
+
+
+class Command(BaseCommand):
+    help = "Crea los checkpoints mensuales de balance que falten y/o los verifica."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Limitar a las cuentas de este username.")
+        parser.add_argument(
+            "--account", type=int, action="append", help="Limitar a esta cuenta (PK)."
+        )
+        parser.add_argument(
+            "--until",
+            type=datetime.date.fromisoformat,
+            help="Último cierre a crear (YYYY-MM-DD, inicio de mes). Por defecto, el mes en curso.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Borrar los checkpoints existentes antes de crearlos.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Verificar el motor 'checkpoint' contra 'subquery'; termina con error si difieren.",
+        )
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.all()
+        if options["user"]:
+            accounts = accounts.filter(user__username=options["user"])
+        if options["account"]:
+            accounts = accounts.filter(pk__in=options["account"])
+
+        until = current_month_boundary()
+        if options["until"]:
+            if options["until"].day != 1:
+                raise CommandError("--until debe ser el primer día de un mes.")
+            until = period_boundary(options["until"])
+
+        with transaction.atomic():
+            # Las escrituras de registros de estas cuentas esperan al final del
+            # cálculo: todas bloquean antes sus cuentas (ver accounts/signals.py)
+            list(
+                Account.objects.select_for_update()
+                .filter(pk__in=accounts.values("pk"))
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            if options["rebuild"]:
+                BalanceCheckpoint.objects.filter(account__in=accounts).delete()
+            count = build_checkpoints(accounts, until)
+        self.stdout.write(f"Checkpoints creados: {count}.")
+
+        if options["check"]:
+            expected = dict(balance_queryset(accounts, "subquery").values_list("pk", "balance"))
+            mismatches = [
+                (pk, balance, expected.get(pk))
+                for pk, balance in balance_queryset(accounts, "checkpoint").values_list(
+                    "pk", "balance"
+                )
+                if balance != expected.get(pk)
+            ]
+            for pk, balance, computed in mismatches:
+                self.stdout.write(f"  cuenta {pk}: checkpoint={balance} subquery={computed}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} cuentas con balance inconsistente.")
+            self.stdout.write(self.style.SUCCESS("Checkpoints consistentes."))
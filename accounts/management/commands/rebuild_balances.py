@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.balances import find_balance_mismatches, rebuild_balances
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el balance materializado de las cuentas a partir de los registros "
+        "y/o lo verifica contra annotate_balance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Solo verificar; termina con error si hay diferencias.",
+        )
+        parser.add_argument("--user", help="Limitar a las cuentas de este username.")
+        parser.add_argument(
+            "--account", type=int, action="append", help="Limitar a esta cuenta (PK)."
+        )
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.all()
+        if options["user"]:
+            accounts = accounts.filter(user__username=options["user"])
+        if options["account"]:
+            accounts = accounts.filter(pk__in=options["account"])
+
+        if not options["check"]:
+            # `rebuild_balances` bloquea los balances mientras recalcula
+            count = rebuild_balances(accounts)
+            self.stdout.write(f"Balances recalculados: {count} cuentas.")
+
+        mismatches = find_balance_mismatches(accounts)
+        for account, stored, computed in mismatches:
+            self.stdout.write(
+                f"  cuenta {account.pk} ({account}): almacenado={stored} calculado={computed}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} cuentas con balance inconsistente.")
+        self.stdout.write(self.style.SUCCESS("Balances consistentes."))
@@ -0,0 +1,59 @@
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_balances(apps, schema_editor):
+    Account = apps.get_model("accounts", "Account")
+    AccountBalance = apps.get_model("accounts", "AccountBalance")
+    Record = apps.get_model("records", "Record")
+
+    balances = defaultdict(Decimal)
+    rows = (
+        Record.objects.values("typeRecord", "account_id", "from_account_id", "to_account_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for row in rows:
+        total = row["total"] or Decimal("0")
+        if row["typeRecord"] == "transfer":
+            if row["from_account_id"]:
+                balances[row["from_account_id"]] -= total
+            if row["to_account_id"]:
+                balances[row["to_account_id"]] += total
+        elif row["account_id"]:
+            if row["typeRecord"] == "income":
+                balances[row["account_id"]] += total
+            elif row["typeRecord"] in ("expense", "investment"):
+                balances[row["account_id"]] -= total
+
+    AccountBalance.objects.bulk_create(
+        [
+            AccountBalance(account_id=pk, balance=balances.get(pk, Decimal("0")))
+            for pk in Account.objects.values_list("pk", flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_account_currency'),
+        ('records', '0006_alter_record_account'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalance',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger', serialize=False, to='accounts.account')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -3,9 +3,9 @@ from django.contrib.auth.models import User
 
 
 def get_default_currency():
-    from currencies.models import Currency
+    from currencies.registry import currency_registry
 
-    return Currency.objects.get(code="COP").code
+    return currency_registry.default_code()
 
 
 class Account(models.Model):
@@ -26,3 +26,51 @@ class Account(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.name}"
+
+
+class AccountBalance(models.Model):
+    """Balance materializado de una cuenta.
+
+    Se mantiene al día con cada escritura de `Record` (ver `accounts.balances`)
+    para que listar cuentas no tenga que recorrer todo el historial de registros.
+    """
+
+    account = models.OneToOneField(
+        Account, on_delete=models.CASCADE, primary_key=True, related_name="ledger"
+    )
+    balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.account} ({self.balance})"
+
+
+class BalanceCheckpoint(models.Model):
+    """Balance de una cuenta al cierre de un período (p. ej. fin de mes).
+
+    `balance` es la suma de los registros de la cuenta con fecha anterior a
+    `as_of` (el primer instante del período siguiente). El motor
+    "checkpoint" (ver `accounts.balances`) parte del último checkpoint y solo
+    suma los registros posteriores. Los crea `build_checkpoints` y se ajustan
+    con deltas cuando cambia un registro anterior a ellos (ver
+    `accounts.checkpoints`).
+    """
+
+    # Sin índice propio: lo cubre `balance_checkpoint_account_as_of_uniq`
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="checkpoints", db_index=False
+    )
+    as_of = models.DateTimeField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # También sirve para buscar el último checkpoint de cada cuenta
+            models.UniqueConstraint(
+                fields=["account", "as_of"], name="balance_checkpoint_account_as_of_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account} @ {self.as_of:%Y-%m-%d} ({self.balance})"
@@ -1,6 +1,11 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from .history import MAX_POINTS, PERIODS, period_starts
 from .models import Account
-from currencies.models import Currency
+from currencies.serializers import CurrencyField
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -11,7 +16,7 @@ class AccountSerializer(serializers.ModelSerializer):
     """
 
     user = serializers.ReadOnlyField(source="user.username")
-    currency = serializers.PrimaryKeyRelatedField(queryset=Currency.objects.all())
+    currency = CurrencyField()
     balance = serializers.DecimalField(
         max_digits=15, decimal_places=2, required=False, allow_null=True
     )
@@ -36,3 +41,73 @@ class AccountSerializer(serializers.ModelSerializer):
         if self.instance is not None:
             fields["currency"].read_only = True
         return fields
+
+
+class NetWorthQuerySerializer(serializers.Serializer):
+    """Parámetros del patrimonio neto: moneda destino y fecha de las tasas."""
+
+    currency = CurrencyField(required=False)
+    date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        data.setdefault("date", timezone.localdate())
+        currency = data.get("currency")
+        data["currency"] = currency.code if currency else settings.DEFAULT_CURRENCY_CODE
+        return data
+
+
+class NetWorthAccountSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    currency = serializers.CharField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+    converted_balance = serializers.DecimalField(
+        max_digits=20, decimal_places=2, allow_null=True
+    )
+
+
+class NetWorthSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    date = serializers.DateField()
+    total = serializers.DecimalField(max_digits=20, decimal_places=2)
+    accounts = NetWorthAccountSerializer(many=True)
+    missing_rates = serializers.ListField(child=serializers.CharField())
+
+
+class BalanceHistoryQuerySerializer(serializers.Serializer):
+    """Parámetros de la serie histórica de balance.
+
+    Por defecto devuelve los períodos del último año hasta hoy.
+    """
+
+    period = serializers.ChoiceField(choices=PERIODS, default="day")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        date_to = data.setdefault("date_to", timezone.localdate())
+        date_from = data.setdefault("date_from", date_to - datetime.timedelta(days=365))
+        if date_from > date_to:
+            raise serializers.ValidationError(
+                {"date_from": "Debe ser anterior o igual a date_to."}
+            )
+        points = sum(1 for _ in period_starts(date_from, date_to, data["period"]))
+        if points > MAX_POINTS:
+            raise serializers.ValidationError(
+                f"El rango pedido tiene {points} períodos; el máximo es {MAX_POINTS}."
+            )
+        return data
+
+
+class BalanceHistoryPointSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class BalanceHistorySerializer(serializers.Serializer):
+    account = serializers.IntegerField()
+    currency = serializers.CharField()
+    period = serializers.CharField()
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    results = BalanceHistoryPointSerializer(many=True)
@@ -1,20 +1,68 @@
 # accounts/signals.py
-from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Account
+from records.signals import records_changed
 
-User = get_user_model()
+from .balances import apply_deltas, collect_deltas
+from .cache import invalidate_account_lists
+from .checkpoints import apply_checkpoint_deltas, collect_checkpoint_deltas
+from .models import Account, AccountBalance
 
 
-@receiver(post_save, sender=User, weak=False)
-def create_default_account(sender, instance, created, **kwargs):
+@receiver(post_save, sender=Account, weak=False)
+def create_account_balance(sender, instance, created, **kwargs):
     if not created:
         return
-    
-    Account.objects.create(
-        user=instance,
-        name="Cash",
-        description="Cuenta de efectivo",
+
+    AccountBalance.objects.get_or_create(account=instance)
+
+
+@receiver(records_changed, weak=False)
+def lock_changed_accounts(sender, changes, **kwargs):
+    # Primero (los receptores se llaman en orden de registro): bloquea las
+    # cuentas de los registros aunque su delta de balance sea cero (p. ej. un
+    # cambio de fecha), así una escritura concurrente a `build_checkpoints`
+    # espera a que termine y ajusta los checkpoints ya creados. El orden
+    # Account -> AccountBalance es el mismo que en `perform_update`.
+    account_ids = {
+        account_id
+        for change in changes
+        for record in change
+        if record is not None
+        for account_id in (record.account_id, record.from_account_id, record.to_account_id)
+        if account_id is not None
+    }
+    if account_ids:
+        list(
+            Account.objects.select_for_update()
+            .filter(pk__in=account_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+
+@receiver(records_changed, weak=False)
+def update_account_balances(sender, changes, **kwargs):
+    apply_deltas(collect_deltas(changes))
+
+
+@receiver(records_changed, weak=False)
+def update_balance_checkpoints(sender, changes, **kwargs):
+    apply_checkpoint_deltas(collect_checkpoint_deltas(changes))
+
+
+@receiver(post_save, sender=Account, weak=False)
+@receiver(post_delete, sender=Account, weak=False)
+def invalidate_account_list_on_account(sender, instance, **kwargs):
+    invalidate_account_lists([instance.user_id])
+
+
+@receiver(records_changed, weak=False)
+def invalidate_account_list_on_records(sender, changes, **kwargs):
+    invalidate_account_lists(
+        record.user_id
+        for change in changes
+        for record in change
+        if record is not None
     )
@@ -1,3 +1,510 @@
-from django.test import TestCase
+import datetime
+import threading
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from currencies.models import Currency, ExchangeRate
+from currencies.rates import rate_cache
+from currencies.registry import currency_registry
+from records.models import Record
+
+from .balances import (
+    annotate_balance,
+    annotate_balance_conditional,
+    balance_queryset,
+    find_balance_mismatches,
+    rebuild_balances,
+)
+from .cache import cache_stats
+from .checkpoints import build_checkpoints, period_boundary
+from .models import Account, AccountBalance, BalanceCheckpoint
+
+
+class LedgerTestCase(TestCase):
+    """Usuario con dos cuentas en COP y helpers para crear registros."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("ledger", password="x")
+        cls.cash = Account.objects.create(user=cls.user, name="Caja", currency_id="COP")
+        cls.bank = Account.objects.create(user=cls.user, name="Banco", currency_id="COP")
+
+    def record(self, typeRecord="income", amount="100.00", **fields):
+        if typeRecord != "transfer":
+            fields.setdefault("account", self.cash)
+        return Record.objects.create(
+            user=self.user,
+            title=typeRecord,
+            amount=Decimal(amount),
+            typeRecord=typeRecord,
+            paymentType="cash",
+            currency_id="COP",
+            **fields,
+        )
+
+    def stored_balance(self, account):
+        return AccountBalance.objects.get(account=account).balance
+
+    def assertLedgerConsistent(self):
+        self.assertEqual(find_balance_mismatches(Account.objects.filter(user=self.user)), [])
+
+
+class RecordWriteLedgerTests(LedgerTestCase):
+    def test_stale_update_reverts_committed_state(self):
+        record = self.record(amount="100.00")
+        first = Record.objects.get(pk=record.pk)
+        second = Record.objects.get(pk=record.pk)
+        first.amount = Decimal("50.00")
+        first.save()
+        # `second` tiene en memoria el estado anterior a la primera edición
+        second.amount = Decimal("70.00")
+        second.save()
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("70.00"))
+        self.assertLedgerConsistent()
+
+    def test_second_delete_of_same_record_is_ignored(self):
+        self.record(amount="100.00")
+        record = self.record(amount="40.00")
+        first = Record.objects.get(pk=record.pk)
+        second = Record.objects.get(pk=record.pk)
+        first.delete()
+        second.delete()
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("100.00"))
+        self.assertLedgerConsistent()
+
+    def test_delete_reverts_committed_state_not_stale_instance(self):
+        record = self.record(amount="100.00")
+        stale = Record.objects.get(pk=record.pk)
+        record.amount = Decimal("30.00")
+        record.save()
+        stale.delete()
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("0.00"))
+        self.assertLedgerConsistent()
+
+
+class LedgerConsistencyTests(LedgerTestCase):
+    """El balance materializado coincide con `annotate_balance` tras cualquier escritura."""
+
+    def test_creates_of_every_type(self):
+        self.record("income", "500.00")
+        self.record("expense", "120.50")
+        self.record("investment", "80.00", account=self.bank)
+        self.record("transfer", "200.00", from_account=self.cash, to_account=self.bank)
+        self.record("transfer", "15.00", from_account=self.bank, to_account=self.bank)
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("179.50"))
+        self.assertEqual(self.stored_balance(self.bank), Decimal("120.00"))
+        self.assertLedgerConsistent()
+
+    def test_updates_that_move_records(self):
+        income = self.record("income", "500.00")
+        transfer = self.record("transfer", "200.00", from_account=self.cash, to_account=self.bank)
+
+        income.account = self.bank
+        income.typeRecord = "expense"
+        income.save()
+        transfer.from_account, transfer.to_account = self.bank, self.cash
+        transfer.amount = Decimal("50.00")
+        transfer.save()
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("50.00"))
+        self.assertEqual(self.stored_balance(self.bank), Decimal("-550.00"))
+        self.assertLedgerConsistent()
+
+    def test_deletes(self):
+        self.record("income", "500.00")
+        transfer = self.record("transfer", "200.00", from_account=self.cash, to_account=self.bank)
+        transfer.delete()
+
+        self.assertEqual(self.stored_balance(self.bank), Decimal("0.00"))
+        self.assertLedgerConsistent()
+
+    def test_rebuild_repairs_drift(self):
+        self.record("income", "500.00")
+        self.record("transfer", "200.00", from_account=self.cash, to_account=self.bank)
+        AccountBalance.objects.filter(account=self.cash).update(balance=Decimal("1.00"))
+        AccountBalance.objects.filter(account=self.bank).delete()
+        self.assertEqual(len(find_balance_mismatches(Account.objects.filter(user=self.user))), 2)
+
+        rebuild_balances(Account.objects.filter(user=self.user))
+
+        self.assertEqual(self.stored_balance(self.cash), Decimal("300.00"))
+        self.assertEqual(self.stored_balance(self.bank), Decimal("200.00"))
+        self.assertLedgerConsistent()
+
+    def test_rebuild_reads_only_the_accounts_records(self):
+        other = User.objects.create_user("other-ledger", password="x")
+        other_account = Account.objects.create(user=other, name="Otra", currency_id="COP")
+        self.record("income", "500.00")
+        self.record("income", "70.00", account=other_account)
+
+        with CaptureQueriesContext(connection) as queries:
+            rebuild_balances(Account.objects.filter(pk=self.cash.pk))
+        record_queries = [q["sql"] for q in queries if "records_record" in q["sql"]]
+        self.assertTrue(record_queries)
+        for sql in record_queries:
+            # Filtra por las cuentas del queryset, no recorre toda la tabla
+            self.assertRegex(sql, r'account_id" IN \(')
+        self.assertEqual(self.stored_balance(self.cash), Decimal("500.00"))
+
+    def test_rebuild_balances_command_check(self):
+        self.record("income", "500.00")
+        AccountBalance.objects.filter(account=self.cash).update(balance=Decimal("1.00"))
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_balances", "--check", "--user", "ledger", stdout=StringIO())
+        call_command("rebuild_balances", "--user", "ledger", stdout=StringIO())
+        self.assertEqual(self.stored_balance(self.cash), Decimal("500.00"))
+
+
+class ConditionalEngineTests(LedgerTestCase):
+    def balances(self, queryset):
+        return dict(queryset.values_list("pk", "balance"))
+
+    def test_matches_subquery_when_evaluated_after_a_write(self):
+        self.record("income", "500.00")
+        self.record("transfer", "200.00", from_account=self.cash, to_account=self.bank)
+        accounts = Account.objects.filter(user=self.user)
+        conditional = annotate_balance_conditional(accounts)
+
+        # El queryset se construye antes de la escritura y se evalúa después
+        self.record("expense", "80.00", account=self.bank)
+        self.record("transfer", "15.00", from_account=self.bank, to_account=self.bank)
+        expected = self.balances(annotate_balance(accounts))
+        self.assertEqual(expected[self.bank.pk], Decimal("120.00"))
+        self.assertEqual(self.balances(conditional), expected)
+
+
+class CheckpointTests(LedgerTestCase):
+    """El motor "checkpoint" coincide con el ledger tras construir y ajustar checkpoints."""
+
+    def at(self, day):
+        return period_boundary(day) + datetime.timedelta(hours=12)
+
+    def setUp(self):
+        self.income = self.record("income", "500.00", date_time=self.at(datetime.date(2025, 1, 10)))
+        self.record("expense", "120.00", date_time=self.at(datetime.date(2025, 2, 5)))
+        self.transfer = self.record(
+            "transfer",
+            "200.00",
+            from_account=self.cash,
+            to_account=self.bank,
+            date_time=self.at(datetime.date(2025, 2, 20)),
+        )
+        self.record(
+            "income", "30.00", account=self.bank, date_time=self.at(datetime.date(2025, 3, 3))
+        )
+
+    def accounts(self):
+        return Account.objects.filter(user=self.user)
+
+    def build(self):
+        return build_checkpoints(self.accounts(), until=period_boundary(datetime.date(2025, 4, 1)))
+
+    def checkpoint(self, account, day):
+        return BalanceCheckpoint.objects.get(account=account, as_of=period_boundary(day)).balance
+
+    def assertEnginesAgree(self):
+        ledger = dict(balance_queryset(self.accounts(), "ledger").values_list("pk", "balance"))
+        checkpoint = dict(
+            balance_queryset(self.accounts(), "checkpoint").values_list("pk", "balance")
+        )
+        self.assertEqual(checkpoint, ledger)
+
+    def test_without_checkpoints(self):
+        self.assertEnginesAgree()
+
+    def test_build_checkpoints(self):
+        # Caja: enero a marzo; Banco: febrero y marzo
+        self.assertEqual(self.build(), 5)
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 2, 1)), Decimal("500.00"))
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 3, 1)), Decimal("180.00"))
+        self.assertEqual(self.checkpoint(self.bank, datetime.date(2025, 4, 1)), Decimal("230.00"))
+        self.assertEnginesAgree()
+
+        # Incremental: los siguientes cierres parten del último checkpoint
+        self.assertEqual(
+            build_checkpoints(self.accounts(), until=period_boundary(datetime.date(2025, 5, 1))), 2
+        )
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 5, 1)), Decimal("180.00"))
+        self.assertEnginesAgree()
+
+    def test_edit_record_before_checkpoint(self):
+        self.build()
+        self.income.amount = Decimal("450.00")
+        self.income.save()
+
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 2, 1)), Decimal("450.00"))
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 4, 1)), Decimal("130.00"))
+        self.assertEnginesAgree()
+
+    def test_move_record_across_checkpoints(self):
+        self.build()
+        self.transfer.date_time = self.at(datetime.date(2025, 3, 15))
+        self.transfer.save()
+
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 3, 1)), Decimal("380.00"))
+        self.assertEqual(self.checkpoint(self.bank, datetime.date(2025, 3, 1)), Decimal("0.00"))
+        self.assertEqual(self.checkpoint(self.cash, datetime.date(2025, 4, 1)), Decimal("180.00"))
+        self.assertEnginesAgree()
+
+    def test_delete_record_before_checkpoint(self):
+        self.build()
+        self.transfer.delete()
+
+        self.assertEqual(self.checkpoint(self.bank, datetime.date(2025, 4, 1)), Decimal("30.00"))
+        self.assertEnginesAgree()
+
+    def test_build_checkpoints_command(self):
+        call_command(
+            "build_checkpoints",
+            "--user",
+            "ledger",
+            "--until",
+            "2025-04-01",
+            "--check",
+            stdout=StringIO(),
+        )
+        self.assertEqual(BalanceCheckpoint.objects.filter(account__user=self.user).count(), 5)
+        self.assertEnginesAgree()
+
+
+class NetWorthTests(LedgerTestCase):
+    """Las cuentas en la moneda destino no necesitan tasa; la falta de tasas no es un error."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Currency.objects.get_or_create(
+            code="USD", defaults={"name": "Dólar estadounidense", "numeric_code": "840"}
+        )
+        currency_registry.invalidate()
+        cls.dollars = Account.objects.create(user=cls.user, name="Dólares", currency_id="USD")
+
+    def setUp(self):
+        rate_cache.invalidate()
+        self.addCleanup(rate_cache.invalidate)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.record("income", "300.00")
+        self.record("income", "200.00", account=self.bank)
+        Record.objects.create(
+            user=self.user,
+            title="income",
+            amount=Decimal("10.00"),
+            typeRecord="income",
+            paymentType="cash",
+            currency_id="USD",
+            account=self.dollars,
+        )
+
+    def net_worth(self, currency):
+        response = self.client.get(f"/api/accounts/net-worth/?currency={currency}&date=2025-06-01")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return Decimal(data["total"]), data["missing_rates"]
+
+    def test_target_currency_without_rate(self):
+        # Sin tasas: las cuentas en COP suman con factor 1 y solo falta la tasa destino
+        self.assertEqual(self.net_worth("COP"), (Decimal("500.00"), ["COP"]))
+
+    def test_only_accounts_in_target_currency(self):
+        self.dollars.delete()
+        self.assertEqual(self.net_worth("COP"), (Decimal("500.00"), []))
+
+    def test_converts_other_currencies(self):
+        ExchangeRate.objects.create(
+            currency_id="COP", date=datetime.date(2025, 5, 1), rate=Decimal("0.0002")
+        )
+        self.assertEqual(self.net_worth("COP"), (Decimal("50500.00"), []))
+        self.assertEqual(self.net_worth("USD"), (Decimal("10.10"), []))
+
+
+class BalanceHistoryETagTests(LedgerTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/accounts/{self.cash.pk}/balance-history/"
+
+    def get(self, today, etag=""):
+        with mock.patch("django.utils.timezone.localdate", return_value=today):
+            return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_default_range_changes_etag_every_day(self):
+        today = datetime.date(2025, 6, 1)
+        etag = self.get(today)["ETag"]
+        self.assertEqual(self.get(today, etag).status_code, 304)
+
+        response = self.get(today + datetime.timedelta(days=1), etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["date_to"], "2025-06-02")
+
+
+class AccountETagTests(LedgerTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        return response["ETag"]
+
+    def test_account_write_changes_etag(self):
+        for url in ("/api/accounts/", f"/api/accounts/{self.cash.pk}/"):
+            with self.subTest(url=url):
+                etag = self.etag(url)
+                self.cash.name = f"Caja {url}"
+                self.cash.save()
+                self.assertNotEqual(self.etag(url), etag)
+
+    def test_record_write_changes_etag(self):
+        for url in ("/api/accounts/", f"/api/accounts/{self.cash.pk}/"):
+            with self.subTest(url=url):
+                etag = self.etag(url)
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.record(amount="25.00")
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+
+class AccountListCacheTests(LedgerTestCase):
+    """El listado cacheado se descarta con cada cambio de cuentas, registros o balances."""
+
+    def setUp(self):
+        self.cache = caches[settings.ACCOUNT_LIST_CACHE]
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def balances(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get("/api/accounts/")
+        self.assertEqual(response.status_code, 200)
+        return {account["name"]: Decimal(account["balance"]) for account in response.json()}
+
+    def assertCounted(self, hits, misses, callable):
+        before = cache_stats()
+        result = callable()
+        after = cache_stats()
+        self.assertEqual(
+            (after["hits"] - before["hits"], after["misses"] - before["misses"]),
+            (hits, misses),
+        )
+        return result
+
+    def assertEvicted(self):
+        self.assertIsNone(self.cache.get(f"accounts:list:{self.user.pk}"))
+
+    def test_repeated_list_is_a_hit(self):
+        first = self.assertCounted(0, 1, self.balances)
+        self.assertEqual(self.assertCounted(1, 0, self.balances), first)
+        self.assertEqual(cache_stats()["hit_ratio"], 0.5)
+
+    def test_account_write_invalidates(self):
+        self.balances()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cash.name = "Billetera"
+            self.cash.save()
+        self.assertEvicted()
+        self.assertIn("Billetera", self.assertCounted(0, 1, self.balances))
+
+    def test_record_write_invalidates(self):
+        self.balances()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(amount="40.00")
+        self.assertEvicted()
+        self.assertEqual(self.assertCounted(0, 1, self.balances)["Caja"], Decimal("40.00"))
+
+    def test_rebuild_balances_invalidates(self):
+        self.record(amount="40.00")
+        # Un balance descuadrado (sin señales), ya servido desde el caché
+        AccountBalance.objects.filter(account=self.cash).update(balance=Decimal("1.00"))
+        self.balances()
+        self.assertEqual(self.assertCounted(1, 0, self.balances)["Caja"], Decimal("1.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_balances(Account.objects.filter(user=self.user))
+        self.assertEvicted()
+        self.assertEqual(self.assertCounted(0, 1, self.balances)["Caja"], Decimal("40.00"))
+
+    def test_stats_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/accounts/cache-stats/").status_code, 403)
+
+        admin = User.objects.create_user("admin-stats", password="x", is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get("/api/accounts/cache-stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["misses"], cache_stats()["misses"])
+
+
+@skipUnless(connection.vendor == "postgresql", "Requiere bloqueos de fila (PostgreSQL)")
+class ConcurrentBalanceUpdateTests(TransactionTestCase):
+    """Varias actualizaciones simultáneas del balance de una cuenta se serializan."""
+
+    THREADS = 4
+
+    def setUp(self):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        self.user = User.objects.create_user("concurrent", password="x")
+        self.account = Account.objects.create(user=self.user, name="Caja", currency_id="COP")
+
+    def update_balance(self, barrier, balance, statuses):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            barrier.wait()
+            response = client.put(
+                f"/api/accounts/{self.account.pk}/",
+                {"name": "Caja", "balance": balance},
+                format="json",
+            )
+            statuses.append(response.status_code)
+        finally:
+            # Cada hilo abre su propia conexión
+            connection.close()
+
+    def test_concurrent_updates_adjust_once(self):
+        barrier = threading.Barrier(self.THREADS)
+        statuses = []
+        threads = [
+            threading.Thread(target=self.update_balance, args=(barrier, "500.00", statuses))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * self.THREADS)
+        # La primera crea el ajuste; las demás ya leen el balance pedido
+        self.assertEqual(Record.objects.filter(account=self.account).count(), 1)
+        self.assertEqual(
+            AccountBalance.objects.get(account=self.account).balance, Decimal("500.00")
+        )
+        self.assertEqual(find_balance_mismatches(Account.objects.filter(user=self.user)), [])
@@ -1,96 +1,26 @@
 from decimal import Decimal
 
-from django.db.models import DecimalField, OuterRef, Q, Subquery, Sum, Value
-from django.db.models.functions import Coalesce
-from rest_framework import permissions, viewsets
+from django.db import transaction
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema, inline_serializer
+from rest_framework import permissions, serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-from .models import Account
-from .serializers import AccountSerializer
-
-# Constantes para el cálculo de balance
-ZERO_DECIMAL = Value(0, output_field=DecimalField(max_digits=15, decimal_places=2))
-
-
-def _subquery_income():
-    """Subquery para sumar ingresos de una cuenta."""
-    from records.models import Record
-
-    return Subquery(
-        Record.objects.filter(
-            account=OuterRef("pk"),
-            typeRecord="income",
-        )
-        .values("account")
-        .annotate(total=Sum("amount"))
-        .values("total")[:1]
-    )
-
-
-def _subquery_expenses_and_investments():
-    """Subquery para sumar gastos e inversiones de una cuenta."""
-    from records.models import Record
-
-    return Subquery(
-        Record.objects.filter(
-            account=OuterRef("pk"),
-            typeRecord__in=["expense", "investment"],
-        )
-        .values("account")
-        .annotate(total=Sum("amount"))
-        .values("total")[:1]
-    )
-
-
-def _subquery_transfers_received():
-    """Subquery para sumar transferencias recibidas (to_account)."""
-    from records.models import Record
-
-    return Subquery(
-        Record.objects.filter(
-            to_account=OuterRef("pk"),
-            typeRecord="transfer",
-        )
-        .values("to_account")
-        .annotate(total=Sum("amount"))
-        .values("total")[:1]
-    )
-
-
-def _subquery_transfers_sent():
-    """Subquery para sumar transferencias enviadas (from_account)."""
-    from records.models import Record
-
-    return Subquery(
-        Record.objects.filter(
-            from_account=OuterRef("pk"),
-            typeRecord="transfer",
-        )
-        .values("from_account")
-        .annotate(total=Sum("amount"))
-        .values("total")[:1]
-    )
-
-
-def annotate_balance(queryset):
-    """Anota el balance calculado a un queryset de Account.
-
-    Balance = Ingresos - (Gastos + Inversiones) + Transferencias recibidas - Transferencias enviadas
+from money.conditional import ConditionalGetMixin
 
-    Para transferencias:
-    - Las transferencias salientes (from_account) reducen el balance
-    - Las transferencias entrantes (to_account) aumentan el balance
+from currencies.rates import rate_cache
 
-    Nota:
-    - Los registros de tipo income, expense, investment usan el campo 'account'
-    - Los registros de tipo transfer usan 'from_account' y 'to_account'
-    """
-    income = Coalesce(_subquery_income(), ZERO_DECIMAL)
-    expenses = Coalesce(_subquery_expenses_and_investments(), ZERO_DECIMAL)
-    transfers_in = Coalesce(_subquery_transfers_received(), ZERO_DECIMAL)
-    transfers_out = Coalesce(_subquery_transfers_sent(), ZERO_DECIMAL)
-
-    result = queryset.annotate(balance=income - expenses + transfers_in - transfers_out).order_by("created_at")
-    return result
+from .balances import annotate_converted_balance, balance_queryset
+from .cache import cache_stats, get_account_list, set_account_list
+from .history import balance_history
+from .models import Account
+from .serializers import (
+    AccountSerializer,
+    BalanceHistoryQuerySerializer,
+    BalanceHistorySerializer,
+    NetWorthQuerySerializer,
+    NetWorthSerializer,
+)
 
 
 def create_balance_adjustment_record(user, account, amount):
@@ -116,24 +46,163 @@ def create_balance_adjustment_record(user, account, amount):
         typeRecord=type_record,
         category=None,
         paymentType="cash",
-        currency=account.currency,
+        currency_id=account.currency_id,
     )
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet para Account.
 
     - Permite listar/recuperar/crear/actualizar/borrar cuentas.
     - El queryset está restringido al usuario autenticado.
     - Al crear, el campo `user` se establece desde request.user.
+    - list/retrieve soportan ETag: se responde 304 si los datos del usuario no cambiaron.
+    - list se sirve desde el caché del servidor (`accounts.cache`) mientras la
+      versión de datos del usuario no cambie.
     """
 
     serializer_class = AccountSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(request, self._cached_list, *args, **kwargs)
+
+    def _cached_list(self, request, *args, **kwargs):
+        version = self.get_etag_version()
+        data = get_account_list(request.user.pk, version)
+        if data is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            data = [dict(item) for item in self.get_serializer(queryset, many=True).data]
+            set_account_list(request.user.pk, version, data)
+        return Response(data)
+
+    @extend_schema(
+        responses=inline_serializer(
+            "AccountListCacheStats",
+            {
+                "backend": serializers.CharField(),
+                "hits": serializers.IntegerField(),
+                "misses": serializers.IntegerField(),
+                "hit_ratio": serializers.FloatField(allow_null=True),
+            },
+        )
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Contadores de aciertos/fallos del caché del listado de cuentas (solo staff)."""
+        return Response(cache_stats())
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "currency",
+                OpenApiTypes.STR,
+                description="Moneda destino (por defecto, DEFAULT_CURRENCY_CODE).",
+            ),
+            OpenApiParameter(
+                "date", OpenApiTypes.DATE, description="Fecha de las tasas (por defecto, hoy)."
+            ),
+        ],
+        responses=NetWorthSerializer,
+    )
+    @action(detail=False, methods=["get"], url_path="net-worth")
+    def net_worth(self, request):
+        """Patrimonio neto: suma de los balances de todas las cuentas convertidos a una moneda.
+
+        Cada balance se convierte con la última tasa disponible en `date`; las
+        cuentas que ya están en la moneda destino no necesitan tasa. Las que no
+        se pueden convertir (falta la tasa de su moneda o la de la moneda
+        destino) quedan fuera del total y sus monedas se listan en `missing_rates`.
+        """
+        params = NetWorthQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        currency, day = params.validated_data["currency"], params.validated_data["date"]
+
+        to_rate = rate_cache.rate(currency, day)
+        accounts = list(
+            annotate_converted_balance(
+                Account.objects.filter(user=request.user), currency, day, to_rate
+            ).values("id", "name", "currency", "balance", "converted_balance")
+        )
+        converted = [
+            account["converted_balance"]
+            for account in accounts
+            if account["converted_balance"] is not None
+        ]
+        # Solo las cuentas que necesitaban conversión pueden quedar sin convertir
+        unconverted = {
+            account["currency"] for account in accounts if account["converted_balance"] is None
+        }
+        missing_rates = {code for code in unconverted if rate_cache.rate(code, day) is None}
+        if unconverted and to_rate is None:
+            missing_rates.add(currency)
+        return Response(
+            NetWorthSerializer(
+                {
+                    "currency": currency,
+                    "date": day,
+                    "total": sum(converted, Decimal("0")),
+                    "accounts": accounts,
+                    "missing_rates": sorted(missing_rates),
+                }
+            ).data
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("period", OpenApiTypes.STR, enum=["day", "week", "month"]),
+            OpenApiParameter("date_from", OpenApiTypes.DATE),
+            OpenApiParameter("date_to", OpenApiTypes.DATE),
+        ],
+        responses=BalanceHistorySerializer,
+    )
+    @action(detail=True, methods=["get"], url_path="balance-history")
+    def history(self, request, pk=None):
+        """Balance de la cuenta al cierre de cada período (`day`, `week`, `month`) del rango.
+
+        Se calcula en un solo query con una suma acumulada (función de ventana)
+        y soporta ETag como `retrieve`.
+        """
+        return self._conditional_response(request, self._history)
+
+    def get_etag_extra(self, request):
+        # `date_to` es hoy por defecto: la misma URL cambia de respuesta cada día
+        if self.action == "history":
+            query = self._history_query(request)
+            return [query["date_from"], query["date_to"]]
+        return []
+
+    def _history_query(self, request):
+        if not hasattr(self, "_history_params"):
+            params = BalanceHistoryQuerySerializer(data=request.query_params)
+            params.is_valid(raise_exception=True)
+            self._history_params = params.validated_data
+        return self._history_params
+
+    def _history(self, request):
+        query = self._history_query(request)
+        account = self.get_object()
+        return Response(
+            BalanceHistorySerializer(
+                {
+                    "account": account.pk,
+                    "currency": account.currency_id,
+                    **query,
+                    "results": balance_history(
+                        account.pk, query["period"], query["date_from"], query["date_to"]
+                    ),
+                }
+            ).data
+        )
+
     def get_queryset(self):
         user = self.request.user
-        return annotate_balance(Account.objects.filter(user=user))
+        return balance_queryset(Account.objects.filter(user=user))
 
     def perform_create(self, serializer):
         # Extraer el balance de los datos validados
@@ -147,7 +216,7 @@ class AccountViewSet(viewsets.ModelViewSet):
             create_balance_adjustment_record(self.request.user, account, balance)
 
         # Anotar el balance en la instancia para que se incluya en la respuesta
-        account_with_balance = annotate_balance(
+        account_with_balance = balance_queryset(
             Account.objects.filter(id=account.id)
         ).first()
 
@@ -160,29 +229,33 @@ class AccountViewSet(viewsets.ModelViewSet):
         # Obtener el balance enviado por el usuario
         new_balance = serializer.validated_data.pop("balance", None)
 
-        # Obtener la cuenta actual con su balance
-        account = self.get_object()
-        account_with_balance = annotate_balance(
-            Account.objects.filter(id=account.id)
-        ).first()
-        current_balance = (
-            account_with_balance.balance if account_with_balance else Decimal("0")
-        )
-
-        # Actualizar la cuenta
-        account = serializer.save()
-
-        # Si se proporcionó un balance y es diferente al actual, crear un registro de ajuste
-        if new_balance is not None and new_balance != current_balance:
-            difference = new_balance - current_balance
-            create_balance_adjustment_record(self.request.user, account, difference)
-
-        # Recalcular el balance para incluirlo en la respuesta
-        account_with_balance = annotate_balance(
-            Account.objects.filter(id=account.id)
-        ).first()
-
-        # Actualizar la instancia del serializer con el balance calculado
-        if account_with_balance:
-            account.balance = account_with_balance.balance
-            serializer.instance = account
+        with transaction.atomic():
+            # Bloquear la cuenta: dos actualizaciones concurrentes se serializan
+            # y la segunda lee el balance ya ajustado por la primera
+            list(
+                Account.objects.select_for_update()
+                .filter(pk=serializer.instance.pk)
+                .values_list("pk", flat=True)
+            )
+            current_balance = (
+                balance_queryset(Account.objects.filter(pk=serializer.instance.pk))
+                .values_list("balance", flat=True)
+                .first()
+            )
+            if current_balance is None:
+                current_balance = Decimal("0")
+
+            # Actualizar la cuenta
+            account = serializer.save()
+
+            # Si se proporcionó un balance y es diferente al actual, crear un registro de ajuste
+            balance = current_balance
+            if new_balance is not None and new_balance != current_balance:
+                create_balance_adjustment_record(
+                    self.request.user, account, new_balance - current_balance
+                )
+                balance = new_balance
+
+        # El ajuste deja la cuenta exactamente en el balance pedido: no hace falta recalcularlo
+        account.balance = balance
+        serializer.instance = account
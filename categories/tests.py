@@ -1,3 +1,44 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from currencies.models import Currency
+from currencies.registry import currency_registry
+
+from .models import Category
+
+
+class CategoryETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("categories", password="x")
+        cls.category = Category.objects.create(user=cls.user, name="Gimnasio")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        return response["ETag"]
+
+    def test_category_write_changes_etag(self):
+        for url in ("/api/categories/", f"/api/categories/{self.category.pk}/"):
+            with self.subTest(url=url):
+                etag = self.etag(url)
+                self.category.name = f"Gimnasio {url}"
+                self.category.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_category_create_changes_list_etag(self):
+        etag = self.etag("/api/categories/")
+        Category.objects.create(user=self.user, name="Suscripciones")
+        self.assertNotEqual(self.etag("/api/categories/"), etag)
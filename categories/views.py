@@ -1,7 +1,8 @@
 from rest_framework import viewsets, permissions
+from money.conditional import ConditionalGetMixin
 from .serializers import CategorySerializer
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
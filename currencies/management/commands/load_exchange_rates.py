@@ -0,0 +1,87 @@
+"""Carga tipos de cambio diarios desde un archivo CSV o JSON.
+
+El CSV lleva cabecera `date,currency,rate`; el JSON es una lista de objetos
+con esas claves. `rate` es cuántas unidades de `FX_BASE_CURRENCY` vale una
+unidad de `currency` ese día. Las tasas existentes para la misma moneda y
+fecha se reemplazan (upsert en lotes). Si alguna fila es inválida no se
+escribe nada.
+"""
+
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from currencies.models import ExchangeRate
+from currencies.rates import rate_cache
+from currencies.registry import currency_registry
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8") as f:
+        if Path(path).suffix.lower() == ".json":
+            return json.load(f)
+        return list(csv.DictReader(f))
+
+
+def build_rates(rows):
+    """Valida las filas y devuelve `(tasas, errores)`."""
+    currencies = currency_registry.all() or {}
+    rates = {}
+    errors = []
+    for line, row in enumerate(rows, start=1):
+        try:
+            day = parse_date(str(row.get("date", "")).strip())
+            code = str(row.get("currency", "")).strip().upper()
+            rate = Decimal(str(row.get("rate", "")).strip())
+        except (InvalidOperation, ValueError, AttributeError):
+            day, code, rate = None, None, None
+        if day is None or rate is None:
+            errors.append(f"fila {line}: fecha o tasa inválida")
+        elif code not in currencies:
+            errors.append(f"fila {line}: moneda desconocida {code!r}")
+        elif code == settings.FX_BASE_CURRENCY:
+            errors.append(f"fila {line}: {code} es la moneda base (su tasa es siempre 1)")
+        elif rate <= 0:
+            errors.append(f"fila {line}: la tasa debe ser positiva")
+        else:
+            # Si una moneda y fecha se repiten, gana la última fila
+            rates[(code, day)] = ExchangeRate(currency_id=code, date=day, rate=rate)
+    return list(rates.values()), errors
+
+
+class Command(BaseCommand):
+    help = "Carga (upsert) tipos de cambio diarios desde un archivo CSV o JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo .csv (date,currency,rate) o .json.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            rows = read_rows(options["path"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"No se pudo leer {options['path']}: {exc}")
+
+        rates, errors = build_rates(rows)
+        if errors:
+            for error in errors[:20]:
+                self.stderr.write(error)
+            raise CommandError(f"{len(errors)} filas inválidas; no se cargó ninguna tasa.")
+
+        with transaction.atomic():
+            ExchangeRate.objects.bulk_create(
+                rates,
+                batch_size=options["batch_size"],
+                update_conflicts=True,
+                unique_fields=["currency", "date"],
+                update_fields=["rate"],
+            )
+        # bulk_create no emite señales
+        rate_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Tasas cargadas: {len(rates)}."))
@@ -0,0 +1,101 @@
+"""Sincroniza la tabla de monedas con el catálogo ISO 4217 del paquete `iso4217`.
+
+Reemplaza a `generate_currencies.py` + `loaddata currencies` en el arranque:
+construye las filas en memoria, las compara con la tabla y hace un único
+upsert (`bulk_create(update_conflicts=True)`) con las nuevas o modificadas.
+Si el checksum del catálogo coincide con el guardado en `CurrencySync` (y la
+tabla tiene todas las monedas), termina sin escribir nada.
+"""
+
+import hashlib
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from iso4217 import Currency as ISOCurrency
+
+from currencies.models import Currency, CurrencySync
+from currencies.registry import currency_registry
+
+SOURCE = "iso4217"
+# `is_active` no se sincroniza: las monedas nuevas se crean activas y después
+# se administran desde el admin
+FIELDS = ("name", "numeric_code", "minor_unit")
+
+
+def iso4217_currencies():
+    """Monedas del catálogo ISO 4217, ordenadas por código."""
+    return [
+        Currency(
+            code=currency.code,
+            name=currency.currency_name,
+            numeric_code=str(currency.number).zfill(3),
+            minor_unit=currency.exponent if currency.exponent is not None else 0,
+            is_active=True,
+        )
+        for currency in sorted(ISOCurrency, key=lambda currency: currency.code)
+    ]
+
+
+def catalog_checksum(currencies):
+    digest = hashlib.sha256()
+    for currency in currencies:
+        values = [currency.code] + [str(getattr(currency, field)) for field in FIELDS]
+        digest.update(("|".join(values) + "\n").encode())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = "Crea o actualiza las monedas ISO 4217 con un solo upsert (idempotente)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Comparar con la tabla aunque el checksum guardado coincida.",
+        )
+
+    def handle(self, *args, **options):
+        currencies = iso4217_currencies()
+        checksum = catalog_checksum(currencies)
+
+        stored = CurrencySync.objects.filter(source=SOURCE).values_list("checksum", flat=True).first()
+        if (
+            not options["force"]
+            and stored == checksum
+            and Currency.objects.filter(code__in=[c.code for c in currencies]).count() == len(currencies)
+        ):
+            self.stdout.write("Monedas al día (checksum sin cambios).")
+            return
+
+        existing = {
+            row["code"]: row for row in Currency.objects.values("code", *FIELDS)
+        }
+        changed = [
+            currency
+            for currency in currencies
+            if existing.get(currency.code)
+            != {"code": currency.code, **{field: getattr(currency, field) for field in FIELDS}}
+        ]
+
+        with transaction.atomic():
+            if changed:
+                Currency.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=["code"],
+                    update_fields=list(FIELDS),
+                )
+            CurrencySync.objects.update_or_create(
+                source=SOURCE, defaults={"checksum": checksum}
+            )
+
+        if changed:
+            # bulk_create no emite señales: refrescar el catálogo en memoria de este proceso
+            currency_registry.invalidate()
+        created = sum(1 for currency in changed if currency.code not in existing)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Monedas sincronizadas: {created} nuevas, {len(changed) - created} actualizadas, "
+                f"{len(currencies) - len(changed)} sin cambios."
+            )
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrencySync',
+            fields=[
+                ('source', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('checksum', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
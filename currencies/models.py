@@ -13,3 +13,38 @@ class Currency(models.Model):
 
     def __str__(self):
         return f"{self.code} - {self.name}"
+
+
+class ExchangeRate(models.Model):
+    """Tipo de cambio diario de una moneda contra `settings.FX_BASE_CURRENCY`.
+
+    `rate` es cuántas unidades de la moneda base vale una unidad de `currency`.
+    La moneda base no necesita filas (su tasa es siempre 1). Para una fecha sin
+    tasa se usa la última anterior (ver `currencies.rates`).
+    """
+
+    currency = models.ForeignKey(Currency, on_delete=models.PROTECT, related_name="rates")
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+
+    class Meta:
+        constraints = [
+            # También sirve la búsqueda `currency = X AND date <= D ORDER BY date DESC`
+            models.UniqueConstraint(
+                fields=["currency", "date"], name="exchange_rate_currency_date_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.currency_id} {self.date}: {self.rate}"
+
+
+class CurrencySync(models.Model):
+    """Checksum del último catálogo sincronizado por `sync_currencies`, por fuente."""
+
+    source = models.CharField(max_length=50, primary_key=True)
+    checksum = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.checksum[:12]})"
@@ -0,0 +1,141 @@
+"""Conversión entre monedas con la tabla `ExchangeRate`.
+
+Hay dos caminos, según dónde haga falta la tasa:
+
+- En queries (`rate_expression`, `conversion_factor`): la tasa de cada fila se
+  obtiene con una subquery sobre `ExchangeRate` (la última tasa con fecha
+  menor o igual), resuelta por el índice único `(currency, date)`. La
+  conversión se hace en la base de datos para todas las filas a la vez.
+- En Python (`rate_cache`): un caché en memoria de tasas por
+  `(moneda, fecha)`, para valores sueltos como la tasa de la moneda destino de
+  una petición. Cada moneda se carga completa con un solo query la primera
+  vez que se pide. Se invalida con cada escritura de `ExchangeRate` en este
+  proceso y vence a los `FX_RATE_CACHE_TTL` segundos en los demás.
+"""
+
+import bisect
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    DecimalField,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.lookups import Exact
+
+from money.metrics import count_cache
+
+from .models import ExchangeRate
+
+RATE_FIELD = DecimalField(max_digits=20, decimal_places=10)
+ONE = Value(Decimal("1"), output_field=RATE_FIELD)
+
+
+def _outer(ref):
+    """Referencia desde la subquery de tasas a un campo (o expresión) del query que la contiene."""
+    if isinstance(ref, str):
+        return OuterRef(ref)
+    if isinstance(ref, OuterRef):
+        return OuterRef(ref)
+    return ref
+
+
+def _local(ref):
+    return F(ref) if isinstance(ref, str) else ref
+
+
+def rate_expression(currency, day):
+    """Expresión con la tasa de `currency` a la moneda base en `day`.
+
+    `currency` y `day` son nombres de campo/anotación del query donde se usa la
+    expresión, `OuterRef` si ese query es a su vez una subquery, o valores
+    (`Value`) constantes. Es NULL si no hay tasa en o antes de `day`.
+    """
+    latest = (
+        ExchangeRate.objects.filter(currency=_outer(currency), date__lte=_outer(day))
+        .order_by("-date")
+        .values("rate")[:1]
+    )
+    return Case(
+        When(Exact(_local(currency), Value(settings.FX_BASE_CURRENCY)), then=ONE),
+        default=Subquery(latest, output_field=RATE_FIELD),
+        output_field=RATE_FIELD,
+    )
+
+
+def conversion_factor(from_currency, to_currency, day):
+    """Expresión con el factor para pasar importes de `from_currency` a `to_currency` en `day`."""
+    return Case(
+        When(Exact(_local(from_currency), _local(to_currency)), then=ONE),
+        default=rate_expression(from_currency, day) / rate_expression(to_currency, day),
+        output_field=RATE_FIELD,
+    )
+
+
+class RateCache:
+    """Tasas por `(moneda, fecha)` en memoria, con arrastre de la última tasa conocida."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._rates = {}
+        self._loaded_at = time.monotonic()
+
+    def _expired(self):
+        ttl = settings.FX_RATE_CACHE_TTL
+        return bool(ttl) and time.monotonic() - self._loaded_at > ttl
+
+    def _load_series(self, code):
+        rows = list(
+            ExchangeRate.objects.filter(currency_id=code)
+            .order_by("date")
+            .values_list("date", "rate")
+        )
+        return [day for day, _ in rows], [rate for _, rate in rows]
+
+    def rate(self, code, day):
+        """Tasa de `code` a la moneda base en `day`, o None si no hay ninguna anterior."""
+        if code == settings.FX_BASE_CURRENCY:
+            return Decimal("1")
+        key = (code, day)
+        with self._lock:
+            if self._expired():
+                self._series.clear()
+                self._rates.clear()
+                self._loaded_at = time.monotonic()
+            hit = key in self._rates
+            if not hit:
+                if code not in self._series:
+                    self._series[code] = self._load_series(code)
+                days, rates = self._series[code]
+                index = bisect.bisect_right(days, day)
+                self._rates[key] = rates[index - 1] if index else None
+            rate = self._rates[key]
+        count_cache("fx_rate", hit)
+        return rate
+
+    def convert(self, amount, from_code, to_code, day):
+        """Convierte `amount` entre monedas con las tasas de `day`; None si falta alguna tasa."""
+        if from_code == to_code:
+            return amount
+        from_rate = self.rate(from_code, day)
+        to_rate = self.rate(to_code, day)
+        if from_rate is None or to_rate is None:
+            return None
+        return amount * from_rate / to_rate
+
+    def invalidate(self):
+        with self._lock:
+            self._series.clear()
+            self._rates.clear()
+            self._loaded_at = time.monotonic()
+
+
+rate_cache = RateCache()
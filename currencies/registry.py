@@ -0,0 +1,85 @@
+"""Catálogo de monedas en memoria del proceso.
+
+Las monedas casi nunca cambian, pero se consultan en cada default de
+`Account.currency`/`Record.currency` y en cada validación de `currency` en los
+serializers. El registro carga la tabla una vez y la sirve desde memoria.
+
+- Se invalida en este proceso con cada save/delete de `Currency` (ver `signals`).
+- Otros procesos (workers de gunicorn) la recargan al vencer
+  `CURRENCY_REGISTRY_TTL` segundos (0 = sin vencimiento).
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+
+class CurrencyRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._currencies = None
+        self._version = None
+        self._loaded_at = 0.0
+
+    def _expired(self):
+        ttl = getattr(settings, "CURRENCY_REGISTRY_TTL", 300)
+        return bool(ttl) and time.monotonic() - self._loaded_at > ttl
+
+    def all(self):
+        """Devuelve `{code: Currency}` con todas las monedas."""
+        currencies = self._currencies
+        if currencies is None or self._expired():
+            with self._lock:
+                if self._currencies is None or self._expired():
+                    self._currencies = self._load()
+                    self._version = self._checksum(self._currencies or {})
+                    self._loaded_at = time.monotonic()
+                currencies = self._currencies
+        return currencies
+
+    def _load(self):
+        from .models import Currency
+
+        currencies = {currency.code: currency for currency in Currency.objects.all()}
+        # No dejar en caché un catálogo vacío (p. ej. antes de cargar las monedas)
+        return currencies or None
+
+    @staticmethod
+    def _checksum(currencies):
+        digest = hashlib.sha256()
+        for code in sorted(currencies):
+            currency = currencies[code]
+            digest.update(
+                f"{code}|{currency.name}|{currency.numeric_code}|{currency.minor_unit}|{currency.is_active}\n".encode()
+            )
+        return digest.hexdigest()
+
+    def version(self):
+        """Checksum del contenido del catálogo; cambia solo si cambian las monedas."""
+        currencies = self.all()
+        # Si otro hilo invalidó entretanto, calcularlo sobre lo ya cargado
+        return self._version or self._checksum(currencies or {})
+
+    def get(self, code):
+        """Devuelve la `Currency` con ese código, o None si no existe."""
+        return (self.all() or {}).get(code)
+
+    def default_code(self):
+        """Código de la moneda por defecto (`DEFAULT_CURRENCY_CODE`), validado contra el catálogo."""
+        from .models import Currency
+
+        code = getattr(settings, "DEFAULT_CURRENCY_CODE", "COP")
+        if self.get(code) is None:
+            raise Currency.DoesNotExist(f"No existe la moneda por defecto {code!r}.")
+        return code
+
+    def invalidate(self):
+        with self._lock:
+            self._currencies = None
+            self._version = None
+            self._loaded_at = 0.0
+
+
+currency_registry = CurrencyRegistry()
@@ -1,8 +1,26 @@
 from rest_framework import serializers
 from .models import Currency
+from .registry import currency_registry
 
 class CurrencySerializer(serializers.ModelSerializer):
     class Meta:
         model = Currency
         fields = ['code', 'name', 'numeric_code']
-        read_only_fields = ['code']
\ No newline at end of file
+        read_only_fields = ['code']
+
+
+class CurrencyField(serializers.PrimaryKeyRelatedField):
+    """Moneda referenciada por su código, validada contra `currency_registry` sin ir a la base de datos."""
+
+    def __init__(self, **kwargs):
+        if not kwargs.get("read_only"):
+            kwargs.setdefault("queryset", Currency.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        currency = currency_registry.get(data)
+        if currency is None:
+            self.fail("does_not_exist", pk_value=data)
+        return currency
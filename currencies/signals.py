@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Currency, ExchangeRate
+from .rates import rate_cache
+from .registry import currency_registry
+
+
+@receiver(post_save, sender=Currency, weak=False)
+@receiver(post_delete, sender=Currency, weak=False)
+def invalidate_currency_registry(sender, **kwargs):
+    currency_registry.invalidate()
+
+
+@receiver(post_save, sender=ExchangeRate, weak=False)
+@receiver(post_delete, sender=ExchangeRate, weak=False)
+def invalidate_rate_cache(sender, **kwargs):
+    rate_cache.invalidate()
@@ -1,3 +1,106 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .management.commands.sync_currencies import iso4217_currencies
+from .models import Currency
+from .registry import currency_registry
+
+
+class CurrencyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.peso, _ = Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("currencies", password="x")
+
+    def setUp(self):
+        currency_registry.invalidate()
+        self.addCleanup(currency_registry.invalidate)
+
+
+class CurrencyETagTests(CurrencyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        return response["ETag"]
+
+    def test_currency_save_changes_etag(self):
+        for url in ("/api/currencies/", "/api/currencies/COP/"):
+            with self.subTest(url=url):
+                etag = self.etag(url)
+                self.peso.name = f"Peso {url}"
+                self.peso.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_unrelated_write_keeps_etag(self):
+        # La versión es la del catálogo, no la `DataVersion` del usuario
+        etag = self.etag("/api/currencies/")
+        self.user.first_name = "Otro"
+        self.user.save()
+        self.assertEqual(self.etag("/api/currencies/"), etag)
+
+
+class SyncCurrenciesTests(CurrencyTestCase):
+    def sync(self, *args):
+        stdout = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command("sync_currencies", *args, stdout=stdout)
+        writes = [
+            query["sql"]
+            for query in queries
+            if '"currencies_currency"' in query["sql"]
+            and query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        return stdout.getvalue(), writes
+
+    def test_second_run_changes_nothing(self):
+        output, writes = self.sync()
+        self.assertIn("Monedas sincronizadas", output)
+        self.assertTrue(writes)
+        snapshot = list(Currency.objects.values())
+
+        for args in ((), ("--force",)):
+            with self.subTest(args=args):
+                output, writes = self.sync(*args)
+                self.assertEqual(writes, [])
+                self.assertEqual(list(Currency.objects.values()), snapshot)
+        self.assertIn("0 nuevas, 0 actualizadas", output)
+
+    def test_updates_renamed_currency_and_keeps_is_active(self):
+        self.sync()
+        Currency.objects.filter(code="COP").update(is_active=False)
+        catalog = iso4217_currencies()
+        for currency in catalog:
+            if currency.code == "COP":
+                currency.name = "Peso colombiano (nuevo)"
+
+        with mock.patch(
+            "currencies.management.commands.sync_currencies.iso4217_currencies",
+            return_value=catalog,
+        ):
+            output, writes = self.sync()
+        self.assertIn("0 nuevas, 1 actualizadas", output)
+        self.assertEqual(len(writes), 1)
 
-# Create your tests here.
+        peso = Currency.objects.get(code="COP")
+        self.assertEqual(peso.name, "Peso colombiano (nuevo)")
+        self.assertFalse(peso.is_active)
+        # `bulk_create` no envía señales: el comando invalida el catálogo en memoria
+        self.assertEqual(currency_registry.get("COP").name, "Peso colombiano (nuevo)")
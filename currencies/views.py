@@ -1,8 +1,19 @@
+from django.conf import settings
 from rest_framework import viewsets, permissions
+from money.conditional import ConditionalGetMixin
 from .serializers import CurrencySerializer
 from .models import Currency
+from .registry import currency_registry
 
-class CurrencyViewSet(viewsets.ReadOnlyModelViewSet):
+class CurrencyViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    @property
+    def cache_control(self):
+        # El catálogo es igual para todos y casi nunca cambia
+        return {"private": True, "max_age": settings.CURRENCY_CACHE_MAX_AGE}
+
+    def get_etag_version(self):
+        return currency_registry.version()
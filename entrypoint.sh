@@ -7,17 +7,23 @@ echo "🚀 [Entrypoint] Iniciando tareas de despliegue..."
 echo "📦 Aplicando migraciones..."
 python manage.py migrate --noinput
 
-# 2. Lógica de monedas (Tus scripts personalizados)
-echo "💶 Generando y cargando currencies..."
-python currencies/generate_currencies.py
-python manage.py loaddata currencies
+# 2. Monedas ISO 4217 (upsert idempotente; no escribe nada si el catálogo no cambió)
+echo "💶 Sincronizando currencies..."
+python manage.py sync_currencies
 
-# 3. Superusuario (Asegúrate que este script no falle si el usuario ya existe)
+# 3. Métricas multiproceso: el directorio compartido debe empezar vacío
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    echo "📈 Preparando $PROMETHEUS_MULTIPROC_DIR..."
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+# 4. Superusuario (Asegúrate que este script no falle si el usuario ya existe)
 echo "👤 Configurando superusuario..."
 python -m money.create_superuser || true
 
 echo "✅ Tareas de inicialización completadas."
 
-# 4. Ejecutar el comando final (Gunicorn)
+# 5. Ejecutar el comando final (Gunicorn)
 echo "🔥 Arrancando servidor..."
 exec "$@"
@@ -0,0 +1,21 @@
+"""Configuración de Gunicorn (se carga automáticamente desde el directorio de trabajo).
+
+Los hooks solo preparan las métricas de money/metrics.py; el resto de la
+configuración sigue llegando por la línea de comandos (ver Dockerfile).
+"""
+
+import os
+
+
+def post_fork(server, worker):
+    # Workers configurados, para el gauge `money_gunicorn_workers`
+    os.environ["GUNICORN_WORKERS"] = str(server.cfg.workers)
+
+
+def child_exit(server, worker):
+    # Modo multiproceso de prometheus_client: descartar los gauges "live*"
+    # del worker que terminó
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
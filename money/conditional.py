@@ -0,0 +1,72 @@
+"""Conditional GET (ETag / If-None-Match) para viewsets de solo lectura o CRUD.
+
+El ETag se deriva de una versión de los datos (no del contenido de la
+respuesta), así que una petición con ETag vigente se responde con 304 sin
+consultar ni serializar los datos.
+"""
+
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from users.versions import get_data_version
+
+
+class ConditionalGetMixin:
+    """Añade ETag a `list`/`retrieve` y responde 304 cuando coincide `If-None-Match`.
+
+    `get_etag_version()` debe cambiar con cada escritura que afecte a la
+    respuesta; por defecto es la versión de datos del usuario (`DataVersion`),
+    que cubre las vistas de datos propios del usuario. Si la respuesta depende
+    de algo que no está en la URL (p. ej. un rango que por defecto termina
+    hoy), `get_etag_extra()` devuelve esos valores ya resueltos. `cache_control`
+    se aplica tal cual al header `Cache-Control` de las respuestas 200/304.
+    """
+
+    cache_control = {"private": True, "no_cache": True}
+
+    def get_etag_version(self):
+        # Se consulta una sola vez por petición (p. ej. ETag y caché del listado)
+        if not hasattr(self, "_data_version"):
+            self._data_version = get_data_version(self.request.user)
+        return self._data_version
+
+    def get_etag_extra(self, request):
+        return []
+
+    def get_etag(self, request):
+        user_id = request.user.pk if request.user.is_authenticated else ""
+        key = "|".join(
+            [
+                type(self).__name__,
+                self.action or "",
+                str(user_id),
+                request.get_full_path(),
+                request.accepted_media_type or "",
+                str(self.get_etag_version()),
+                *map(str, self.get_etag_extra(request)),
+            ]
+        )
+        return '"%s"' % hashlib.sha256(key.encode()).hexdigest()[:40]
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(request, super().retrieve, *args, **kwargs)
+
+    def _conditional_response(self, request, handler, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            patch_cache_control(response, **self.cache_control)
+            patch_vary_headers(response, ["Authorization"])
+        return response
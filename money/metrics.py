@@ -0,0 +1,237 @@
+"""Métricas Prometheus de la API (opcional, `METRICS_ENABLED`; extra `money[metrics]`).
+
+`MetricsMiddleware` registra por petición:
+
+- `money_http_request_duration_seconds`: histograma de latencia por vista
+  (nombre de URL), método y status,
+- `money_http_requests_in_progress`: peticiones en curso,
+- `money_db_queries_total` y `money_db_query_seconds_total`: queries SQL y
+  tiempo en la base de datos por vista.
+
+Además:
+
+- `money_cache_requests_total{cache, result}`: aciertos y fallos de los
+  cachés del listado de cuentas, de usuarios JWT y de tasas de cambio
+  (`count_cache`); la tasa de aciertos es `hit / (hit + miss)`,
+- `money_db_pool_*`: estado del pool de conexiones de psycopg, si está
+  activo (`DATABASE_POOL`), actualizado como mucho una vez por segundo,
+- `money_worker_start_time_seconds` y `money_gunicorn_workers`: workers vivos
+  y workers configurados (los datos de gunicorn los deja `gunicorn.conf.py`).
+
+`metrics_view` sirve el formato de texto de Prometheus en `/metrics` a quien
+envíe `Authorization: Bearer <METRICS_TOKEN>`; sin `METRICS_TOKEN` solo
+responde con `DEBUG` (en otro caso, 403). Con varios procesos (workers de
+gunicorn) hay que definir `PROMETHEUS_MULTIPROC_DIR`: cada proceso escribe sus
+valores en ese directorio compartido y el scrape los agrega
+(`MultiProcessCollector`).
+
+Para que el costo por petición sea mínimo, los hijos de cada métrica
+(combinación de etiquetas) se crean una sola vez y se reutilizan desde un
+diccionario; las métricas sin etiquetas se enlazan al crearse.
+"""
+
+import os
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .profiling import RequestProfile
+
+# Tiempo mínimo entre lecturas del estado del pool de conexiones (segundos)
+POOL_STATS_INTERVAL = 1.0
+
+# Estadísticas de `ConnectionPool.get_stats()` que se exponen como gauges
+POOL_STATS = {
+    "pool_size": "Conexiones abiertas por el pool.",
+    "pool_available": "Conexiones libres en el pool.",
+    "requests_waiting": "Peticiones esperando una conexión del pool.",
+}
+
+_metrics = None
+_metrics_lock = threading.Lock()
+# (cache, acierto) -> contador ya enlazado; vacío mientras las métricas estén desactivadas
+_cache_counters = {}
+
+
+def _prometheus():
+    try:
+        import prometheus_client
+    except ImportError as e:
+        raise ImproperlyConfigured(
+            "METRICS_ENABLED requiere el paquete prometheus_client (extra `money[metrics]`)."
+        ) from e
+    return prometheus_client
+
+
+class Metrics:
+    """Métricas de un proceso, con los hijos de cada combinación de etiquetas en caché."""
+
+    def __init__(self):
+        prometheus = _prometheus()
+        self.latency = prometheus.Histogram(
+            "money_http_request_duration_seconds",
+            "Latencia de las peticiones HTTP.",
+            ["view", "method", "status"],
+            buckets=settings.METRICS_LATENCY_BUCKETS,
+        )
+        self.in_progress = prometheus.Gauge(
+            "money_http_requests_in_progress",
+            "Peticiones HTTP en curso.",
+            multiprocess_mode="livesum",
+        )
+        self.db_queries = prometheus.Counter(
+            "money_db_queries", "Queries SQL ejecutadas.", ["view"]
+        )
+        self.db_time = prometheus.Counter(
+            "money_db_query_seconds", "Tiempo en la base de datos.", ["view"]
+        )
+        self.cache_requests = prometheus.Counter(
+            "money_cache_requests", "Lecturas de cachés de la aplicación.", ["cache", "result"]
+        )
+        self.pool = {
+            stat: prometheus.Gauge(
+                f"money_db_pool_{stat}", help_text, ["alias"], multiprocess_mode="livesum"
+            )
+            for stat, help_text in POOL_STATS.items()
+        }
+        self.worker_start = prometheus.Gauge(
+            "money_worker_start_time_seconds",
+            "Inicio de cada proceso que sirve la API (uno por worker vivo).",
+            multiprocess_mode="liveall",
+        )
+        self.gunicorn_workers = prometheus.Gauge(
+            "money_gunicorn_workers",
+            "Workers configurados en gunicorn.",
+            multiprocess_mode="livemax",
+        )
+
+        self._latency_children = {}
+        self._db_children = {}
+        self._pool_children = {}
+        self._pool_checked_at = 0.0
+
+        self.worker_start.set(time.time())
+        if os.environ.get("GUNICORN_WORKERS"):
+            self.gunicorn_workers.set(int(os.environ["GUNICORN_WORKERS"]))
+        for cache in ("account_list", "jwt_user", "fx_rate"):
+            _cache_counters[(cache, True)] = self.cache_requests.labels(cache, "hit")
+            _cache_counters[(cache, False)] = self.cache_requests.labels(cache, "miss")
+
+    def latency_for(self, view, method, status):
+        key = (view, method, status)
+        child = self._latency_children.get(key)
+        if child is None:
+            child = self._latency_children[key] = self.latency.labels(view, method, status)
+        return child
+
+    def db_for(self, view):
+        children = self._db_children.get(view)
+        if children is None:
+            children = self._db_children[view] = (
+                self.db_queries.labels(view),
+                self.db_time.labels(view),
+            )
+        return children
+
+    def update_pool_stats(self):
+        """Copia el estado de los pools de conexiones a los gauges (con límite de frecuencia)."""
+        now = time.monotonic()
+        if now - self._pool_checked_at < POOL_STATS_INTERVAL:
+            return
+        self._pool_checked_at = now
+        for connection in connections.all(initialized_only=True):
+            pool = getattr(connection, "pool", None)
+            if pool is None:
+                continue
+            stats = pool.get_stats()
+            for stat, gauge in self.pool.items():
+                key = (connection.alias, stat)
+                child = self._pool_children.get(key)
+                if child is None:
+                    child = self._pool_children[key] = gauge.labels(connection.alias)
+                child.set(stats.get(stat, 0))
+
+
+def get_metrics():
+    """Métricas del proceso (se crean en el primer uso)."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+
+def count_cache(cache, hit):
+    """Cuenta un acierto o fallo de `cache`; no hace nada con las métricas desactivadas."""
+    counter = _cache_counters.get((cache, hit))
+    if counter is not None:
+        counter.inc()
+
+
+class MetricsMiddleware:
+    """Registra latencia, peticiones en curso y queries de cada petición.
+
+    Va primero en `MIDDLEWARE` para medir la petición completa. Se desactiva
+    (`MiddlewareNotUsed`) si `METRICS_ENABLED` es False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.metrics = get_metrics()
+
+    def __call__(self, request):
+        metrics = self.metrics
+        profile = RequestProfile()
+        metrics.in_progress.inc()
+        start = time.perf_counter()
+        try:
+            # Solo la conexión "default": la única configurada
+            with connections["default"].execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            metrics.in_progress.dec()
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        metrics.latency_for(view, request.method, response.status_code).observe(duration)
+        if profile.queries:
+            queries, db_time = metrics.db_for(view)
+            queries.inc(profile.queries)
+            db_time.inc(profile.db_time)
+        metrics.update_pool_stats()
+        return response
+
+
+def metrics_view(request):
+    """Métricas en el formato de texto de Prometheus (agregadas entre procesos si aplica)."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not secrets.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        # Sin token solo se sirven en desarrollo: exponen rutas, volumen y latencias
+        return HttpResponseForbidden()
+
+    prometheus = _prometheus()
+    get_metrics()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = prometheus.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus.REGISTRY
+    return HttpResponse(
+        prometheus.generate_latest(registry), content_type=prometheus.CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,145 @@
+"""Perfilado de queries por petición (opcional, `QUERY_PROFILING`).
+
+`QueryProfilingMiddleware` mide en cada petición:
+
+- número de queries SQL y tiempo total en la base de datos (todas las
+  conexiones, vía `execute_wrapper`),
+- tiempo de render de la respuesta (el renderer de DRF, p. ej. JSON),
+- tiempo total de la vista y tamaño de la respuesta.
+
+Los tiempos se envían en el header `Server-Timing` (visibles en las DevTools
+del navegador) y cada petición se registra como una línea JSON en el logger
+`money.profiling`. Si la vista tiene un presupuesto de queries en
+`QUERY_BUDGETS` (por nombre de URL, p. ej. "account-list") y lo supera, se
+registra un warning; con `QUERY_BUDGET_STRICT` se lanza `QueryBudgetExceeded`,
+lo que hace fallar los tests que pasen por esa vista.
+
+Solo se cuentan los queries del hilo de la petición mientras se genera la
+respuesta: no se incluyen los de vistas async que corren en otros hilos
+(`sync_to_async`) ni los de respuestas streaming (p. ej. la exportación de
+registros), que se ejecutan al enviar el cuerpo.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("money.profiling")
+
+
+class QueryBudgetExceeded(Exception):
+    """Una vista ejecutó más queries que su presupuesto en `QUERY_BUDGETS`."""
+
+
+class RequestProfile:
+    """Acumula queries y tiempo de base de datos de una petición."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # `execute_wrapper`: se llama una vez por query
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def query_budget(method, view_name):
+    """Presupuesto de queries de una vista, o None si no tiene.
+
+    Las claves de `QUERY_BUDGETS` son el nombre de URL ("record-list") o el
+    método y el nombre ("POST record-list"), que tiene prioridad.
+    """
+    budgets = settings.QUERY_BUDGETS
+    return budgets.get(
+        f"{method} {view_name}", budgets.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+    )
+
+
+def _response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+def _server_timing(profile, total):
+    return ", ".join(
+        [
+            f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"',
+            f"render;dur={profile.render_time * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+    )
+
+
+class QueryProfilingMiddleware:
+    """Mide queries, tiempo de base de datos y de render de cada petición.
+
+    Se desactiva (`MiddlewareNotUsed`) si `QUERY_PROFILING` es False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        request._query_profile = profile
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            # Basta con instalar el wrapper: no abre la conexión si no se usa
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        response["Server-Timing"] = _server_timing(profile, total)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        budget = query_budget(request.method, view_name) if view_name else None
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "view": view_name,
+            "status": response.status_code,
+            "queries": profile.queries,
+            "db_ms": round(profile.db_time * 1000, 1),
+            "render_ms": round(profile.render_time * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "size": _response_size(response),
+            "budget": budget,
+        }
+        over_budget = budget is not None and profile.queries > budget
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(entry),
+            extra={"profile": entry},
+        )
+        if over_budget and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(
+                f"{view_name} ejecutó {profile.queries} queries (presupuesto: {budget})."
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Se llama justo antes de `response.render()` (DRF `Response`)
+        profile = request._query_profile
+        started = time.perf_counter()
+
+        def rendered(response):
+            profile.render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
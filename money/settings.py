@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import json
 import os
 from dotenv import load_dotenv
 
@@ -64,9 +65,13 @@ INSTALLED_APPS = [
     "accounts",
     "categories",
     "records",
+    "reports",
 ]
 
 MIDDLEWARE = [
+    # Solo activo con METRICS_ENABLED=True (ver money/metrics.py); primero para
+    # medir la petición completa
+    'money.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -76,6 +81,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Solo activo con QUERY_PROFILING=True (ver money/profiling.py)
+    'money.profiling.QueryProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'money.urls'
@@ -112,6 +119,47 @@ DATABASES = {
     }
 }
 
+# Pool de conexiones de psycopg por proceso (requiere el extra `money[pool]`);
+# su estado se expone en /metrics
+if os.environ.get("DATABASE_POOL", "False") == "True":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+        }
+    }
+
+
+# Hasher para contraseñas nuevas: "pbkdf2" (por defecto), "argon2" (requiere el
+# extra `money[argon2]`) o "scrypt". Los demás se mantienen para verificar hashes
+# existentes, que se rehacen con el elegido en el siguiente login.
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+}
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher
+    for hasher in (
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+    )
+    if hasher != PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]
+]
+
+# Signup y login async (users/views.py), pensados para correr bajo ASGI
+# (`uvicorn money.asgi:application`, extra `money[asgi]`). El hashing se hace en
+# un pool de AUTH_HASHING_WORKERS hilos con como mucho AUTH_HASHING_MAX_PENDING
+# operaciones en curso; por encima se responde 503.
+AUTH_ASYNC_ENDPOINTS = os.environ.get("AUTH_ASYNC_ENDPOINTS", "False") == "True"
+AUTH_HASHING_WORKERS = int(os.environ.get("AUTH_HASHING_WORKERS", os.cpu_count() or 1))
+AUTH_HASHING_MAX_PENDING = int(
+    os.environ.get("AUTH_HASHING_MAX_PENDING", AUTH_HASHING_WORKERS * 8)
+)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -160,10 +208,142 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
 }
 
+SIMPLE_JWT = {
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.TokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "users.tokens.TokenBlacklistSerializer",
+}
+
+# Filtro de Bloom por proceso delante de la blacklist de refresh tokens
+# (users/tokens.py): capacidad inicial, tasa de falsos positivos, cada cuántos
+# segundos se incorporan los tokens añadidos a la blacklist por otros procesos y
+# cuántos segundos hacia atrás se vuelven a leer en cada puesta al día
+TOKEN_BLACKLIST_BLOOM = os.environ.get("TOKEN_BLACKLIST_BLOOM", "False") == "True"
+TOKEN_BLACKLIST_BLOOM_CAPACITY = int(os.environ.get("TOKEN_BLACKLIST_BLOOM_CAPACITY", "1000000"))
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = float(os.environ.get("TOKEN_BLACKLIST_BLOOM_ERROR_RATE", "0.001"))
+TOKEN_BLACKLIST_BLOOM_REFRESH = int(os.environ.get("TOKEN_BLACKLIST_BLOOM_REFRESH", "5"))
+TOKEN_BLACKLIST_BLOOM_OVERLAP = int(os.environ.get("TOKEN_BLACKLIST_BLOOM_OVERLAP", "60"))
+
+# Usuarios autenticados por JWT que cada proceso mantiene en memoria (LRU) y
+# segundos que vive cada uno (0 = leer el usuario de la base en cada petición)
+JWT_USER_CACHE_SIZE = int(os.environ.get("JWT_USER_CACHE_SIZE", "10000"))
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", "30"))
+
+# Moneda por defecto de cuentas y registros (código ISO 4217)
+DEFAULT_CURRENCY_CODE = os.environ.get("DEFAULT_CURRENCY_CODE", "COP")
+
+# Segundos que cada proceso mantiene el catálogo de monedas en memoria (0 = sin vencimiento)
+CURRENCY_REGISTRY_TTL = int(os.environ.get("CURRENCY_REGISTRY_TTL", "300"))
+
+# Segundos que los clientes pueden reutilizar el catálogo de monedas sin revalidar
+CURRENCY_CACHE_MAX_AGE = int(os.environ.get("CURRENCY_CACHE_MAX_AGE", "3600"))
+
+# Cuentas y categorías que se crean a cada usuario al registrarse (users/provisioning.py).
+# `currency` es opcional; por defecto se usa DEFAULT_CURRENCY_CODE.
+DEFAULT_ACCOUNTS = [
+    {"name": "Cash", "description": "Cuenta de efectivo"},
+]
+DEFAULT_CATEGORIES = [
+    {"name": "Transporte", "description": "Categoría para gastos en transporte"},
+    {"name": "Salud", "description": "Categoría para gastos en salud"},
+    {
+        "name": "Entretenimiento",
+        "description": "Categoría para gastos en entretenimiento",
+    },
+    {"name": "Mascotas", "description": "Categoría para gastos en mascotas"},
+    {"name": "Educación", "description": "Categoría para gastos en educación"},
+]
+
+# Cómo se calcula el balance de las cuentas en la API (ver accounts/balances.py):
+# "ledger" (balance materializado), "subquery", "conditional" o "checkpoint"
+BALANCE_ENGINE = os.environ.get("BALANCE_ENGINE", "ledger")
+
+# Caché de Django: memoria local por defecto, Redis si se define REDIS_URL
+# (requiere el paquete `redis`, extra opcional `money[redis]`)
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Alias de CACHES y segundos de vida del listado de cuentas cacheado por usuario
+ACCOUNT_LIST_CACHE = os.environ.get("ACCOUNT_LIST_CACHE", "default")
+ACCOUNT_LIST_CACHE_TTL = int(os.environ.get("ACCOUNT_LIST_CACHE_TTL", "600"))
+
+# Moneda contra la que se guardan los tipos de cambio (currencies.ExchangeRate) y
+# segundos que cada proceso mantiene en memoria las tasas ya consultadas
+FX_BASE_CURRENCY = os.environ.get("FX_BASE_CURRENCY", "USD")
+FX_RATE_CACHE_TTL = int(os.environ.get("FX_RATE_CACHE_TTL", "300"))
+
+# Máximo de registros por solicitud en POST /api/records/bulk/
+RECORDS_BULK_MAX_ROWS = int(os.environ.get("RECORDS_BULK_MAX_ROWS", "5000"))
+
+# Filas leídas por bloque del cursor al exportar registros (GET /api/records/export/)
+RECORDS_EXPORT_CHUNK_SIZE = int(os.environ.get("RECORDS_EXPORT_CHUNK_SIZE", "2000"))
+
+# Perfilado de queries por petición (ver money/profiling.py): header
+# Server-Timing y una línea JSON por petición en el logger "money.profiling"
+QUERY_PROFILING = os.environ.get("QUERY_PROFILING", "False") == "True"
+# Máximo de queries por vista (nombre de URL, o "MÉTODO nombre" para un solo
+# método) con QUERY_PROFILING activo; se puede sobrescribir con un JSON en QUERY_BUDGETS. Al superarlo se registra un
+# warning y, con QUERY_BUDGET_STRICT=True (p. ej. en tests), la petición falla. Medidos en PostgreSQL:
+# en otros motores los rollups se escriben con un query por bucket.
+QUERY_BUDGETS = {
+    "account-list": 6,
+    "account-detail": 6,
+    "category-list": 4,
+    "category-detail": 4,
+    "currency-list": 2,
+    "currency-detail": 2,
+    "record-list": 6,
+    "record-detail": 6,
+    "POST record-list": 14,
+    "PUT record-detail": 16,
+    "PATCH record-detail": 16,
+    "token_obtain_pair": 4,
+    "token_refresh": 4,
+}
+QUERY_BUDGETS.update(json.loads(os.environ.get("QUERY_BUDGETS", "{}")))
+# Presupuesto de las vistas que no están en QUERY_BUDGETS (sin límite si está vacío)
+QUERY_BUDGET_DEFAULT = (
+    int(os.environ["QUERY_BUDGET_DEFAULT"]) if os.environ.get("QUERY_BUDGET_DEFAULT") else None
+)
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "False") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # Cada mensaje ya es una línea JSON
+        "money.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Métricas Prometheus en /metrics (ver money/metrics.py; requiere el extra
+# `money[metrics]`). Con varios workers de gunicorn, definir también
+# PROMETHEUS_MULTIPROC_DIR: un directorio compartido que se vacía al arrancar.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "False") == "True"
+# /metrics exige "Authorization: Bearer <METRICS_TOKEN>"; sin token responde 403
+# salvo con DEBUG
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Límites (segundos) de los buckets del histograma de latencia
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Money API",
     "DESCRIPTION": "API documentation for the Money App",
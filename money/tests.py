@@ -0,0 +1,52 @@
+import os
+import tempfile
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .metrics import metrics_view
+
+
+@skipUnless(find_spec("prometheus_client"), "Requiere el extra `money[metrics]`")
+class MetricsViewTests(SimpleTestCase):
+    def get(self, **headers):
+        return metrics_view(RequestFactory().get("/metrics", headers=headers))
+
+    @override_settings(METRICS_TOKEN="secreto", DEBUG=False)
+    def test_token_is_required(self):
+        self.assertEqual(self.get().status_code, 403)
+        self.assertEqual(self.get(authorization="Bearer otro").status_code, 403)
+
+        response = self.get(authorization="Bearer secreto")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"money_http_requests_in_progress", response.content)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_without_token_is_forbidden_outside_debug(self):
+        self.assertEqual(self.get().status_code, 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_without_token_is_open_in_debug(self):
+        self.assertEqual(self.get().status_code, 200)
+
+    @override_settings(METRICS_TOKEN="secreto")
+    def test_multiprocess_collector_aggregates_the_shared_directory(self):
+        import prometheus_client
+        from prometheus_client import multiprocess
+
+        patcher = mock.patch.object(
+            multiprocess, "MultiProcessCollector", wraps=multiprocess.MultiProcessCollector
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                with patcher as collector:
+                    response = self.get(authorization="Bearer secreto")
+
+        self.assertEqual(response.status_code, 200)
+        collector.assert_called_once()
+        registry = collector.call_args.args[0]
+        self.assertIsInstance(registry, prometheus_client.CollectorRegistry)
+        self.assertIsNot(registry, prometheus_client.REGISTRY)
+        # Los valores en memoria de este proceso no se leen del registro global
+        self.assertNotIn(b"money_worker_start_time_seconds", response.content)
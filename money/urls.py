@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
@@ -23,11 +24,17 @@ from rest_framework_simplejwt.views import (
     TokenBlacklistView,
 )
 
+from users.views import token_obtain_async
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("docs/", include("docs.urls")),
     path("api/auth/", include("users.urls")),
-    path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        "api/token/",
+        token_obtain_async if settings.AUTH_ASYNC_ENDPOINTS else TokenObtainPairView.as_view(),
+        name="token_obtain_pair",
+    ),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("api/token/blacklist/", TokenBlacklistView.as_view(), name="token_blacklist"),
@@ -35,4 +42,11 @@ urlpatterns = [
     path("api/currencies/", include("currencies.urls")),
     path("api/accounts/", include("accounts.urls")),
     path("api/records/", include("records.urls")),
-]
\ No newline at end of file
+    path("api/reports/", include("reports.urls")),
+]
+
+if settings.METRICS_ENABLED:
+    from .metrics import metrics_view
+
+    # Sin barra final: es la ruta por defecto de Prometheus
+    urlpatterns.append(path("metrics", metrics_view, name="metrics"))
@@ -0,0 +1,111 @@
+"""Bulk creation of records with batched validation."""
+
+from django.db import transaction
+from rest_framework import serializers
+
+from accounts.models import Account
+from categories.models import Category
+from currencies.registry import currency_registry
+
+from .models import Record
+from .serializers import RecordImportSerializer, validate_record_accounts
+from .signals import records_changed
+
+
+def _ids(rows, field):
+    return {row[field] for row in rows if row and row.get(field) is not None}
+
+
+def build_records(user, rows):
+    """Validate import rows and build unsaved `Record` instances.
+
+    Field validation runs in memory for every row; then all referenced
+    accounts and categories are fetched with one query each, and currencies
+    are checked against the in-memory `currency_registry`.
+    Returns `(records, errors)` where `errors` is a list of
+    `{"row": index, "errors": {...}}` (empty when every row is valid).
+    """
+    valid_rows = []
+    row_errors = {}
+    for index, row in enumerate(rows):
+        serializer = RecordImportSerializer(data=row)
+        if serializer.is_valid():
+            valid_rows.append(serializer.validated_data)
+        else:
+            valid_rows.append(None)
+            row_errors[index] = serializer.errors
+
+    account_ids = _ids(valid_rows, "account_id") | _ids(valid_rows, "from_account_id") | _ids(
+        valid_rows, "to_account_id"
+    )
+    accounts = Account.objects.filter(user=user).in_bulk(account_ids)
+    categories = Category.objects.filter(user=user).in_bulk(_ids(valid_rows, "category_id"))
+    currencies = currency_registry.all() or {}
+
+    records = []
+    errors = []
+    for index, row in enumerate(valid_rows):
+        if row is None:
+            errors.append({"row": index, "errors": row_errors[index]})
+            continue
+        try:
+            records.append(_build_record(user, row, accounts, categories, currencies))
+        except serializers.ValidationError as exc:
+            errors.append({"row": index, "errors": exc.detail})
+    return records, errors
+
+
+def _lookup(objects, pk, field, message):
+    if pk is None:
+        return None
+    obj = objects.get(pk)
+    if obj is None:
+        raise serializers.ValidationError({field: message})
+    return obj
+
+
+def _build_record(user, row, accounts, categories, currencies):
+    account_message = "La cuenta no existe o no pertenece al usuario autenticado."
+    data = {
+        "account": _lookup(accounts, row.get("account_id"), "account_id", account_message),
+        "from_account": _lookup(
+            accounts, row.get("from_account_id"), "from_account_id", account_message
+        ),
+        "to_account": _lookup(accounts, row.get("to_account_id"), "to_account_id", account_message),
+        "typeRecord": row["typeRecord"],
+    }
+    category = _lookup(
+        categories,
+        row.get("category_id"),
+        "category_id",
+        "La categoría no existe o no pertenece al usuario autenticado.",
+    )
+    currency = _lookup(currencies, row["currency"], "currency", "Moneda inválida.")
+    validate_record_accounts(data, user)
+    return Record(
+        user=user,
+        title=row["title"],
+        description=row.get("description", ""),
+        amount=row["amount"],
+        account=data["account"],
+        from_account=data["from_account"],
+        to_account=data["to_account"],
+        typeRecord=row["typeRecord"],
+        category=category,
+        paymentType=row["paymentType"],
+        currency=currency,
+        date_time=row.get("date_time"),
+    )
+
+
+def create_records(records, batch_size=1000):
+    """Insert records with `bulk_create` and update derived data in one transaction.
+
+    `bulk_create` skips model signals, so `records_changed` is sent once for
+    the whole batch; the balance ledger and rollups aggregate it into a few
+    UPDATEs instead of one per record.
+    """
+    with transaction.atomic():
+        created = Record.objects.bulk_create(records, batch_size=batch_size)
+        records_changed.send(sender=Record, changes=[(None, record) for record in created])
+    return created
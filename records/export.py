@@ -0,0 +1,92 @@
+"""Streaming export of records as CSV or NDJSON."""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+# Flat columns of the export; related objects are exported as id + name
+EXPORT_FIELDS = [
+    "id",
+    "date_time",
+    "title",
+    "description",
+    "amount",
+    "typeRecord",
+    "paymentType",
+    "currency_id",
+    "account_id",
+    "account__name",
+    "from_account_id",
+    "from_account__name",
+    "to_account_id",
+    "to_account__name",
+    "category_id",
+    "category__name",
+    "created_at",
+    "updated_at",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose `write` returns the value, for `csv.writer`."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size):
+    """Iterate the export columns with a server-side cursor, `chunk_size` rows at a time."""
+    return queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(
+            ["" if row[field] is None else _csv_value(row[field]) for field in EXPORT_FIELDS]
+        )
+
+
+def _csv_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """Lets `Accept: text/csv` (or `?format=csv`) through content negotiation.
+
+    The export view streams its own body; this renderer is only used for
+    error responses, which are written as JSON.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+
+
+class NDJSONStreamRenderer(CSVStreamRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
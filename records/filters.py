@@ -0,0 +1,121 @@
+import datetime
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters
+
+# Text search configuration used by the `search_vector` trigger (migration 0008)
+SEARCH_CONFIG = "spanish"
+
+
+def to_utc(dt):
+    # dt is a datetime; return timezone-aware UTC datetime
+    if timezone.is_naive(dt):
+        # assume current server timezone if naive
+        aware = timezone.make_aware(dt, timezone.get_current_timezone())
+    else:
+        aware = dt
+    return aware.astimezone(datetime.timezone.utc)
+
+
+def start_of_day(day, tz=None):
+    """First instant of `day` in `tz` (default: the active timezone), as an aware datetime.
+
+    Each midnight is localized on its own (instead of adding 24h to the previous
+    one) so days with a DST change keep their real length.
+    """
+    midnight = datetime.datetime.combine(day, datetime.time.min)
+    return timezone.make_aware(midnight, tz or timezone.get_current_timezone())
+
+
+def day_range(day, tz=None):
+    """Half-open `[start, end)` range covering `day` in `tz` (default: the active timezone)."""
+    return start_of_day(day, tz), start_of_day(day + datetime.timedelta(days=1), tz)
+
+
+def filter_records(queryset, params):
+    """Apply the `typeRecord`, `date`, `date_from` and `date_to` query params.
+
+    Date filters accept YYYY-MM-DD or full ISO datetimes with timezone. Dates are
+    turned into half-open `date_time` ranges computed here, instead of
+    `date_time__date` lookups, so the database can use a range scan on the
+    `date_time` index instead of casting every row. Results match the
+    `__date` semantics (day boundaries in the active timezone).
+
+    A full datetime in `date` selects its calendar day in the caller's own
+    offset (e.g. `2025-12-14T22:00:00-05:00` is Dec 14 from 00:00 to 24:00 at
+    -05:00); a naive one uses the active timezone. In `date_from`/`date_to` a
+    datetime is an exact (inclusive) instant.
+    """
+    # Filter by typeRecord exact match
+    type_record = params.get("typeRecord")
+    if type_record:
+        queryset = queryset.filter(typeRecord=type_record)
+
+    date = params.get("date")
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+
+    if date:
+        # try YYYY-MM-DD first
+        parsed_date = parse_date(date)
+        day_tz = None
+        if not parsed_date:
+            # try full ISO datetime: its calendar day in its own offset
+            parsed_dt = parse_datetime(date)
+            if parsed_dt:
+                parsed_date = parsed_dt.date()
+                day_tz = parsed_dt.tzinfo
+        if parsed_date:
+            start, end = day_range(parsed_date, day_tz)
+            queryset = queryset.filter(date_time__gte=start, date_time__lt=end)
+
+    if date_from:
+        # accept date or full datetime
+        parsed_date = parse_date(date_from)
+        if parsed_date:
+            queryset = queryset.filter(date_time__gte=start_of_day(parsed_date))
+        else:
+            parsed_dt = parse_datetime(date_from)
+            if parsed_dt:
+                queryset = queryset.filter(date_time__gte=to_utc(parsed_dt))
+
+    if date_to:
+        parsed_date = parse_date(date_to)
+        if parsed_date:
+            # the whole `date_to` day is included
+            _, end = day_range(parsed_date)
+            queryset = queryset.filter(date_time__lt=end)
+        else:
+            parsed_dt = parse_datetime(date_to)
+            if parsed_dt:
+                queryset = queryset.filter(date_time__lte=to_utc(parsed_dt))
+
+    return queryset
+
+
+class RecordSearchFilter(filters.SearchFilter):
+    """`search` backed by PostgreSQL full-text search.
+
+    On PostgreSQL the terms are parsed with `websearch_to_tsquery` (quotes,
+    `OR`, `-term`) against the GIN-indexed `search_vector`, using the Spanish
+    configuration so "compras" matches "Compra supermercado", and results are
+    ordered by rank (title weighs more than description), newest first on ties.
+    Other databases (e.g. SQLite in local tests) fall back to the default
+    `icontains` search over `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms or connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "-date_time", "-created_at")
+        )
@@ -0,0 +1,120 @@
+"""Documenta los planes de ejecución de los queries calientes sobre `Record`.
+
+Cada query lleva los índices de `Record.Meta.indexes` que debería usar. En
+PostgreSQL con datos reales se espera:
+
+- listado por usuario (con o sin rango de fechas, y la paginación por cursor):
+  Index Scan sobre `record_user_date_idx`, sin Sort (el índice ya da el orden).
+- listado filtrado por `typeRecord`: Index Scan sobre `record_user_type_date_idx`.
+- balances (`annotate_balance`): una subquery por componente, resuelta con
+  Index Only Scan sobre `record_account_type_idx`, `record_transfer_from_idx`
+  y `record_transfer_to_idx` (todos incluyen `amount`).
+- balances desde checkpoints (`annotate_balance_checkpoint`): los mismos
+  índices, con un range scan sobre la fecha contable desde el último checkpoint.
+
+Con tablas pequeñas el planner puede preferir un Seq Scan; usar `--analyze`
+sobre una base con volumen representativo.
+"""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.balances import annotate_balance, annotate_balance_checkpoint
+from accounts.models import Account
+from records.models import Record
+from records.pagination import RecordKeysetPagination
+
+LIST_ORDERING = ("-date_time", "-created_at")
+
+
+def hot_queries(user):
+    """Devuelve `(nombre, queryset, índices esperados)` para los queries calientes."""
+    records = Record.objects.filter(user=user)
+    now = timezone.now()
+    position = RecordKeysetPagination.position_filter(now, now, 2**62)
+    return [
+        ("listado", records.order_by(*LIST_ORDERING)[:10], ["record_user_date_idx"]),
+        (
+            "listado por typeRecord",
+            records.filter(typeRecord="expense").order_by(*LIST_ORDERING)[:10],
+            ["record_user_type_date_idx"],
+        ),
+        (
+            "rango de fechas",
+            records.filter(
+                date_time__gte=now - datetime.timedelta(days=30), date_time__lt=now
+            ).order_by(*LIST_ORDERING)[:10],
+            ["record_user_date_idx"],
+        ),
+        (
+            "página por cursor",
+            records.filter(position).order_by(*RecordKeysetPagination.ordering)[:10],
+            ["record_user_date_idx"],
+        ),
+        (
+            "balances (annotate_balance)",
+            annotate_balance(Account.objects.filter(user=user)),
+            ["record_account_type_idx", "record_transfer_from_idx", "record_transfer_to_idx"],
+        ),
+        (
+            "balances desde checkpoints",
+            annotate_balance_checkpoint(Account.objects.filter(user=user)),
+            ["record_account_type_idx", "record_transfer_from_idx", "record_transfer_to_idx"],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Muestra el EXPLAIN de los queries calientes de records y verifica qué índices usan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username a usar (por defecto, el que más registros tenga).")
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Ejecutar los queries (EXPLAIN ANALYZE, solo PostgreSQL).",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Terminar con error si algún query no usa los índices esperados.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+        else:
+            top = (
+                Record.objects.values("user")
+                .annotate(total=Count("id"))
+                .order_by("-total")
+                .first()
+            )
+            user = User.objects.filter(pk=top["user"]).first() if top else None
+        if user is None:
+            raise CommandError("No hay un usuario con registros para analizar.")
+
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+
+        missing = 0
+        for name, queryset, expected in hot_queries(user):
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(plan)
+            for index in expected:
+                if index in plan:
+                    self.stdout.write(self.style.SUCCESS(f"   usa {index}"))
+                else:
+                    missing += 1
+                    self.stdout.write(self.style.WARNING(f"   no usa {index}"))
+
+        if missing and options["strict"]:
+            raise CommandError(f"{missing} índices esperados no aparecen en los planes.")
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:05
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from money.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Los índices se crean con CONCURRENTLY para no bloquear las escrituras en
+    # records_record mientras se construyen, y eso no puede ir en una transacción
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0004_accountbalance'),
+        ('categories', '0002_alter_category_options'),
+        ('currencies', '0001_initial'),
+        ('records', '0006_alter_record_account'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='record',
+            index=models.Index(fields=['user', '-date_time', '-created_at', '-id'], name='record_user_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='record',
+            index=models.Index(fields=['user', 'typeRecord', '-date_time', '-created_at'], name='record_user_type_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='record',
+            index=models.Index(models.F('account'), models.F('typeRecord'), django.db.models.functions.comparison.Coalesce('date_time', 'created_at'), condition=models.Q(('account__isnull', False)), include=('amount',), name='record_account_type_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='record',
+            index=models.Index(models.F('from_account'), django.db.models.functions.comparison.Coalesce('date_time', 'created_at'), condition=models.Q(('typeRecord', 'transfer')), include=('amount',), name='record_transfer_from_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='record',
+            index=models.Index(models.F('to_account'), django.db.models.functions.comparison.Coalesce('date_time', 'created_at'), condition=models.Q(('typeRecord', 'transfer')), include=('amount',), name='record_transfer_to_idx'),
+        ),
+        # El índice simple de user se elimina cuando ya existe record_user_date_idx
+        migrations.AlterField(
+            model_name='record',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='records', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
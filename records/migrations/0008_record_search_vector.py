@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Debe coincidir con records.filters.SEARCH_CONFIG
+SEARCH_DOCUMENT = """
+    setweight(to_tsvector('pg_catalog.spanish', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.spanish', coalesce({row}.description, '')), 'B')
+"""
+
+CREATE_SEARCH_SQL = [
+    f"""
+    CREATE FUNCTION records_record_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_DOCUMENT.format(row="NEW")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER records_record_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON records_record
+    FOR EACH ROW EXECUTE FUNCTION records_record_search_vector_update();
+    """,
+    f"UPDATE records_record SET search_vector = {SEARCH_DOCUMENT.format(row='records_record')};",
+    "CREATE INDEX record_search_vector_idx ON records_record USING gin (search_vector);",
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS record_search_vector_idx;",
+    "DROP TRIGGER IF EXISTS records_record_search_vector_trigger ON records_record;",
+    "DROP FUNCTION IF EXISTS records_record_search_vector_update();",
+]
+
+
+def _run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        # El trigger y el índice GIN solo existen en PostgreSQL
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0007_alter_record_user_record_record_user_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='record',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _run_on_postgresql(CREATE_SEARCH_SQL), _run_on_postgresql(DROP_SEARCH_SQL)
+        ),
+    ]
@@ -1,11 +1,14 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import F
+from django.db.models.functions import Coalesce
 
 
 def get_default_currency():
-    from currencies.models import Currency
+    from currencies.registry import currency_registry
 
-    return Currency.objects.get(code="COP").code
+    return currency_registry.default_code()
 
 
 class Record(models.Model):
@@ -22,7 +25,10 @@ class Record(models.Model):
         ("cash", "Cash"),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="records")
+    # Sin índice propio: `record_user_date_idx` empieza por `user`
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="records", db_index=False
+    )
     title = models.CharField(max_length=200)
     description = models.TextField(
         blank=True, null=False, default=""
@@ -61,9 +67,59 @@ class Record(models.Model):
     date_time = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Documento de full-text search (title + description). En PostgreSQL lo
+    # mantiene un trigger y lo indexa `record_search_vector_idx` (GIN), ver
+    # la migración 0008; en otros motores queda vacío.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Listado: filtra por usuario (y rango de `date_time`) y ordena por
+            # `-date_time, -created_at, -id`; cubre también la paginación por cursor.
+            models.Index(
+                fields=["user", "-date_time", "-created_at", "-id"],
+                name="record_user_date_idx",
+            ),
+            # Listado filtrado por `typeRecord`
+            models.Index(
+                fields=["user", "typeRecord", "-date_time", "-created_at"],
+                name="record_user_type_date_idx",
+            ),
+            # Subqueries de balance: ingresos/gastos por `account` + `typeRecord`,
+            # con `amount` incluido para resolver la suma con index-only scans.
+            # La fecha contable (`COALESCE(date_time, created_at)`) al final
+            # permite sumar solo los registros posteriores a un checkpoint de
+            # balance con un range scan (ver `accounts.balances`).
+            models.Index(
+                F("account"),
+                F("typeRecord"),
+                Coalesce("date_time", "created_at"),
+                include=["amount"],
+                condition=models.Q(account__isnull=False),
+                name="record_account_type_idx",
+            ),
+            models.Index(
+                F("from_account"),
+                Coalesce("date_time", "created_at"),
+                include=["amount"],
+                condition=models.Q(typeRecord="transfer"),
+                name="record_transfer_from_idx",
+            ),
+            models.Index(
+                F("to_account"),
+                Coalesce("date_time", "created_at"),
+                include=["amount"],
+                condition=models.Q(typeRecord="transfer"),
+                name="record_transfer_to_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title} ({self.amount})"
+
+    def save(self, *args, **kwargs):
+        # Los receptores de `records_changed` (p. ej. el ledger de balances)
+        # deben confirmarse o revertirse junto con el registro.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
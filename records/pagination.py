@@ -0,0 +1,148 @@
+import base64
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardResultsSetPagination(LimitOffsetPagination):
+    default_limit = 10
+    max_limit = 100
+
+
+class RecordKeysetPagination(BasePagination):
+    """Paginación por cursor (keyset) para scroll infinito.
+
+    - Ordena por `(-date_time, -created_at, -id)`; los registros sin `date_time`
+      van primero, igual que el orden por defecto de PostgreSQL para `DESC`.
+    - El cursor codifica la posición del último elemento de la página, así que
+      cada página es un range scan sobre el índice en lugar de un `OFFSET n`.
+    - Solo avanza (`next`); el total (`count`) se calcula únicamente si se pide
+      con `?count=true`.
+    - No admite `search`: el orden por relevancia no se puede continuar con
+      un cursor sobre la fecha, así que se responde 400 en lugar de perderlo.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+    default_page_size = 10
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    ordering = (F("date_time").desc(nulls_first=True), "-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if request.query_params.get(api_settings.SEARCH_PARAM, "").strip():
+            raise ValidationError(
+                {api_settings.SEARCH_PARAM: ["La búsqueda no admite paginación por cursor."]}
+            )
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true", "True"):
+            self.count = queryset.count()
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(*position))
+
+        # Pedir un elemento extra para saber si hay página siguiente sin contar
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[: self.page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor devuelto en `next` por la página anterior.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Incluir el total de resultados (cuesta un COUNT).",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        if page_size <= 0:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # El total solo se pide una vez; las páginas siguientes no lo recalculan
+        url = remove_query_param(self.request.build_absolute_uri(), self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def encode_cursor(self, record):
+        position = {
+            "d": record.date_time.isoformat() if record.date_time else None,
+            "c": record.created_at.isoformat(),
+            "i": record.pk,
+        }
+        raw = json.dumps(position, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            position = json.loads(raw)
+            date_time = parse_datetime(position["d"]) if position["d"] else None
+            created_at = parse_datetime(position["c"])
+            pk = int(position["i"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None or (position["d"] and date_time is None):
+            raise NotFound(self.invalid_cursor_message)
+        return date_time, created_at, pk
+
+    @staticmethod
+    def position_filter(date_time, created_at, pk):
+        """Condición "después de la posición" para el orden de `ordering`."""
+        same_date_after = Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        if date_time is None:
+            return Q(date_time__isnull=False) | (Q(date_time__isnull=True) & same_date_after)
+        # `date_time__lte` acota el range scan; el OR desempata dentro de la misma fecha
+        return Q(date_time__lte=date_time) & (Q(date_time__lt=date_time) | same_date_after)
@@ -0,0 +1,29 @@
+import codecs
+import csv
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class RecordCSVParser(BaseParser):
+    """Parse a CSV body (with header row) into a list of dicts.
+
+    Empty cells are dropped so optional fields fall back to their defaults.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if stream is None:
+            return []
+        try:
+            reader = csv.DictReader(codecs.iterdecode(stream, encoding))
+            return [
+                {key: value for key, value in row.items() if key and value not in ("", None)}
+                for row in reader
+            ]
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f"CSV inválido: {exc}")
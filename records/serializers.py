@@ -3,7 +3,7 @@ from categories.serializers import CategorySerializer
 from .models import Record
 from accounts.models import Account
 from categories.models import Category
-from currencies.models import Currency
+from currencies.serializers import CurrencyField
 from accounts.serializers import AccountSerializer
 
 
@@ -50,9 +50,7 @@ class RecordSerializer(serializers.ModelSerializer):
         allow_null=True,
         required=False,
     )
-    currency = serializers.PrimaryKeyRelatedField(
-        queryset=Currency.objects.all(), required=True
-    )
+    currency = CurrencyField(required=True)
 
     class Meta:
         model = Record
@@ -83,55 +81,85 @@ class RecordSerializer(serializers.ModelSerializer):
         """Ensure the account belongs to the authenticated user."""
         request = self.context.get("request")
         if request and hasattr(request, "user"):
-            user = request.user
-            account = data.get("account")
-            from_account = data.get("from_account")
-            to_account = data.get("to_account")
-            type_record = data.get("typeRecord")
-
-            # For transfer records, require from_account and to_account
-            if type_record == "transfer":
-                if not from_account or not to_account:
-                    raise serializers.ValidationError(
-                        {
-                            "typeRecord": "Para transferencias, se requieren from_account_id y to_account_id."
-                        }
-                    )
-                if from_account == to_account:
-                    raise serializers.ValidationError(
-                        {
-                            "to_account": "La cuenta de origen y destino no pueden ser la misma."
-                        }
-                    )
-                # Validate both accounts belong to the user
-                if getattr(from_account, "user", None) != user:
-                    raise serializers.ValidationError(
-                        {
-                            "from_account": "La cuenta de origen debe pertenecer al usuario autenticado."
-                        }
-                    )
-                if getattr(to_account, "user", None) != user:
-                    raise serializers.ValidationError(
-                        {
-                            "to_account": "La cuenta de destino debe pertenecer al usuario autenticado."
-                        }
-                    )
-                
-                # In transfer records, assign account to None
-                if account is not None:
-                    data["account"] = None
-                    
-            else:
-                # For non-transfer records, require account
-                if not account:
-                    raise serializers.ValidationError(
-                        {
-                            "account": "Se requiere account_id para registros que no son transferencias."
-                        }
-                    )
-                # account may be provided on create/update
-                if getattr(account, "user", None) != user:
-                    raise serializers.ValidationError(
-                        {"account": "La cuenta debe pertenecer al usuario autenticado."}
-                    )
+            validate_record_accounts(data, request.user)
         return data
+
+
+def validate_record_accounts(data, user):
+    """Check the accounts of a record against its type and owner.
+
+    `data` holds `Account` instances (or None) under `account`, `from_account`
+    and `to_account`. Raises `ValidationError`; for transfers `account` is cleared.
+    Ownership is compared by `user_id` so no account needs its user loaded.
+    """
+    account = data.get("account")
+    from_account = data.get("from_account")
+    to_account = data.get("to_account")
+    type_record = data.get("typeRecord")
+
+    # For transfer records, require from_account and to_account
+    if type_record == "transfer":
+        if not from_account or not to_account:
+            raise serializers.ValidationError(
+                {
+                    "typeRecord": "Para transferencias, se requieren from_account_id y to_account_id."
+                }
+            )
+        if from_account == to_account:
+            raise serializers.ValidationError(
+                {
+                    "to_account": "La cuenta de origen y destino no pueden ser la misma."
+                }
+            )
+        # Validate both accounts belong to the user
+        if getattr(from_account, "user_id", None) != user.pk:
+            raise serializers.ValidationError(
+                {
+                    "from_account": "La cuenta de origen debe pertenecer al usuario autenticado."
+                }
+            )
+        if getattr(to_account, "user_id", None) != user.pk:
+            raise serializers.ValidationError(
+                {
+                    "to_account": "La cuenta de destino debe pertenecer al usuario autenticado."
+                }
+            )
+
+        # In transfer records, assign account to None
+        if account is not None:
+            data["account"] = None
+
+    else:
+        # For non-transfer records, require account
+        if not account:
+            raise serializers.ValidationError(
+                {
+                    "account": "Se requiere account_id para registros que no son transferencias."
+                }
+            )
+        # account may be provided on create/update
+        if getattr(account, "user_id", None) != user.pk:
+            raise serializers.ValidationError(
+                {"account": "La cuenta debe pertenecer al usuario autenticado."}
+            )
+    return data
+
+
+class RecordImportSerializer(serializers.Serializer):
+    """One row of a bulk import.
+
+    Related objects are plain ids here; `records.bulk` resolves them for the
+    whole batch at once instead of one lookup per row and field.
+    """
+
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    account_id = serializers.IntegerField(required=False, allow_null=True)
+    from_account_id = serializers.IntegerField(required=False, allow_null=True)
+    to_account_id = serializers.IntegerField(required=False, allow_null=True)
+    typeRecord = serializers.ChoiceField(choices=Record.RECORD_TYPES)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+    paymentType = serializers.ChoiceField(choices=Record.PAYMENT_TYPES)
+    currency = serializers.CharField(max_length=3)
+    date_time = serializers.DateTimeField(required=False, allow_null=True)
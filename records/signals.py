@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Record
+
+# Se emite después de cualquier escritura de registros con `changes`: una lista de
+# tuplas `(anterior, actual)`. `anterior` es None en altas y `actual` es None en bajas.
+# Los receptores (ledger de balances, etc.) corren dentro de la misma transacción.
+records_changed = Signal()
+
+
+def _locked_state(instance):
+    # Estado confirmado de la fila, bloqueada hasta el final de la transacción:
+    # una escritura concurrente del mismo registro espera aquí y después lee
+    # el estado que dejó la primera, así que nunca se revierte dos veces el
+    # mismo estado. None si la fila ya no existe.
+    return Record.objects.select_for_update().filter(pk=instance.pk).first()
+
+
+@receiver(pre_save, sender=Record, weak=False)
+def remember_previous_state(sender, instance, **kwargs):
+    # Guardar el estado persistido para poder revertir su efecto al actualizar
+    # (`Record.save` abre la transacción que mantiene el bloqueo)
+    instance._previous_state = _locked_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Record, weak=False)
+def notify_record_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, "_previous_state", None)
+    instance._previous_state = None
+    records_changed.send(sender=Record, changes=[(previous, instance)])
+
+
+@receiver(pre_delete, sender=Record, weak=False)
+def remember_deleted_state(sender, instance, **kwargs):
+    # El borrado corre dentro de la transacción del `Collector`. Se revierte el
+    # estado confirmado (no el de la instancia en memoria, que puede ser viejo)
+    instance._previous_state = _locked_state(instance)
+
+
+@receiver(post_delete, sender=Record, weak=False)
+def notify_record_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_state", None)
+    instance._previous_state = None
+    # Si otra transacción ya borró la fila, este borrado no eliminó nada
+    if previous is None:
+        return
+    records_changed.send(sender=Record, changes=[(previous, None)])
@@ -1,3 +1,595 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import re
+import zoneinfo
+from decimal import Decimal
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.balances import find_balance_mismatches
+from accounts.models import Account, AccountBalance
+from categories.models import Category
+from currencies.models import Currency
+from currencies.registry import currency_registry
+from money.profiling import QueryBudgetExceeded
+from reports.models import RecordRollup
+from reports.rollups import rebuild_rollups
+
+from .export import EXPORT_FIELDS
+from .filters import SEARCH_CONFIG, filter_records
+from .models import Record
+from .pagination import RecordKeysetPagination
+
+
+class RecordTestCase(TestCase):
+    """Usuario con dos cuentas, una categoría y un cliente autenticado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("records", password="x")
+        cls.cash = Account.objects.create(user=cls.user, name="Caja", currency_id="COP")
+        cls.bank = Account.objects.create(user=cls.user, name="Banco", currency_id="COP")
+        cls.category = Category.objects.create(user=cls.user, name="Mercado")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def make_record(cls, typeRecord="expense", date_time=None, **fields):
+        fields.setdefault("title", typeRecord)
+        if typeRecord == "transfer":
+            fields.setdefault("from_account", cls.cash)
+            fields.setdefault("to_account", cls.bank)
+        else:
+            fields.setdefault("account", cls.cash)
+            fields.setdefault("category", cls.category)
+        return Record(
+            user=cls.user,
+            amount=Decimal("10.00"),
+            typeRecord=typeRecord,
+            paymentType="cash",
+            currency_id="COP",
+            date_time=date_time,
+            **fields,
+        )
+
+
+class RecordListQueryCountTests(RecordTestCase):
+    """El número de queries por página no depende del tamaño ni de la profundidad."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        records = []
+        for index in range(120):
+            # Mezcla de tipos (cada uno anida cuentas distintas) y registros sin fecha
+            typeRecord = ("expense", "income", "transfer")[index % 3]
+            date_time = None if index % 10 == 0 else start + datetime.timedelta(hours=index)
+            records.append(cls.make_record(typeRecord, date_time))
+        Record.objects.bulk_create(records)
+
+    def get_page(self, url, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_offset_pages(self):
+        # COUNT + página
+        for limit in (5, 100):
+            for offset in (0, 100):
+                page = self.get_page(f"/api/records/?limit={limit}&offset={offset}", 2)
+                self.assertEqual(len(page["results"]), min(limit, 120 - offset))
+
+    def test_cursor_pages(self):
+        # Solo la página (sin COUNT)
+        for limit in (5, 100):
+            page = self.get_page(f"/api/records/?pagination=cursor&limit={limit}", 1)
+            self.assertEqual(len(page["results"]), limit)
+            deeper = self.get_page(page["next"], 1)
+            self.assertEqual(len(deeper["results"]), min(limit, 120 - limit))
+
+    def test_retrieve(self):
+        record = Record.objects.filter(typeRecord="transfer").first()
+        self.get_page(f"/api/records/{record.pk}/", 1)
+
+
+@override_settings(QUERY_PROFILING=True, QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(RecordTestCase):
+    """Con el perfilado activo, las vistas de registros respetan `QUERY_BUDGETS`."""
+
+    SERVER_TIMING = re.compile(
+        r'^db;dur=[\d.]+;desc="(\d+) queries", render;dur=[\d.]+, total;dur=[\d.]+$'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Record.objects.bulk_create(
+            [cls.make_record(typeRecord) for typeRecord in ("expense", "income", "transfer") * 10]
+        )
+
+    def payload(self, **fields):
+        return {
+            "title": "Mercado",
+            "amount": "25.50",
+            "typeRecord": "expense",
+            "paymentType": "cash",
+            "currency": "COP",
+            "account_id": self.cash.pk,
+            "category_id": self.category.pk,
+            "date_time": "2025-03-10T12:00:00Z",
+            **fields,
+        }
+
+    def assertWithinBudget(self, response, budget):
+        self.assertIn(response.status_code, (200, 201))
+        match = self.SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertLessEqual(int(match.group(1)), budget)
+
+    def test_list_within_budget(self):
+        for url in ("/api/records/", "/api/records/?pagination=cursor", "/api/records/?search=income"):
+            with self.subTest(url=url):
+                self.assertWithinBudget(self.client.get(url), settings.QUERY_BUDGETS["record-list"])
+
+    @skipUnless(connection.vendor == "postgresql", "Presupuestos medidos en PostgreSQL")
+    def test_writes_within_budget(self):
+        response = self.client.post("/api/records/", self.payload(), format="json")
+        self.assertWithinBudget(response, settings.QUERY_BUDGETS["POST record-list"])
+
+        url = f"/api/records/{response.json()['id']}/"
+        self.assertWithinBudget(self.client.get(url), settings.QUERY_BUDGETS["record-detail"])
+        response = self.client.put(url, self.payload(amount="30.00"), format="json")
+        self.assertWithinBudget(response, settings.QUERY_BUDGETS["PUT record-detail"])
+
+    def test_over_budget_fails(self):
+        with override_settings(QUERY_BUDGETS={"record-list": 1}):
+            with self.assertLogs("money.profiling", "WARNING"), self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/records/")
+
+    def test_over_budget_only_warns_when_not_strict(self):
+        with override_settings(QUERY_BUDGETS={"record-list": 1}, QUERY_BUDGET_STRICT=False):
+            with self.assertLogs("money.profiling", "WARNING") as logs:
+                response = self.client.get("/api/records/")
+        self.assertEqual(response.status_code, 200)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry["view"], entry["budget"]), ("record-list", 1))
+        self.assertGreater(entry["queries"], 1)
+
+    @override_settings(QUERY_PROFILING=False)
+    def test_disabled_without_query_profiling(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertNotIn("Server-Timing", client.get("/api/records/"))
+
+
+@skipUnless(connection.vendor == "postgresql", "Requiere el trigger y el índice GIN (PostgreSQL)")
+class FullTextSearchTests(RecordTestCase):
+    def matches(self, terms):
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        return set(Record.objects.filter(search_vector=query).values_list("title", flat=True))
+
+    def search(self, terms):
+        response = self.client.get("/api/records/", {"search": terms})
+        self.assertEqual(response.status_code, 200)
+        return [record["title"] for record in response.json()["results"]]
+
+    def test_trigger_updates_search_vector_on_insert_and_update(self):
+        record = self.make_record(title="Compra supermercado")
+        record.save()
+        record.refresh_from_db()
+        self.assertIsNotNone(record.search_vector)
+        # Configuración en español: "compras" encuentra "Compra"
+        self.assertEqual(self.matches("compras"), {"Compra supermercado"})
+
+        record.title = "Pago arriendo"
+        record.save()
+        self.assertEqual(self.matches("compras"), set())
+        self.assertEqual(self.matches("arriendo"), {"Pago arriendo"})
+
+        Record.objects.filter(pk=record.pk).update(description="Incluye administración")
+        self.assertEqual(self.matches("administración"), {"Pago arriendo"})
+
+    def test_results_are_ranked(self):
+        start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        for hours, title, description in (
+            (0, "Mercado", ""),
+            (1, "Domicilio", "Pedido del mercado"),
+            (2, "Mercado del mes", "Mercado en la plaza"),
+            (3, "Gasolina", "Sin relación"),
+            (4, "Mercados", ""),
+        ):
+            self.make_record(
+                date_time=start + datetime.timedelta(hours=hours),
+                title=title,
+                description=description,
+            ).save()
+
+        # El título pesa más que la descripción; a igual rango, el más reciente primero
+        self.assertEqual(
+            self.search("mercado"), ["Mercado del mes", "Mercados", "Mercado", "Domicilio"]
+        )
+        self.assertCountEqual(self.search("mercado -plaza"), ["Mercados", "Mercado", "Domicilio"])
+
+
+class KeysetPaginationTests(RecordTestCase):
+    """Recorrer todas las páginas del cursor devuelve cada registro una sola vez."""
+
+    TIE = datetime.datetime(2025, 1, 1, 12, tzinfo=datetime.timezone.utc)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        tie = cls.TIE
+        created = datetime.datetime(2025, 2, 1, tzinfo=datetime.timezone.utc)
+        records = []
+        for index in range(23):
+            # Empates de `date_time` (y de `created_at`) y registros sin fecha
+            if index % 4 == 0:
+                date_time = None
+            elif index % 4 == 1:
+                date_time = tie
+            else:
+                date_time = tie + datetime.timedelta(hours=index)
+            records.append(cls.make_record(date_time=date_time))
+        Record.objects.bulk_create(records)
+        Record.objects.filter(user=cls.user, date_time__isnull=True).update(created_at=created)
+        Record.objects.filter(user=cls.user, date_time=tie).update(created_at=created)
+
+    def walk(self, limit):
+        ids = []
+        url = f"/api/records/?pagination=cursor&limit={limit}"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids += [row["id"] for row in page["results"]]
+            url = page["next"]
+        return ids
+
+    def test_walk_every_page(self):
+        expected = list(
+            Record.objects.filter(user=self.user)
+            .order_by(*RecordKeysetPagination.ordering)
+            .values_list("pk", flat=True)
+        )
+        for limit in (1, 3, 5, 23, 100):
+            with self.subTest(limit=limit):
+                ids = self.walk(limit)
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(ids, expected)
+
+    def test_null_dates_first_and_ties_by_id(self):
+        ids = self.walk(4)
+        undated = list(
+            Record.objects.filter(user=self.user, date_time__isnull=True)
+            .order_by("-pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(ids[: len(undated)], undated)
+        tied = list(
+            Record.objects.filter(user=self.user, date_time=self.TIE)
+            .order_by("-pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(ids[-len(tied) :], tied)
+
+    def test_count_only_on_request(self):
+        page = self.client.get("/api/records/?pagination=cursor&limit=5&count=true").json()
+        self.assertEqual(page["count"], 23)
+        self.assertNotIn("count", self.client.get(page["next"]).json())
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/records/?cursor=no-es-un-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_search_is_rejected(self):
+        response = self.client.get("/api/records/?pagination=cursor&search=expense")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("search", response.json())
+        self.assertEqual(self.client.get("/api/records/?search=expense").status_code, 200)
+
+
+class BulkImportTests(RecordTestCase):
+    """`POST /api/records/bulk/`: JSON o CSV, errores por fila y todo o nada."""
+
+    url = "/api/records/bulk/"
+
+    def row(self, **fields):
+        return {
+            "title": "Mercado",
+            "amount": "25.50",
+            "typeRecord": "expense",
+            "paymentType": "cash",
+            "currency": "COP",
+            "account_id": self.cash.pk,
+            "category_id": self.category.pk,
+            "date_time": "2025-03-10T12:00:00Z",
+            **fields,
+        }
+
+    def user_records(self):
+        return Record.objects.filter(user=self.user)
+
+    def rollup_rows(self):
+        return sorted(
+            RecordRollup.objects.filter(user=self.user).values_list(
+                "period", "period_start", "typeRecord", "account", "direction", "total", "count"
+            ),
+            key=str,
+        )
+
+    def test_json(self):
+        rows = [
+            self.row(),
+            self.row(typeRecord="income", amount="100.00", category_id=None),
+            self.row(
+                typeRecord="transfer",
+                amount="40.00",
+                account_id=None,
+                category_id=None,
+                from_account_id=self.cash.pk,
+                to_account_id=self.bank.pk,
+            ),
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(
+            set(response.json()["ids"]), set(self.user_records().values_list("pk", flat=True))
+        )
+
+    def test_csv(self):
+        body = (
+            "title,amount,typeRecord,paymentType,currency,account_id,category_id,date_time\n"
+            f"Mercado,25.50,expense,cash,COP,{self.cash.pk},{self.category.pk},2025-03-10T12:00:00Z\n"
+            f"Sueldo,100.00,income,cash,COP,{self.bank.pk},,\n"
+        )
+        response = self.client.post(self.url, body, content_type="text/csv")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["created"], 2)
+        salary = self.user_records().get(title="Sueldo")
+        self.assertEqual(
+            (salary.account, salary.category, salary.date_time), (self.bank, None, None)
+        )
+
+    def test_row_errors_create_nothing(self):
+        other = User.objects.create_user("bulk-other", password="x")
+        foreign = Account.objects.create(user=other, name="Ajena", currency_id="COP")
+        rows = [
+            self.row(),
+            self.row(amount="no-es-un-monto"),
+            self.row(),
+            self.row(account_id=foreign.pk),
+            self.row(currency="XXX"),
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual([error["row"] for error in errors], [1, 3, 4])
+        self.assertIn("amount", errors[0]["errors"])
+        self.assertIn("account_id", errors[1]["errors"])
+        self.assertIn("currency", errors[2]["errors"])
+        self.assertFalse(self.user_records().exists())
+
+    def test_row_limit(self):
+        with self.settings(RECORDS_BULK_MAX_ROWS=2):
+            response = self.client.post(self.url, [self.row()] * 3, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.user_records().exists())
+
+    def test_not_a_list(self):
+        response = self.client.post(self.url, self.row(), format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_updates_ledger_and_rollups(self):
+        rows = [
+            self.row(),
+            self.row(typeRecord="income", amount="100.00", category_id=None),
+            self.row(
+                typeRecord="transfer",
+                amount="40.00",
+                account_id=None,
+                category_id=None,
+                from_account_id=self.cash.pk,
+                to_account_id=self.bank.pk,
+            ),
+        ]
+        self.assertEqual(self.client.post(self.url, rows, format="json").status_code, 201)
+
+        balances = dict(
+            AccountBalance.objects.filter(account__user=self.user).values_list("account", "balance")
+        )
+        self.assertEqual(balances[self.cash.pk], Decimal("34.50"))
+        self.assertEqual(balances[self.bank.pk], Decimal("40.00"))
+        self.assertEqual(find_balance_mismatches(Account.objects.filter(user=self.user)), [])
+
+        rollups = self.rollup_rows()
+        self.assertTrue(rollups)
+        rebuild_rollups(self.user)
+        self.assertEqual(self.rollup_rows(), rollups)
+
+
+class ExportTests(RecordTestCase):
+    """`GET /api/records/export/` en CSV y NDJSON, con los filtros del listado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        day = datetime.datetime(2025, 3, 10, 12, tzinfo=datetime.timezone.utc)
+        records = [
+            cls.make_record("expense", day, title="Mercado semanal"),
+            cls.make_record("income", day + datetime.timedelta(days=1), title="Sueldo"),
+            cls.make_record("transfer", day + datetime.timedelta(days=5), title="Ahorro"),
+            cls.make_record("expense", day - datetime.timedelta(days=5), title="Mercado viejo"),
+        ]
+        Record.objects.bulk_create(records)
+
+    def export(self, query):
+        response = self.client.get(f"/api/records/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode()
+
+    def csv_titles(self, query):
+        response, body = self.export(f"format=csv&{query}")
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        return {row["title"] for row in rows}
+
+    def ndjson_titles(self, query):
+        response, body = self.export(f"format=ndjson&{query}")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        return {json.loads(line)["title"] for line in body.splitlines()}
+
+    def test_filters(self):
+        cases = {
+            "": {"Mercado semanal", "Sueldo", "Ahorro", "Mercado viejo"},
+            "typeRecord=expense": {"Mercado semanal", "Mercado viejo"},
+            "date_from=2025-03-10": {"Mercado semanal", "Sueldo", "Ahorro"},
+            "date_to=2025-03-11": {"Mercado semanal", "Sueldo", "Mercado viejo"},
+            "date_from=2025-03-10&date_to=2025-03-11": {"Mercado semanal", "Sueldo"},
+            "search=mercado": {"Mercado semanal", "Mercado viejo"},
+            "search=mercado&date_from=2025-03-10": {"Mercado semanal"},
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(self.csv_titles(query), expected)
+                self.assertEqual(self.ndjson_titles(query), expected)
+
+    def test_csv_columns(self):
+        _, body = self.export("format=csv&typeRecord=transfer")
+        (row,) = csv.DictReader(io.StringIO(body))
+        self.assertEqual(list(row), EXPORT_FIELDS)
+        self.assertEqual(row["from_account__name"], "Caja")
+        self.assertEqual(row["account_id"], "")
+
+    def test_default_is_csv(self):
+        response, _ = self.export("")
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+
+    def test_unsupported_format(self):
+        for output in ("json", "xml"):
+            with self.subTest(format=output):
+                response = self.client.get(f"/api/records/export/?format={output}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("format", response.json())
+        response = self.client.get("/api/records/export/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 406)
+
+
+class DateFilterTests(RecordTestCase):
+    """Los rangos semiabiertos de `filter_records` equivalen a los lookups `__date`."""
+
+    BOGOTA = zoneinfo.ZoneInfo("America/Bogota")
+    MADRID = zoneinfo.ZoneInfo("Europe/Madrid")
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 2025-03-30: cambio de hora en Madrid (el día dura 23 horas)
+        days = [datetime.date(2025, 3, 9), datetime.date(2025, 3, 10), datetime.date(2025, 3, 30)]
+        moments = [None]
+        for tz in (datetime.timezone.utc, cls.BOGOTA, cls.MADRID):
+            # Medianoche exacta, el último microsegundo del día anterior y mediodía
+            for day in days:
+                midnight = datetime.datetime.combine(day, datetime.time.min, tzinfo=tz)
+                moments += [
+                    midnight,
+                    midnight - datetime.timedelta(microseconds=1),
+                    midnight + datetime.timedelta(hours=12),
+                ]
+        Record.objects.bulk_create(
+            [cls.make_record(date_time=moment) for moment in moments]
+        )
+
+    def filtered(self, **params):
+        queryset = Record.objects.filter(user=self.user)
+        return set(filter_records(queryset, params).values_list("pk", flat=True))
+
+    def lookup(self, **lookups):
+        return set(
+            Record.objects.filter(user=self.user, **lookups).values_list("pk", flat=True)
+        )
+
+    def local_days(self, tz):
+        return {
+            pk: timezone.localtime(moment, tz).date()
+            for pk, moment in Record.objects.filter(
+                user=self.user, date_time__isnull=False
+            ).values_list("pk", "date_time")
+        }
+
+    def test_date_only_matches_date_lookups(self):
+        for tz in ("UTC", "America/Bogota", "Europe/Madrid"):
+            for value in ("2025-03-09", "2025-03-10", "2025-03-30"):
+                day = datetime.date.fromisoformat(value)
+                with self.subTest(tz=tz, value=value), timezone.override(tz):
+                    self.assertEqual(self.filtered(date=value), self.lookup(date_time__date=day))
+                    self.assertEqual(
+                        self.filtered(date_from=value), self.lookup(date_time__date__gte=day)
+                    )
+                    self.assertEqual(
+                        self.filtered(date_to=value), self.lookup(date_time__date__lte=day)
+                    )
+                    self.assertEqual(
+                        self.filtered(date_from=value, date_to=value),
+                        self.lookup(date_time__date=day),
+                    )
+
+    def test_date_with_offset_uses_callers_day(self):
+        days = self.local_days(self.BOGOTA)
+        expected = {pk for pk, day in days.items() if day == datetime.date(2025, 3, 9)}
+        self.assertTrue(expected)
+        # Independiente de la zona activa
+        for tz in ("UTC", "Europe/Madrid"):
+            with self.subTest(tz=tz), timezone.override(tz):
+                self.assertEqual(self.filtered(date="2025-03-09T23:00:00-05:00"), expected)
+                self.assertEqual(self.filtered(date="2025-03-09T00:00:00-05:00"), expected)
+
+    def test_naive_and_utc_datetimes(self):
+        with timezone.override("America/Bogota"):
+            days = self.local_days(self.BOGOTA)
+            expected = {pk for pk, day in days.items() if day == datetime.date(2025, 3, 10)}
+            self.assertEqual(self.filtered(date="2025-03-10T18:00:00"), expected)
+        days = self.local_days(datetime.timezone.utc)
+        expected = {pk for pk, day in days.items() if day == datetime.date(2025, 3, 10)}
+        self.assertEqual(self.filtered(date="2025-03-10T23:59:59Z"), expected)
+
+    def test_datetime_bounds_are_inclusive_instants(self):
+        midnight = datetime.datetime(2025, 3, 10, tzinfo=self.BOGOTA)
+        self.assertEqual(
+            self.filtered(date_from="2025-03-10T00:00:00-05:00"),
+            self.lookup(date_time__gte=midnight),
+        )
+        self.assertEqual(
+            self.filtered(date_to="2025-03-10T00:00:00-05:00"),
+            self.lookup(date_time__lte=midnight),
+        )
+        self.assertIn(
+            Record.objects.get(user=self.user, date_time=midnight).pk,
+            self.filtered(
+                date_from="2025-03-10T00:00:00-05:00", date_to="2025-03-10T05:00:00Z"
+            ),
+        )
+
+    def test_list_endpoint(self):
+        with timezone.override("America/Bogota"):
+            response = self.client.get("/api/records/?date=2025-03-10&limit=100")
+            expected = self.lookup(date_time__date=datetime.date(2025, 3, 10))
+        self.assertEqual({row["id"] for row in response.json()["results"]}, expected)
@@ -1,22 +1,34 @@
-from rest_framework import viewsets, permissions, filters
-from rest_framework.pagination import LimitOffsetPagination
-from django.utils.dateparse import parse_date, parse_datetime
-from django.utils import timezone
-import datetime
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAcceptable, ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .bulk import build_records, create_records
+from .export import (
+    EXPORT_FORMATS,
+    STREAMERS,
+    CSVStreamRenderer,
+    NDJSONStreamRenderer,
+    export_rows,
+)
+from .filters import RecordSearchFilter, filter_records
 from .models import Record
-from .serializers import RecordSerializer
+from .pagination import RecordKeysetPagination, StandardResultsSetPagination
+from .parsers import RecordCSVParser
+from .serializers import RecordImportSerializer, RecordSerializer
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,
     OpenApiExample,
+    inline_serializer,
 )
-
-
-class StandardResultsSetPagination(LimitOffsetPagination):
-    default_limit = 10
-    max_limit = 100
+from rest_framework import serializers
 
 
 @extend_schema_view(
@@ -32,7 +44,10 @@ class StandardResultsSetPagination(LimitOffsetPagination):
             ),
             OpenApiParameter(
                 name="date",
-                description="Filter by exact date (YYYY-MM-DD) using the date part of `date_time`.",
+                description=(
+                    "Filter by exact date (YYYY-MM-DD) using the date part of `date_time`. "
+                    "A full ISO datetime selects its calendar day in its own UTC offset."
+                ),
                 required=False,
                 type=OpenApiTypes.DATE,
                 location=OpenApiParameter.QUERY,
@@ -51,6 +66,32 @@ class StandardResultsSetPagination(LimitOffsetPagination):
                 type=OpenApiTypes.DATE,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="pagination",
+                description=(
+                    "`cursor` activa la paginación por cursor (keyset) para scroll infinito: "
+                    "la respuesta trae `next` y `results`, y `count` solo si se pide con `count=true`. "
+                    "No se puede combinar con `search`. Por defecto se usa `limit`/`offset`."
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=["offset", "cursor"],
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor devuelto en `next` (implica `pagination=cursor`).",
+                required=False,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="count",
+                description="Con paginación por cursor, incluir el total de resultados.",
+                required=False,
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+            ),
         ]
     ),
     create=extend_schema(
@@ -138,7 +179,8 @@ class RecordViewSet(viewsets.ModelViewSet):
 
     - Restringe queryset a los records del usuario autenticado.
     - Ordena por `date_time` descendente (más nuevo -> más viejo).
-    - Añade paginación y búsqueda por título/descripcion.
+    - Añade paginación (limit/offset, o cursor con `pagination=cursor`) y búsqueda
+      full-text por título/descripcion (`search`, ordenada por relevancia).
     - Permite filtrar por `typeRecord`, `date` (YYYY-MM-DD), `date_from`, `date_to`.
     - Asigna `user` en create.
     """
@@ -146,56 +188,52 @@ class RecordViewSet(viewsets.ModelViewSet):
     serializer_class = RecordSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [RecordSearchFilter]
     search_fields = ["title", "description"]
 
+    @property
+    def paginator(self):
+        """Usa paginación por cursor si el cliente la pide; limit/offset si no."""
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            params = request.query_params if request is not None else {}
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = RecordKeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def perform_content_negotiation(self, request, force=False):
+        # Un `?format=` desconocido en la exportación es un parámetro inválido (400),
+        # no un 404 de la negociación ni un CSV por defecto
+        if self.action == "export":
+            output = request.query_params.get(api_settings.URL_FORMAT_OVERRIDE)
+            if output is not None and output not in STREAMERS:
+                if force:
+                    # El error se responde en JSON, no con el primer renderer (CSV)
+                    return JSONRenderer(), JSONRenderer.media_type
+                raise ValidationError(
+                    {"format": [f"Formato no soportado; usa uno de: {', '.join(STREAMERS)}."]}
+                )
+        return super().perform_content_negotiation(request, force)
+
     def get_queryset(self):
         user = self.request.user
-        qs = Record.objects.filter(user=user)
-
-        # Filter by typeRecord exact match
-        type_record = self.request.query_params.get("typeRecord")
-        if type_record:
-            qs = qs.filter(typeRecord=type_record)
-
-        # Date filters: accept YYYY-MM-DD or full ISO datetimes with timezone
-        date = self.request.query_params.get("date")
-        date_from = self.request.query_params.get("date_from")
-        date_to = self.request.query_params.get("date_to")
-
-        if date:
-            # try YYYY-MM-DD first
-            parsed_date = parse_date(date)
-            if parsed_date:
-                qs = qs.filter(date_time__date=parsed_date)
-            else:
-                # try full ISO datetime
-                parsed_dt = parse_datetime(date)
-                if parsed_dt:
-                    dt_utc = to_utc(parsed_dt)
-                    # filter by the UTC date of the provided datetime
-                    qs = qs.filter(date_time__date=dt_utc.date())
-
-        if date_from:
-            # accept date or full datetime
-            parsed_date = parse_date(date_from)
-            if parsed_date:
-                qs = qs.filter(date_time__date__gte=parsed_date)
-            else:
-                parsed_dt = parse_datetime(date_from)
-                if parsed_dt:
-                    dt_utc = to_utc(parsed_dt)
-                    qs = qs.filter(date_time__gte=dt_utc)
-
-        if date_to:
-            parsed_date = parse_date(date_to)
-            if parsed_date:
-                qs = qs.filter(date_time__date__lte=parsed_date)
-            else:
-                parsed_dt = parse_datetime(date_to)
-                if parsed_dt:
-                    dt_utc = to_utc(parsed_dt)
-                    qs = qs.filter(date_time__lte=dt_utc)
+        # Traer en el mismo query todo lo que anida RecordSerializer para que
+        # el número de queries por página no dependa del tamaño de la página.
+        qs = (
+            Record.objects.filter(user=user)
+            .select_related(
+                "user",
+                "account__user",
+                "from_account__user",
+                "to_account__user",
+                "category",
+            )
+            .defer("search_vector")
+        )
+
+        qs = filter_records(qs, self.request.query_params)
 
         # Order newest first; fallback to created_at for deterministic order
         return qs.order_by("-date_time", "-created_at")
@@ -203,12 +241,74 @@ class RecordViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        description="""
+        Crea muchos registros en una sola transacción (todo o nada).
+
+        Acepta un arreglo JSON o un CSV (`Content-Type: text/csv`) con encabezado, usando los
+        mismos campos que la creación individual (`account_id`, `category_id`, `currency`, ...).
+        Si alguna fila es inválida no se crea ninguna y se responde 400 con los errores por fila.
+        """,
+        request=RecordImportSerializer(many=True),
+        responses={
+            201: inline_serializer(
+                "RecordBulkCreated",
+                fields={
+                    "created": serializers.IntegerField(),
+                    "ids": serializers.ListField(child=serializers.IntegerField()),
+                },
+            ),
+        },
+    )
+    @action(detail=False, methods=["post"], parser_classes=[JSONParser, RecordCSVParser])
+    def bulk(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"detail": "Se espera un arreglo de registros."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_rows = getattr(settings, "RECORDS_BULK_MAX_ROWS", 5000)
+        if len(rows) > max_rows:
+            return Response(
+                {"detail": f"Máximo {max_rows} registros por solicitud."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        records, errors = build_records(request.user, rows)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        created = create_records(records)
+        return Response(
+            {"created": len(created), "ids": [record.pk for record in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        description="""
+        Exporta los registros del usuario como CSV (por defecto) o NDJSON, elegido con
+        `?format=csv|ndjson` o con el header `Accept`. Otro `format` responde 400.
+
+        Acepta los mismos filtros que el listado (`typeRecord`, `date`, `date_from`, `date_to`,
+        `search`) y no pagina: la respuesta se envía en streaming leyendo la base de datos
+        por bloques, así que el uso de memoria no depende del número de registros.
+        """,
+        responses={(200, "text/csv"): OpenApiTypes.STR, (200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer, JSONRenderer],
+    )
+    def export(self, request):
+        output = request.accepted_renderer.format
+        if output not in STREAMERS:
+            # `Accept` pidió un formato que no se exporta (p. ej. application/json)
+            raise NotAcceptable()
 
-def to_utc(dt):
-    # dt is a datetime; return timezone-aware UTC datetime
-    if timezone.is_naive(dt):
-        # assume current server timezone if naive
-        aware = timezone.make_aware(dt, timezone.get_current_timezone())
-    else:
-        aware = dt
-    return aware.astimezone(datetime.timezone.utc)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = export_rows(queryset, getattr(settings, "RECORDS_EXPORT_CHUNK_SIZE", 2000))
+        response = StreamingHttpResponse(STREAMERS[output](rows), content_type=EXPORT_FORMATS[output])
+        response["Content-Disposition"] = f'attachment; filename="records.{output}"'
+        return response
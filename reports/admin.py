@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import RecordRollup
+
+
+@admin.register(RecordRollup)
+class RecordRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "period",
+        "period_start",
+        "typeRecord",
+        "category",
+        "account",
+        "currency",
+        "direction",
+        "total",
+        "count",
+    )
+    list_filter = ("period", "typeRecord", "direction", "currency")
+    search_fields = ("user__username",)
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcula los rollups de reportes (RecordRollup) a partir de los registros."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Recalcular solo los rollups de este username.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No existe el usuario {options['user']!r}.")
+        created = rebuild_rollups(user)
+        self.stdout.write(self.style.SUCCESS(f"Rollups recalculados: {created} filas."))
@@ -0,0 +1,61 @@
+from django.db import migrations
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Record = apps.get_model("records", "Record")
+    RecordRollup = apps.get_model("reports", "RecordRollup")
+
+    for period in ("day", "week", "month"):
+        rows = (
+            Record.objects.annotate(
+                rollup_start=Trunc(
+                    Coalesce("date_time", "created_at"),
+                    period,
+                    output_field=DateField(),
+                    tzinfo=timezone.get_default_timezone(),
+                ),
+                rollup_account=Coalesce("account", "from_account"),
+            )
+            .values(
+                "user_id",
+                "rollup_start",
+                "typeRecord",
+                "category_id",
+                "rollup_account",
+                "currency_id",
+            )
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        RecordRollup.objects.bulk_create(
+            [
+                RecordRollup(
+                    user_id=row["user_id"],
+                    period=period,
+                    period_start=row["rollup_start"],
+                    typeRecord=row["typeRecord"],
+                    category_id=row["category_id"],
+                    account_id=row["rollup_account"],
+                    currency_id=row["currency_id"],
+                    total=row["total"] or 0,
+                    count=row["count"],
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0008_record_search_vector'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:10
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+
+def backfill_incoming_transfers(apps, schema_editor):
+    # Los rollups existentes son los tramos "out"; faltan las entradas de transferencias
+    Record = apps.get_model("records", "Record")
+    RecordRollup = apps.get_model("reports", "RecordRollup")
+
+    transfers = Record.objects.filter(typeRecord="transfer", to_account__isnull=False)
+    for period in ("day", "week", "month"):
+        rows = (
+            transfers.annotate(
+                rollup_start=Trunc(
+                    Coalesce("date_time", "created_at"),
+                    period,
+                    output_field=DateField(),
+                    tzinfo=timezone.get_default_timezone(),
+                ),
+            )
+            .values(
+                "user_id",
+                "rollup_start",
+                "typeRecord",
+                "category_id",
+                "to_account_id",
+                "currency_id",
+            )
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        RecordRollup.objects.bulk_create(
+            [
+                RecordRollup(
+                    user_id=row["user_id"],
+                    period=period,
+                    period_start=row["rollup_start"],
+                    typeRecord=row["typeRecord"],
+                    category_id=row["category_id"],
+                    account_id=row["to_account_id"],
+                    currency_id=row["currency_id"],
+                    direction="in",
+                    total=row["total"] or 0,
+                    count=row["count"],
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+def remove_incoming_transfers(apps, schema_editor):
+    RecordRollup = apps.get_model("reports", "RecordRollup")
+    RecordRollup.objects.filter(direction="in").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('records', '0008_record_search_vector'),
+        ('reports', '0002_backfill_record_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='recordrollup',
+            name='record_rollup_unique_bucket',
+        ),
+        migrations.AddField(
+            model_name='recordrollup',
+            name='direction',
+            field=models.CharField(choices=[('out', 'Out'), ('in', 'In')], default='out', max_length=3),
+        ),
+        migrations.AddConstraint(
+            model_name='recordrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'period', 'period_start', 'typeRecord', 'category', 'account', 'currency', 'direction'), name='record_rollup_unique_bucket', nulls_distinct=False),
+        ),
+        migrations.RunPython(backfill_incoming_transfers, remove_incoming_transfers),
+    ]
@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class RecordRollup(models.Model):
+    """Totales pre-agregados de registros por período y dimensiones.
+
+    Se mantiene incrementalmente con cada escritura de `Record` (ver
+    `reports.rollups`), de modo que un resumen de varios años se responde
+    leyendo unas cientos de filas en lugar de todos los registros.
+
+    - `account` es la cuenta del registro con `direction="out"`; una
+      transferencia aporta además un tramo `direction="in"` en la cuenta de
+      destino. Los totales por usuario (sin cuenta) solo suman los "out".
+    - Los registros sin `date_time` se ubican por su `created_at`.
+    """
+
+    PERIODS = [
+        ("day", "Day"),
+        ("week", "Week"),
+        ("month", "Month"),
+    ]
+
+    DIRECTIONS = [
+        ("out", "Out"),
+        ("in", "In"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="record_rollups"
+    )
+    period = models.CharField(max_length=5, choices=PERIODS)
+    period_start = models.DateField()
+    typeRecord = models.CharField(max_length=20)
+    category = models.ForeignKey(
+        "categories.Category", on_delete=models.CASCADE, null=True, blank=True
+    )
+    account = models.ForeignKey(
+        "accounts.Account", on_delete=models.CASCADE, null=True, blank=True
+    )
+    currency = models.ForeignKey("currencies.Currency", on_delete=models.PROTECT)
+    direction = models.CharField(max_length=3, choices=DIRECTIONS, default="out")
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "user",
+                    "period",
+                    "period_start",
+                    "typeRecord",
+                    "category",
+                    "account",
+                    "currency",
+                    "direction",
+                ],
+                name="record_rollup_unique_bucket",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "period", "period_start"],
+                name="record_rollup_user_period_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.period} {self.period_start} {self.typeRecord} ({self.total})"
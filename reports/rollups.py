@@ -0,0 +1,258 @@
+"""Mantenimiento de `RecordRollup` a partir de las escrituras de `Record`."""
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from .models import RecordRollup
+
+PERIODS = ("day", "week", "month")
+
+# Dimensiones de un bucket, en el orden de la clave que usan los deltas
+KEY_FIELDS = (
+    "user_id",
+    "period",
+    "period_start",
+    "typeRecord",
+    "category_id",
+    "account_id",
+    "currency_id",
+    "direction",
+)
+
+# Buckets por sentencia de `_upsert_rollups` (10 parámetros por bucket)
+UPSERT_BATCH_SIZE = 1000
+
+# Cuenta a la que aporta cada tramo de un registro (ver `record_legs`)
+LEG_ACCOUNTS = {
+    "out": Coalesce("account", "from_account"),
+    "in": F("to_account"),
+}
+
+
+def period_start(day, period):
+    """Primer día del período (`day`, `week` con inicio lunes, `month`) que contiene `day`."""
+    if period == "day":
+        return day
+    if period == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def record_day(record):
+    """Fecha contable de un registro en la zona horaria por defecto del proyecto."""
+    moment = record.date_time or record.created_at
+    return timezone.localtime(moment, timezone.get_default_timezone()).date()
+
+
+def record_legs(record):
+    """Tramos `(account_id, direction)` de un registro.
+
+    Todo registro tiene un tramo "out" en su cuenta (en transferencias, la de
+    origen); una transferencia además tiene un tramo "in" en la de destino.
+    """
+    legs = [(record.account_id or record.from_account_id, "out")]
+    if record.typeRecord == "transfer" and record.to_account_id:
+        legs.append((record.to_account_id, "in"))
+    return legs
+
+
+def record_keys(record):
+    """Claves de bucket (una por período y tramo) a las que aporta un registro."""
+    day = record_day(record)
+    return [
+        (
+            record.user_id,
+            period,
+            period_start(day, period),
+            record.typeRecord,
+            record.category_id,
+            account_id,
+            record.currency_id,
+            direction,
+        )
+        for account_id, direction in record_legs(record)
+        for period in PERIODS
+    ]
+
+
+def collect_rollup_deltas(changes):
+    """Acumula `{clave: [total, count]}` para una lista de cambios `(anterior, actual)`."""
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for previous, current in changes:
+        for record, sign in ((previous, -1), (current, 1)):
+            if record is None:
+                continue
+            for key in record_keys(record):
+                deltas[key][0] += sign * (record.amount or Decimal("0"))
+                deltas[key][1] += sign
+    return {key: value for key, value in deltas.items() if value[1] or value[0]}
+
+
+def _bucket_filter(key):
+    return dict(zip(KEY_FIELDS, key))
+
+
+def _upsert_rollups(keys, deltas):
+    """Suma los deltas a sus buckets con un solo `INSERT ... ON CONFLICT DO UPDATE`.
+
+    Solo para PostgreSQL: la restricción única (`NULLS NOT DISTINCT`) hace que
+    los buckets sin categoría o sin cuenta también choquen.
+    """
+    connection = connections[RecordRollup.objects.db]
+    quote = connection.ops.quote_name
+    meta = RecordRollup._meta
+    table = quote(meta.db_table)
+    key_columns = [quote(meta.get_field(field).column) for field in KEY_FIELDS]
+    total, count = quote("total"), quote("count")
+    columns = [*key_columns, total, count]
+    row = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    with connection.cursor() as cursor:
+        # Por lotes solo en importaciones masivas (límite de parámetros por query)
+        for start in range(0, len(keys), UPSERT_BATCH_SIZE):
+            batch = keys[start : start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES {', '.join([row] * len(batch))} "
+                f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET "
+                f"{total} = {table}.{total} + EXCLUDED.{total}, "
+                f"{count} = {table}.{count} + EXCLUDED.{count}",
+                [value for key in batch for value in (*key, *deltas[key])],
+            )
+
+
+def _update_rollups(keys, deltas):
+    """Lo mismo que `_upsert_rollups` con un UPDATE (o INSERT) por bucket, para otros motores."""
+    for key in keys:
+        total, count = deltas[key]
+        bucket = _bucket_filter(key)
+        updated = RecordRollup.objects.filter(**bucket).update(
+            total=F("total") + total, count=F("count") + count
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    RecordRollup.objects.create(total=total, count=count, **bucket)
+            except IntegrityError:
+                # Otra transacción creó el bucket entretanto
+                RecordRollup.objects.filter(**bucket).update(
+                    total=F("total") + total, count=F("count") + count
+                )
+
+
+def apply_rollup_deltas(deltas):
+    """Aplica deltas a los rollups: un upsert y, si hay bajas, un DELETE.
+
+    Los buckets se escriben en orden estable para que dos transacciones
+    concurrentes los bloqueen en el mismo orden. Un delta negativo sobre un
+    bucket inexistente (p. ej. durante un borrado en cascada del usuario) crea
+    una fila sin registros que el DELETE final elimina junto con los buckets
+    que quedaron vacíos.
+    """
+    if not deltas:
+        return
+    keys = sorted(deltas, key=str)
+    if connections[RecordRollup.objects.db].vendor == "postgresql":
+        _upsert_rollups(keys, deltas)
+    else:
+        _update_rollups(keys, deltas)
+
+    emptied = [key for key in keys if deltas[key][1] < 0]
+    if emptied:
+        buckets = Q()
+        for key in emptied:
+            buckets |= Q(**_bucket_filter(key))
+        RecordRollup.objects.filter(buckets, count__lte=0).delete()
+
+
+def aggregate_records(records, period, direction="out"):
+    """Agrupa un queryset de `Record` en buckets de `period`, directamente en la base de datos.
+
+    Con `direction="in"` agrupa los tramos de entrada de las transferencias
+    (por cuenta de destino).
+    """
+    if direction == "in":
+        records = records.filter(typeRecord="transfer", to_account__isnull=False)
+    moment = Coalesce("date_time", "created_at")
+    return (
+        records.annotate(
+            rollup_start=Trunc(
+                moment,
+                period,
+                output_field=DateField(),
+                tzinfo=timezone.get_default_timezone(),
+            ),
+            rollup_account=LEG_ACCOUNTS[direction],
+        )
+        .values(
+            "user_id",
+            "rollup_start",
+            "typeRecord",
+            "category_id",
+            "rollup_account",
+            "currency_id",
+        )
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+
+
+def rebuild_rollups(user=None):
+    """Recalcula desde cero los rollups (de un usuario, o de todos)."""
+    from records.models import Record
+
+    records = Record.objects.all()
+    rollups = RecordRollup.objects.all()
+    if user is not None:
+        records = records.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = 0
+        for direction in LEG_ACCOUNTS:
+            for period in PERIODS:
+                rows = aggregate_records(records, period, direction)
+                created += len(
+                    RecordRollup.objects.bulk_create(
+                        [
+                            RecordRollup(
+                                user_id=row["user_id"],
+                                period=period,
+                                period_start=row["rollup_start"],
+                                typeRecord=row["typeRecord"],
+                                category_id=row["category_id"],
+                                account_id=row["rollup_account"],
+                                currency_id=row["currency_id"],
+                                direction=direction,
+                                total=row["total"] or Decimal("0"),
+                                count=row["count"],
+                            )
+                            for row in rows.iterator()
+                        ],
+                        batch_size=1000,
+                    )
+                )
+    return created
+
+
+def move_category_to_uncategorized(category):
+    """Pasa los totales de una categoría al bucket sin categoría.
+
+    Al borrar una categoría sus registros quedan con `category=None` mediante un
+    UPDATE masivo que no emite señales, así que los rollups se ajustan aquí.
+    """
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for rollup in RecordRollup.objects.filter(category=category):
+        key = tuple(getattr(rollup, field) for field in KEY_FIELDS)
+        uncategorized = key[:4] + (None,) + key[5:]
+        deltas[key][0] -= rollup.total
+        deltas[key][1] -= rollup.count
+        deltas[uncategorized][0] += rollup.total
+        deltas[uncategorized][1] += rollup.count
+    apply_rollup_deltas(deltas)
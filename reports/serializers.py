@@ -0,0 +1,58 @@
+from rest_framework import serializers
+
+from currencies.serializers import CurrencyField
+from records.models import Record
+
+from .models import RecordRollup
+
+GROUP_BY_FIELDS = ("typeRecord", "category", "account")
+
+
+class SummaryQuerySerializer(serializers.Serializer):
+    """Parámetros de consulta del resumen de registros."""
+
+    period = serializers.ChoiceField(
+        choices=[value for value, _ in RecordRollup.PERIODS], default="month"
+    )
+    group_by = serializers.CharField(required=False, default="typeRecord", allow_blank=True)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    typeRecord = serializers.ChoiceField(
+        choices=[value for value, _ in Record.RECORD_TYPES], required=False
+    )
+    account = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+    convert_to = CurrencyField(required=False)
+
+    def validate_convert_to(self, value):
+        return value.code
+
+    def validate_group_by(self, value):
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        invalid = [field for field in fields if field not in GROUP_BY_FIELDS]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Campos no soportados: {', '.join(invalid)}. Opciones: {', '.join(GROUP_BY_FIELDS)}."
+            )
+        # Mantener un orden estable y sin duplicados
+        return [field for field in GROUP_BY_FIELDS if field in fields]
+
+
+class SummaryRowSerializer(serializers.Serializer):
+    """Una fila del resumen: un período y una combinación de dimensiones."""
+
+    period_start = serializers.DateField()
+    typeRecord = serializers.CharField(required=False)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    account = serializers.IntegerField(required=False, allow_null=True)
+    direction = serializers.ChoiceField(
+        choices=[value for value, _ in RecordRollup.DIRECTIONS], required=False
+    )
+    currency = serializers.CharField(required=False)
+    total = serializers.DecimalField(max_digits=18, decimal_places=2)
+    count = serializers.IntegerField()
+
+    def to_representation(self, instance):
+        # Solo las dimensiones por las que se agrupó
+        data = super().to_representation(instance)
+        return {key: value for key, value in data.items() if key in instance}
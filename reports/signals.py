@@ -0,0 +1,17 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from categories.models import Category
+from records.signals import records_changed
+
+from .rollups import apply_rollup_deltas, collect_rollup_deltas, move_category_to_uncategorized
+
+
+@receiver(records_changed, weak=False)
+def update_record_rollups(sender, changes, **kwargs):
+    apply_rollup_deltas(collect_rollup_deltas(changes))
+
+
+@receiver(pre_delete, sender=Category, weak=False)
+def uncategorize_rollups(sender, instance, **kwargs):
+    move_category_to_uncategorized(instance)
@@ -0,0 +1,113 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from currencies.models import Currency
+from currencies.registry import currency_registry
+from records.models import Record
+
+from .models import RecordRollup
+from .rollups import rebuild_rollups
+
+
+class RecordRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("rollups", password="x")
+        cls.cash = Account.objects.create(user=cls.user, name="Caja", currency_id="COP")
+        cls.bank = Account.objects.create(user=cls.user, name="Banco", currency_id="COP")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def record(self, typeRecord, amount, day, **fields):
+        return Record.objects.create(
+            user=self.user,
+            title=typeRecord,
+            amount=Decimal(amount),
+            typeRecord=typeRecord,
+            paymentType="cash",
+            currency_id="COP",
+            date_time=datetime.datetime(2025, 3, day, 12, tzinfo=datetime.timezone.utc),
+            **fields,
+        )
+
+    def summary(self, query):
+        response = self.client.get(f"/api/reports/summary/?period=month&{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [
+            {key: value for key, value in row.items() if key != "period_start"}
+            for row in response.json()["results"]
+        ]
+
+    def rollup_rows(self):
+        return sorted(
+            RecordRollup.objects.filter(user=self.user).values_list(
+                "period", "period_start", "typeRecord", "account", "direction", "total", "count"
+            ),
+            key=str,
+        )
+
+    def test_transfers_count_in_both_accounts(self):
+        self.record("income", "500.00", 1, account=self.cash)
+        self.record("transfer", "200.00", 2, from_account=self.cash, to_account=self.bank)
+
+        def row(typeRecord, account, direction, total):
+            return {
+                "typeRecord": typeRecord,
+                "account": account.pk,
+                "direction": direction,
+                "currency": "COP",
+                "total": total,
+                "count": 1,
+            }
+
+        self.assertEqual(
+            self.summary("group_by=account,typeRecord"),
+            [
+                row("income", self.cash, "out", "500.00"),
+                row("transfer", self.cash, "out", "200.00"),
+                row("transfer", self.bank, "in", "200.00"),
+            ],
+        )
+        self.assertEqual(
+            self.summary(f"account={self.bank.pk}"),
+            [
+                {
+                    "typeRecord": "transfer",
+                    "direction": "in",
+                    "currency": "COP",
+                    "total": "200.00",
+                    "count": 1,
+                }
+            ],
+        )
+        # Sin cuenta, la transferencia cuenta una sola vez
+        self.assertEqual(
+            self.summary("group_by=typeRecord&typeRecord=transfer"),
+            [{"typeRecord": "transfer", "currency": "COP", "total": "200.00", "count": 1}],
+        )
+
+    def test_incremental_rollups_match_rebuild(self):
+        income = self.record("income", "500.00", 1, account=self.cash)
+        transfer = self.record("transfer", "200.00", 2, from_account=self.cash, to_account=self.bank)
+        self.record("expense", "80.00", 3, account=self.bank)
+        transfer.to_account, transfer.from_account = self.cash, self.bank
+        transfer.date_time = datetime.datetime(2025, 4, 1, tzinfo=datetime.timezone.utc)
+        transfer.save()
+        income.delete()
+
+        incremental = self.rollup_rows()
+        rebuild_rollups(self.user)
+        self.assertEqual(incremental, self.rollup_rows())
+        # Los buckets vaciados se eliminan
+        self.assertFalse(RecordRollup.objects.filter(user=self.user, count__lte=0).exists())
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import RecordSummaryView
+
+urlpatterns = [
+    path("summary/", RecordSummaryView.as_view(), name="record-summary"),
+]
@@ -0,0 +1,110 @@
+from django.db.models import F, Sum, Value
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema, inline_serializer
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from currencies.rates import conversion_factor
+
+from .models import RecordRollup
+from .rollups import period_start
+from .serializers import SummaryQuerySerializer, SummaryRowSerializer
+
+
+class RecordSummaryView(APIView):
+    """Resumen de registros del usuario autenticado.
+
+    - Agrupa los totales por período (`day`, `week` o `month`), por moneda y por
+      las dimensiones pedidas en `group_by` (`typeRecord`, `category`, `account`).
+    - Se responde desde los rollups pre-agregados, no desde los registros.
+    - `date_from`/`date_to` seleccionan los períodos que contienen esas fechas.
+    - Por cuenta (`group_by=account` o `account`), las transferencias cuentan
+      en la cuenta de origen y en la de destino, separadas por `direction`
+      ("out"/"in"); sin cuenta, cada registro cuenta una sola vez.
+    - Con `convert_to`, los totales se convierten a esa moneda con la tasa del
+      inicio de cada período (en el mismo query) y se suman entre monedas; los
+      buckets sin tasa se excluyen y sus monedas se listan en `missing_rates`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("period", OpenApiTypes.STR, enum=["day", "week", "month"]),
+            OpenApiParameter(
+                "group_by",
+                OpenApiTypes.STR,
+                description="Dimensiones separadas por coma: typeRecord, category, account.",
+            ),
+            OpenApiParameter("date_from", OpenApiTypes.DATE),
+            OpenApiParameter("date_to", OpenApiTypes.DATE),
+            OpenApiParameter(
+                "typeRecord",
+                OpenApiTypes.STR,
+                enum=["expense", "transfer", "income", "investment"],
+            ),
+            OpenApiParameter("account", OpenApiTypes.INT),
+            OpenApiParameter("category", OpenApiTypes.INT),
+            OpenApiParameter(
+                "convert_to",
+                OpenApiTypes.STR,
+                description="Moneda a la que convertir los totales (código ISO 4217).",
+            ),
+        ],
+        responses=inline_serializer(
+            "RecordSummary",
+            fields={
+                "period": serializers.CharField(),
+                "currency": serializers.CharField(required=False),
+                "missing_rates": serializers.ListField(
+                    child=serializers.CharField(), required=False
+                ),
+                "results": SummaryRowSerializer(many=True),
+            },
+        ),
+    )
+    def get(self, request):
+        params = SummaryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        period = query["period"]
+
+        rollups = RecordRollup.objects.filter(user=request.user, period=period)
+        if "date_from" in query:
+            rollups = rollups.filter(period_start__gte=period_start(query["date_from"], period))
+        if "date_to" in query:
+            rollups = rollups.filter(period_start__lte=query["date_to"])
+        for field in ("typeRecord", "account", "category"):
+            if field in query:
+                rollups = rollups.filter(**{field: query[field]})
+        by_account = "account" in query or "account" in query["group_by"]
+        if not by_account:
+            rollups = rollups.filter(direction="out")
+        group_by = [*query["group_by"], "direction"] if by_account else query["group_by"]
+
+        data = {"period": period}
+        if "convert_to" in query:
+            currency = query["convert_to"]
+            rollups = rollups.alias(
+                fx_factor=conversion_factor("currency", Value(currency), "period_start")
+            )
+            data["currency"] = currency
+            data["missing_rates"] = sorted(
+                set(
+                    rollups.filter(fx_factor__isnull=True).values_list("currency", flat=True)
+                )
+            )
+            rollups = rollups.filter(fx_factor__isnull=False)
+            dimensions = ["period_start", *group_by]
+            total = Sum(F("total") * F("fx_factor"))
+        else:
+            dimensions = ["period_start", *group_by, "currency"]
+            total = Sum("total")
+
+        rows = (
+            rollups.values(*dimensions)
+            .annotate(total=total, count=Sum("count"))
+            .order_by(*dimensions)
+        )
+        data["results"] = SummaryRowSerializer(rows, many=True).data
+        return Response(data)
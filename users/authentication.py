@@ -0,0 +1,112 @@
+"""Autenticación JWT con caché en proceso del usuario del token.
+
+`JWTAuthentication` lee la fila de `auth_user` en cada petición autenticada.
+`CachedJWTAuthentication` guarda los usuarios ya cargados en un LRU de
+`JWT_USER_CACHE_SIZE` entradas que viven `JWT_USER_CACHE_TTL` segundos. Las
+señales de `User` (users/signals.py) invalidan la entrada al guardar o borrar
+el usuario en este proceso; en los demás procesos un cambio (p. ej. una
+desactivación) tarda como mucho el TTL en verse. Con `CHECK_REVOKE_TOKEN`, un
+token cuyo hash de contraseña no coincide con el usuario en caché hace que se
+relea de la base, así que un token emitido tras un cambio de contraseña en otro
+proceso no se rechaza por un usuario desactualizado.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from money.metrics import count_cache
+
+
+class UserCache:
+    """LRU con TTL de usuarios por el id del token (`USER_ID_FIELD`), seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Cada petición recibe su propia copia: las vistas no comparten la instancia
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (
+                copy.copy(user),
+                time.monotonic() + settings.JWT_USER_CACHE_TTL,
+            )
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.JWT_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """`JWTAuthentication` que sirve el usuario del token desde `user_cache`."""
+
+    def get_user(self, validated_token):
+        if settings.JWT_USER_CACHE_TTL <= 0:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        # El claim puede venir como str o int según la versión de simplejwt
+        user_id = str(user_id)
+        user = user_cache.get(user_id)
+        count_cache("jwt_user", user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        # Mismas comprobaciones que `JWTAuthentication.get_user`, sobre el usuario en caché
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            # Puede ser un token emitido tras un cambio de contraseña hecho en otro
+            # proceso: se relee el usuario antes de rechazarlo
+            user_cache.invalidate(user_id)
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Documenta `CachedJWTAuthentication` en el esquema OpenAPI igual que `JWTAuthentication`."""
+
+    target_class = CachedJWTAuthentication
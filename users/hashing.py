@@ -0,0 +1,83 @@
+"""Pool acotado para el hashing de contraseñas de los endpoints async de auth.
+
+PBKDF2, scrypt y Argon2 liberan el GIL mientras calculan, así que un pool de
+hilos reparte el trabajo entre núcleos sin bloquear el event loop del worker
+ASGI. El pool tiene `AUTH_HASHING_WORKERS` hilos y admite como mucho
+`AUTH_HASHING_MAX_PENDING` operaciones en curso o en cola; por encima de eso
+se rechaza la petición (`HashingPoolFull`) en lugar de acumular latencia.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+
+
+class HashingPoolFull(Exception):
+    """El pool de hashing tiene todas sus plazas ocupadas."""
+
+
+class HashingPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._slots = threading.BoundedSemaphore(settings.AUTH_HASHING_MAX_PENDING)
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.AUTH_HASHING_WORKERS,
+                        thread_name_prefix="auth-hashing",
+                    )
+
+    async def run(self, func, *args):
+        """Ejecuta `func(*args)` en el pool y espera el resultado sin bloquear el event loop."""
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+        finally:
+            self._slots.release()
+
+
+hashing_pool = HashingPool()
+
+
+async def amake_password(raw_password):
+    return await hashing_pool.run(make_password, raw_password)
+
+
+async def acheck_password(raw_password, encoded):
+    """Verifica `raw_password` contra `encoded`.
+
+    Devuelve `(válida, nuevo_hash)`; `nuevo_hash` no es None cuando el hash
+    guardado usa otro hasher o parámetros desactualizados y hay que rehacerlo
+    (equivale a la actualización que hace `User.check_password`).
+    """
+    if not encoded:
+        # Igualar el tiempo de respuesta con el de un usuario existente
+        await amake_password(raw_password)
+        return False, None
+    valid = await hashing_pool.run(check_password, raw_password, encoded)
+    if not valid:
+        return False, None
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return True, None
+    if hasher.algorithm != get_hasher("default").algorithm or hasher.must_update(encoded):
+        return True, await amake_password(raw_password)
+    return True, None
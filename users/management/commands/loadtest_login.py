@@ -0,0 +1,96 @@
+"""Prueba de carga del login (`POST /api/token/`) contra un servidor en marcha.
+
+Lanza `--requests` logins con `--concurrency` clientes simultáneos y reporta
+el throughput total, el throughput por núcleo del servidor (`--cores`) y la
+latencia. Sirve para comparar configuraciones, p. ej.:
+
+    gunicorn --workers 4 money.wsgi:application
+    AUTH_ASYNC_ENDPOINTS=True uvicorn --workers 4 money.asgi:application
+    PASSWORD_HASHER=argon2 ...
+
+Con `--create-user` crea (o resetea) el usuario de prueba en la base de datos
+configurada, que debe ser la misma que usa el servidor.
+"""
+
+import json
+import os
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+
+def login(url, body):
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            status = response.status
+            response.read()
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Mide el throughput del login (logins/s y logins/s por núcleo) contra un servidor en marcha."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/token/")
+        parser.add_argument("--username", default="loadtest")
+        parser.add_argument("--password", default="Load-test-password-1")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--cores",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Núcleos disponibles para el servidor (por defecto, los de esta máquina).",
+        )
+        parser.add_argument(
+            "--create-user",
+            action="store_true",
+            help="Crear o resetear el usuario de prueba antes de medir.",
+        )
+
+    def handle(self, *args, **options):
+        if options["create_user"]:
+            User = get_user_model()
+            user, _ = User.objects.get_or_create(username=options["username"])
+            user.set_password(options["password"])
+            user.is_active = True
+            user.save()
+
+        body = json.dumps(
+            {"username": options["username"], "password": options["password"]}
+        ).encode()
+        # Un login previo para descartar errores de configuración antes de medir
+        status, _ = login(options["url"], body)
+        if status != 200:
+            raise CommandError(f"El login de prueba respondió {status}; revisa --url y el usuario.")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(lambda _: login(options["url"], body), range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for status, latency in results if status == 200)
+        errors = len(results) - len(latencies)
+        throughput = len(latencies) / elapsed
+        self.stdout.write(f"logins OK:        {len(latencies)} ({errors} errores)")
+        self.stdout.write(f"duración:         {elapsed:.2f}s")
+        self.stdout.write(f"logins/s:         {throughput:.1f}")
+        self.stdout.write(f"logins/s/núcleo:  {throughput / options['cores']:.1f} ({options['cores']} núcleos)")
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"latencia:         p50={statistics.median(latencies) * 1000:.0f}ms p95={p95 * 1000:.0f}ms"
+            )
@@ -0,0 +1,75 @@
+"""Borra en lotes los tokens expirados de la blacklist de simplejwt.
+
+A diferencia de `flushexpiredtokens` (un solo DELETE sobre toda la tabla,
+que bloquea y genera una transacción enorme con millones de filas), recorre
+`token_blacklist_outstandingtoken` por PK en lotes de `--batch-size` y en
+cada lote borra, en su propia transacción, los tokens expirados y sus
+entradas en la blacklist. Pensado para ejecutarse de forma programada (cron).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+class Command(BaseCommand):
+    help = "Borra en lotes los tokens outstanding/blacklisted ya expirados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Segundos de pausa entre lotes, para no saturar la base.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Solo contar lo que se borraría."
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options["batch_size"]
+        last_id = 0
+        outstanding = blacklisted = 0
+        start = time.perf_counter()
+
+        while True:
+            rows = list(
+                OutstandingToken.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "expires_at")[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            expired = [token_id for token_id, expires_at in rows if expires_at <= now]
+            if not expired:
+                continue
+
+            if options["dry_run"]:
+                outstanding += len(expired)
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=expired).count()
+            else:
+                with transaction.atomic():
+                    # El CASCADE hacia BlacklistedToken se resuelve con un DELETE directo
+                    _, deleted = OutstandingToken.objects.filter(id__in=expired).delete()
+                outstanding += deleted.get(OutstandingToken._meta.label, 0)
+                blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = time.perf_counter() - start
+        verb = "Se borrarían" if options["dry_run"] else "Borrados"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {outstanding} tokens outstanding y {blacklisted} blacklisted "
+                f"en {elapsed:.1f}s."
+            )
+        )
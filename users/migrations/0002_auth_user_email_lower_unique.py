@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# `auth_user` pertenece a django.contrib.auth, así que el índice se crea con SQL.
+# Es parcial: los usuarios creados sin email (p. ej. por createsuperuser) tienen "".
+INDEX_NAME = "auth_user_email_lower_uniq"
+
+
+def check_duplicate_emails(apps, schema_editor):
+    User = apps.get_model("auth", "User")
+    duplicates = list(
+        User.objects.exclude(email="")
+        .values(email_lower=Lower("email"))
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values_list("email_lower", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Hay usuarios con el mismo email (sin distinguir mayúsculas); "
+            f"corrígelos antes de migrar: {', '.join(duplicates)}"
+        )
+
+
+def create_index(apps, schema_editor):
+    # CONCURRENTLY no bloquea las escrituras en auth_user mientras se construye
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(
+        f"CREATE UNIQUE INDEX {concurrently}IF NOT EXISTS {INDEX_NAME} "
+        "ON auth_user (LOWER(email)) WHERE email <> ''"
+    )
+
+
+def drop_index(apps, schema_editor):
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,3 +1,18 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class DataVersion(models.Model):
+    """Versión de los datos de un usuario (cuentas, categorías y registros).
+
+    Se incrementa con cada escritura de esos datos y se usa para derivar ETags
+    y claves de caché sin tener que leer los datos.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="data_version"
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} v{self.version}"
@@ -0,0 +1,51 @@
+"""Datos iniciales de un usuario recién registrado.
+
+Las cuentas y categorías por defecto se definen en `settings.DEFAULT_ACCOUNTS`
+y `settings.DEFAULT_CATEGORIES` y se crean en una sola transacción con
+inserciones masivas, así que el costo del registro no depende de cuántas haya.
+`ignore_conflicts` hace que provisionar dos veces al mismo usuario no falle
+ni duplique nada (ambos modelos son únicos por `(user, name)`).
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from accounts.models import Account, AccountBalance, get_default_currency
+from categories.models import Category
+
+
+def provision_user(user):
+    """Crea las cuentas (con su balance materializado) y categorías por defecto de `user`."""
+    accounts = [
+        Account(
+            user=user,
+            name=account["name"],
+            description=account.get("description", ""),
+            currency_id=account.get("currency") or get_default_currency(),
+        )
+        for account in settings.DEFAULT_ACCOUNTS
+    ]
+    categories = [
+        Category(
+            user=user,
+            name=category["name"],
+            description=category.get("description", ""),
+            is_default=True,
+        )
+        for category in settings.DEFAULT_CATEGORIES
+    ]
+
+    # Sin savepoint: dentro del registro ya hay una transacción que lo envuelve todo
+    with transaction.atomic(savepoint=False):
+        if accounts:
+            Account.objects.bulk_create(accounts, ignore_conflicts=True)
+            # Con `ignore_conflicts` no se devuelven las PKs; se leen en un solo query
+            account_ids = Account.objects.filter(
+                user=user, name__in=[account.name for account in accounts]
+            ).values_list("pk", flat=True)
+            AccountBalance.objects.bulk_create(
+                [AccountBalance(account_id=account_id) for account_id in account_ids],
+                ignore_conflicts=True,
+            )
+        if categories:
+            Category.objects.bulk_create(categories, ignore_conflicts=True)
@@ -1,3 +1,5 @@
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import User
@@ -25,8 +27,15 @@ class UserSerializer(serializers.ModelSerializer):
         return data
 
     def validate_email(self, value):
-        # Validate that the email is not already in use
-        if User.objects.filter(email=value).exists():
+        # Validate that the email is not already in use (case-insensitive).
+        # Compares LOWER(email) and excludes "" so the lookup matches the
+        # predicate of the partial index auth_user_email_lower_uniq.
+        if (
+            User.objects.alias(email_lower=Lower("email"))
+            .filter(email_lower=value.lower())
+            .exclude(email="")
+            .exists()
+        ):
             raise serializers.ValidationError(
                 "This email is already in use."
             )
@@ -39,6 +48,20 @@ class UserSerializer(serializers.ModelSerializer):
             first_name=validated_data['first_name'],
             last_name=validated_data['last_name'],
         )
-        user.set_password(validated_data['password'])
-        user.save()
+        # The async signup view hashes the password in the hashing pool beforehand
+        if validated_data.get('password_hash'):
+            user.password = validated_data['password_hash']
+        else:
+            user.set_password(validated_data['password'])
+        # El usuario y sus datos por defecto (users.provisioning) se crean juntos
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Otro registro concurrente ganó la carrera entre la validación y el INSERT
+            if User.objects.filter(username=user.username).exists():
+                raise serializers.ValidationError(
+                    {"username": ["A user with that username already exists."]}
+                )
+            raise serializers.ValidationError({"email": ["This email is already in use."]})
         return user
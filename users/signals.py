@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from accounts.models import Account
+from categories.models import Category
+from records.signals import records_changed
+
+from .authentication import user_cache
+from .provisioning import provision_user
+from .tokens import blacklist_filter
+from .versions import bump_data_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User, weak=False)
+def provision_new_user(sender, instance, created, raw=False, **kwargs):
+    # `raw`: al cargar fixtures los datos del usuario vienen en el propio fixture
+    if created and not raw:
+        provision_user(instance)
+
+
+@receiver(post_save, sender=Account, weak=False)
+@receiver(post_delete, sender=Account, weak=False)
+@receiver(post_save, sender=Category, weak=False)
+@receiver(post_delete, sender=Category, weak=False)
+def bump_owner_data_version(sender, instance, **kwargs):
+    bump_data_version([instance.user_id])
+
+
+@receiver(post_save, sender=User, weak=False)
+def bump_user_data_version(sender, instance, created, **kwargs):
+    # Las respuestas incluyen el username del usuario
+    if not created:
+        bump_data_version([instance.pk])
+
+
+@receiver(records_changed, weak=False)
+def bump_records_data_version(sender, changes, **kwargs):
+    bump_data_version(
+        record.user_id
+        for change in changes
+        for record in change
+        if record is not None
+    )
+
+
+@receiver(post_save, sender=User, weak=False)
+@receiver(post_delete, sender=User, weak=False)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Desactivaciones, cambios de contraseña o de username dejan de servirse desde caché
+    user_cache.invalidate(str(getattr(instance, jwt_settings.USER_ID_FIELD)))
+
+
+@receiver(post_save, sender=BlacklistedToken, weak=False)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    if created:
+        blacklist_filter.add(instance.token.jti)
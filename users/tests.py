@@ -1,3 +1,411 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import threading
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.models import Account, AccountBalance
+from categories.models import Category
+from currencies.models import Currency
+from currencies.registry import currency_registry
+
+from .authentication import CachedJWTAuthentication, api_settings as jwt_settings, user_cache
+from .hashing import HashingPool
+from .provisioning import provision_user
+from .serializers import UserSerializer
+from .tokens import blacklist_filter
+from .views import signup_async, token_obtain_async
+
+
+class SignupTestCase(TestCase):
+    PASSWORD = "Tr3s-tristes-tigres"
+
+    @classmethod
+    def setUpTestData(cls):
+        for code, name, numeric_code in (("COP", "Peso colombiano", "170"), ("USD", "Dólar", "840")):
+            Currency.objects.get_or_create(
+                code=code, defaults={"name": name, "numeric_code": numeric_code}
+            )
+        currency_registry.invalidate()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def payload(self, username="nuevo", **fields):
+        return {
+            "username": username,
+            "email": f"{username}@example.com",
+            "first_name": "Nuevo",
+            "last_name": "Usuario",
+            "password": self.PASSWORD,
+            "confirm_password": self.PASSWORD,
+            **fields,
+        }
+
+    def signup(self, **fields):
+        return self.client.post("/api/auth/signup/", self.payload(**fields), format="json")
+
+
+@override_settings(
+    DEFAULT_ACCOUNTS=[
+        {"name": "Cash", "description": "Cuenta de efectivo"},
+        {"name": "Dólares", "currency": "USD"},
+    ],
+    DEFAULT_CATEGORIES=[
+        {"name": "Transporte", "description": "Categoría para gastos en transporte"},
+        {"name": "Salud"},
+    ],
+)
+class ProvisioningTests(SignupTestCase):
+    def test_signup_creates_default_accounts_and_categories(self):
+        self.assertEqual(self.signup().status_code, 201)
+        user = User.objects.get(username="nuevo")
+
+        accounts = {account.name: account for account in Account.objects.filter(user=user)}
+        self.assertEqual(set(accounts), {"Cash", "Dólares"})
+        self.assertEqual(accounts["Cash"].currency_id, "COP")
+        self.assertEqual(accounts["Dólares"].currency_id, "USD")
+        # `bulk_create` no envía `post_save`: los balances se crean explícitamente
+        self.assertEqual(
+            set(AccountBalance.objects.filter(account__user=user).values_list("account_id", "balance")),
+            {(account.pk, 0) for account in accounts.values()},
+        )
+
+        categories = Category.objects.filter(user=user)
+        self.assertEqual(set(categories.values_list("name", flat=True)), {"Transporte", "Salud"})
+        self.assertTrue(all(category.is_default for category in categories))
+
+    def test_provisioning_twice_duplicates_nothing(self):
+        self.assertEqual(self.signup().status_code, 201)
+        user = User.objects.get(username="nuevo")
+        provision_user(user)
+
+        self.assertEqual(Account.objects.filter(user=user).count(), 2)
+        self.assertEqual(AccountBalance.objects.filter(account__user=user).count(), 2)
+        self.assertEqual(Category.objects.filter(user=user).count(), 2)
+
+    def test_failed_provisioning_rolls_back_the_signup(self):
+        with mock.patch.object(Category.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.signup()
+
+        self.assertFalse(User.objects.filter(username="nuevo").exists())
+        self.assertFalse(Account.objects.filter(user__username="nuevo").exists())
+
+
+class DuplicateEmailTests(SignupTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # El índice lo crea una migración con SQL; sin migraciones no existiría
+        index_name = import_module("users.migrations.0002_auth_user_email_lower_unique").INDEX_NAME
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} "
+                "ON auth_user (LOWER(email)) WHERE email <> ''"
+            )
+
+    def test_email_differing_in_case_is_rejected(self):
+        self.assertEqual(self.signup(username="primero", email="a@x.com").status_code, 201)
+
+        response = self.signup(username="segundo", email="A@x.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.json())
+        self.assertFalse(User.objects.filter(username="segundo").exists())
+
+    def test_concurrent_signup_with_same_email_is_rejected(self):
+        self.assertEqual(self.signup(username="primero", email="a@x.com").status_code, 201)
+
+        # Como si el otro registro se confirmara entre la validación y el INSERT
+        with mock.patch.object(UserSerializer, "validate_email", lambda self, value: value):
+            response = self.signup(username="segundo", email="A@x.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"email": ["This email is already in use."]})
+        self.assertFalse(User.objects.filter(username="segundo").exists())
+
+
+class AsyncAuthTests(SignupTestCase):
+    """`signup_async` y `token_obtain_async` responden igual que las vistas síncronas."""
+
+    def call_async(self, view, path, body):
+        request = AsyncRequestFactory().post(
+            path, data=json.dumps(body), content_type="application/json"
+        )
+        response = async_to_sync(view)(request)
+        return response.status_code, json.loads(response.content)
+
+    def call_sync(self, path, body):
+        response = self.client.post(path, body, format="json")
+        return response.status_code, response.json()
+
+    def signup_both(self, **fields):
+        return (
+            self.call_sync("/api/auth/signup/", self.payload(username="sync", **fields)),
+            self.call_async(signup_async, "/api/auth/signup/", self.payload(username="async", **fields)),
+        )
+
+    def login_both(self, body):
+        return (
+            self.call_sync("/api/token/", body),
+            self.call_async(token_obtain_async, "/api/token/", body),
+        )
+
+    def test_signup_matches_sync_endpoint(self):
+        sync, async_ = self.signup_both()
+        self.assertEqual(sync[0], 201)
+        self.assertEqual(async_[0], 201)
+        self.assertEqual(sync[1] | {"username": "", "email": ""}, async_[1] | {"username": "", "email": ""})
+
+        user = User.objects.get(username="async")
+        self.assertTrue(user.check_password(self.PASSWORD))
+        self.assertTrue(Account.objects.filter(user=user).exists())
+
+    def test_signup_errors_match_sync_endpoint(self):
+        cases = {
+            "mismatch": {"confirm_password": "otra-cosa-distinta"},
+            "weak": {"password": "123", "confirm_password": "123"},
+            "missing": {"email": ""},
+        }
+        for name, fields in cases.items():
+            with self.subTest(name):
+                sync, async_ = self.signup_both(**fields)
+                self.assertEqual(sync[0], 400)
+                self.assertEqual(async_, sync)
+
+        User.objects.create_user("taken", email="taken@example.com", password="x")
+        sync = self.call_sync("/api/auth/signup/", self.payload(username="taken"))
+        async_ = self.call_async(signup_async, "/api/auth/signup/", self.payload(username="taken"))
+        self.assertEqual(sync[0], 400)
+        self.assertEqual(async_, sync)
+
+    def test_login_matches_sync_endpoint(self):
+        User.objects.create_user("login", password=self.PASSWORD)
+
+        sync, async_ = self.login_both({"username": "login", "password": self.PASSWORD})
+        self.assertEqual((sync[0], async_[0]), (200, 200))
+        self.assertEqual(set(async_[1]), set(sync[1]))
+
+        for body in (
+            {"username": "login", "password": "incorrecta"},
+            {"username": "nadie", "password": self.PASSWORD},
+            {"username": "login"},
+        ):
+            with self.subTest(body=body):
+                sync, async_ = self.login_both(body)
+                self.assertIn(sync[0], (400, 401))
+                self.assertEqual(async_, sync)
+
+    def test_inactive_user_cannot_log_in(self):
+        User.objects.create_user("inactive", password=self.PASSWORD, is_active=False)
+        sync, async_ = self.login_both({"username": "inactive", "password": self.PASSWORD})
+        self.assertEqual(sync[0], 401)
+        self.assertEqual(async_, sync)
+
+    def test_login_rehashes_password_from_older_hasher(self):
+        user = User.objects.create_user("legacy")
+        user.password = make_password(self.PASSWORD, hasher="pbkdf2_sha1")
+        user.save(update_fields=["password"])
+
+        status, tokens = self.call_async(
+            token_obtain_async, "/api/token/", {"username": "legacy", "password": self.PASSWORD}
+        )
+        self.assertEqual(status, 200)
+        self.assertIn("access", tokens)
+
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, "pbkdf2_sha256")
+        self.assertTrue(user.check_password(self.PASSWORD))
+
+    @override_settings(AUTH_HASHING_WORKERS=1, AUTH_HASHING_MAX_PENDING=1)
+    def test_saturated_pool_returns_503(self):
+        pool = HashingPool()
+        patcher = mock.patch("users.hashing.hashing_pool", pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        User.objects.create_user("login", password=self.PASSWORD)
+        release = threading.Event()
+
+        async def scenario():
+            # Ocupa la única plaza del pool hasta que termine la prueba
+            busy = asyncio.ensure_future(pool.run(release.wait, 5))
+            await asyncio.sleep(0)
+            try:
+                responses = []
+                for view, path, body in (
+                    (signup_async, "/api/auth/signup/", self.payload()),
+                    (token_obtain_async, "/api/token/", {"username": "login", "password": self.PASSWORD}),
+                ):
+                    request = AsyncRequestFactory().post(
+                        path, data=json.dumps(body), content_type="application/json"
+                    )
+                    responses.append(await view(request))
+                return responses
+            finally:
+                release.set()
+                await busy
+                pool._executor.shutdown()
+
+        for response in async_to_sync(scenario)():
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(User.objects.filter(username="nuevo").exists())
+
+
+@override_settings(TOKEN_BLACKLIST_BLOOM=True, TOKEN_BLACKLIST_BLOOM_REFRESH=0)
+class BlacklistFilterTests(TestCase):
+    """Un refresh token revocado se rechaza aunque el filtro de Bloom esté activo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("tokens", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        blacklist_filter.reset()
+        self.addCleanup(blacklist_filter.reset)
+
+    def refresh(self, token):
+        return self.client.post("/api/token/refresh/", {"refresh": str(token)}, format="json")
+
+    def blacklist_elsewhere(self, token, **fields):
+        # Sin `post_save`: como si lo añadiera a la blacklist otro proceso
+        outstanding = OutstandingToken.objects.get(jti=token["jti"])
+        return BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=outstanding, **fields)]
+        )[0]
+
+    def test_revoked_token_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        response = self.client.post(
+            "/api/token/blacklist/", {"refresh": str(token)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_token_blacklisted_by_another_process_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        self.blacklist_elsewhere(token)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_late_commit_with_lower_id_is_rejected(self):
+        late, other, probe = (RefreshToken.for_user(self.user) for _ in range(3))
+        self.blacklist_elsewhere(other, id=100)
+        # El filtro ya leyó el id 100
+        self.assertEqual(self.refresh(probe).status_code, 200)
+
+        # Una transacción que empezó antes (id y `blacklisted_at` menores) hace commit ahora
+        blacklisted = self.blacklist_elsewhere(late, id=50)
+        BlacklistedToken.objects.filter(pk=blacklisted.pk).update(
+            blacklisted_at=timezone.now() - datetime.timedelta(seconds=5)
+        )
+        self.assertEqual(self.refresh(late).status_code, 401)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """El usuario en caché no oculta desactivaciones ni cambios de contraseña."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.get_or_create(
+            code="COP", defaults={"name": "Peso colombiano", "numeric_code": "170"}
+        )
+        currency_registry.invalidate()
+        cls.user = User.objects.create_user("cached", password="x")
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+
+    def get(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client.get("/api/accounts/")
+
+    def cached_user(self):
+        return user_cache.get(str(self.user.pk))
+
+    def test_user_is_served_from_cache(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.get(token).status_code, 200)
+        self.assertIsNotNone(self.cached_user())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedJWTAuthentication().get_user(token).pk, self.user.pk
+            )
+
+    def test_save_and_delete_evict_the_entry(self):
+        token = AccessToken.for_user(self.user)
+        self.get(token)
+        self.user.first_name = "Otro"
+        self.user.save()
+        self.assertIsNone(self.cached_user())
+
+        self.get(token)
+        self.assertIsNotNone(self.cached_user())
+        self.user.delete()
+        self.assertIsNone(self.cached_user())
+        self.assertEqual(self.get(token).status_code, 401)
+
+    def test_deactivated_user_is_rejected_on_next_request(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.get(token).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(token).status_code, 401)
+
+    def test_inactive_cached_user_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        inactive = User.objects.get(pk=self.user.pk)
+        inactive.is_active = False
+        user_cache.set(str(self.user.pk), inactive)
+
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["code"], "user_inactive")
+
+    @mock.patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_change_revokes_tokens(self):
+        old = AccessToken.for_user(self.user)
+        self.assertEqual(self.get(old).status_code, 200)
+
+        self.user.set_password("nueva")
+        self.user.save()
+        self.assertEqual(self.get(old).status_code, 401)
+        self.assertEqual(self.get(AccessToken.for_user(self.user)).status_code, 200)
+
+    @mock.patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_changed_in_another_process(self):
+        old = AccessToken.for_user(self.user)
+        self.assertEqual(self.get(old).status_code, 200)
+
+        # Sin señales: la entrada de este proceso sigue con la contraseña anterior
+        User.objects.filter(pk=self.user.pk).update(password=make_password("nueva"))
+        self.assertIsNotNone(self.cached_user())
+
+        new = AccessToken.for_user(User.objects.get(pk=self.user.pk))
+        self.assertEqual(self.get(new).status_code, 200)
+        # La relectura reemplazó la entrada: el token anterior ya no pasa
+        response = self.get(old)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["code"], "password_changed")
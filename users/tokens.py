@@ -0,0 +1,158 @@
+"""Refresh tokens con un filtro de Bloom opcional delante de la blacklist.
+
+`TokenRefreshView` y `TokenBlacklistView` comprueban en cada llamada si el
+refresh token está en `token_blacklist_blacklistedtoken`. Con
+`TOKEN_BLACKLIST_BLOOM = True`, cada proceso mantiene un filtro de Bloom con
+los `jti` de los tokens en la blacklist: si el `jti` no está en el filtro, el
+token seguro que no está en la blacklist y se evita la consulta; si está (o es
+un falso positivo, con probabilidad `TOKEN_BLACKLIST_BLOOM_ERROR_RATE`) se
+consulta la base como siempre.
+
+El filtro se construye la primera vez que se usa y se pone al día cada
+`TOKEN_BLACKLIST_BLOOM_REFRESH` segundos leyendo los tokens con
+`blacklisted_at` desde la última lectura menos `TOKEN_BLACKLIST_BLOOM_OVERLAP`
+segundos. No basta con leer los ids mayores que el último visto: una
+transacción que obtuvo un id menor puede hacer commit después, y ese token no
+entraría nunca al filtro. El margen debe superar la duración de la transacción
+más larga que añade tokens a la blacklist. Los que se añaden en el propio
+proceso entran al momento (users/signals.py); los de otros procesos, como
+mucho en el intervalo de refresco.
+"""
+
+import datetime
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer as BaseTokenBlacklistSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """Filtro de Bloom de tamaño fijo sobre strings (doble hashing con BLAKE2b)."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class BlacklistFilter:
+    """Filtro de Bloom de la blacklist de este proceso, con puesta al día incremental."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._loaded_at = None
+        # id -> blacklisted_at de los tokens ya añadidos dentro del margen de solape
+        self._recent = {}
+        self._refreshed_at = 0.0
+
+    def _rebuild(self):
+        tokens = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        capacity = max(settings.TOKEN_BLACKLIST_BLOOM_CAPACITY, tokens.count() * 2)
+        self._bloom = BloomFilter(capacity, settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE)
+        self._loaded_at = None
+        self._recent = {}
+        self._load(tokens)
+
+    def _load(self, tokens):
+        now = timezone.now()
+        overlap = datetime.timedelta(seconds=settings.TOKEN_BLACKLIST_BLOOM_OVERLAP)
+        if self._loaded_at is not None:
+            # Se vuelve a leer el margen: incluye los commits tardíos con id menor
+            tokens = tokens.filter(blacklisted_at__gte=self._loaded_at - overlap)
+        window_start = now - overlap
+        recent = {
+            token_id: blacklisted_at
+            for token_id, blacklisted_at in self._recent.items()
+            if blacklisted_at >= window_start
+        }
+        rows = tokens.values_list("id", "token__jti", "blacklisted_at").iterator(
+            chunk_size=10000
+        )
+        for token_id, jti, blacklisted_at in rows:
+            if token_id in self._recent:
+                continue
+            self._bloom.add(jti)
+            if blacklisted_at >= window_start:
+                recent[token_id] = blacklisted_at
+        self._recent = recent
+        self._loaded_at = now
+
+    def _refresh(self):
+        if self._bloom is None or self._bloom.count >= self._bloom.capacity:
+            self._rebuild()
+        else:
+            self._load(BlacklistedToken.objects.all())
+        self._refreshed_at = time.monotonic()
+
+    def might_contain(self, jti):
+        """False si `jti` seguro que no está en la blacklist."""
+        with self._lock:
+            stale = time.monotonic() - self._refreshed_at >= settings.TOKEN_BLACKLIST_BLOOM_REFRESH
+            if self._bloom is None or stale:
+                self._refresh()
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._loaded_at = None
+            self._recent = {}
+            self._refreshed_at = 0.0
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """`RefreshToken` que consulta el filtro de Bloom antes que la tabla de blacklist."""
+
+    def check_blacklist(self):
+        if settings.TOKEN_BLACKLIST_BLOOM and not blacklist_filter.might_contain(
+            self.payload[api_settings.JTI_CLAIM]
+        ):
+            return
+        super().check_blacklist()
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
+class TokenBlacklistSerializer(BaseTokenBlacklistSerializer):
+    token_class = FilteredRefreshToken
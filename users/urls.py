@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from .views import UserCreateView
+from .views import UserCreateView, signup_async
 
 urlpatterns = [
-    path("signup/", UserCreateView.as_view(), name="user-register"),
+    path(
+        "signup/",
+        signup_async if settings.AUTH_ASYNC_ENDPOINTS else UserCreateView.as_view(),
+        name="user-register",
+    ),
 ]
@@ -0,0 +1,23 @@
+from django.db.models import F
+
+from .models import DataVersion
+
+
+def get_data_version(user):
+    """Versión actual de los datos de `user` (crea el contador si no existe)."""
+    data_version, _ = DataVersion.objects.get_or_create(user=user)
+    return data_version.version
+
+
+def bump_data_version(user_ids):
+    """Incrementa la versión de datos de los usuarios indicados.
+
+    Solo actualiza contadores existentes: un usuario sin contador no tiene
+    ETags emitidos que invalidar, y así no se crean filas para usuarios que
+    se están borrando en cascada.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        DataVersion.objects.filter(user_id__in=sorted(user_ids)).update(
+            version=F("version") + 1
+        )
@@ -1,10 +1,117 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import permissions
 from rest_framework import generics
+from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from users.hashing import HashingPoolFull, acheck_password, amake_password
 from users.serializers import UserSerializer
-from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
 
 class UserCreateView(generics.CreateAPIView):
     serializer_class = UserSerializer
     permission_classes = [
         permissions.AllowAny,
-    ]
\ No newline at end of file
+    ]
+
+
+# Async versions of signup and token obtain, enabled with AUTH_ASYNC_ENDPOINTS.
+# Meant to run under ASGI (money/asgi.py): the password hashing goes to the
+# bounded pool in users.hashing and the worker keeps serving other requests.
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _bad_request(detail="JSON parse error."):
+    return JsonResponse({"detail": detail}, status=400)
+
+
+def _busy():
+    response = JsonResponse(
+        {"detail": "Authentication service busy, try again."}, status=503
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def signup_async(request):
+    """Same contract as `UserCreateView`, hashing the password outside the event loop."""
+    data = _json_body(request)
+    if data is None:
+        return _bad_request()
+
+    serializer = UserSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        password_hash = await amake_password(serializer.validated_data["password"])
+    except HashingPoolFull:
+        return _busy()
+
+    try:
+        await sync_to_async(serializer.save)(password_hash=password_hash)
+    except serializers.ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    return JsonResponse(serializer.data, status=201)
+
+
+def _issue_tokens(user):
+    refresh = TokenObtainPairSerializer.get_token(user)
+    if jwt_settings.UPDATE_LAST_LOGIN:
+        update_last_login(None, user)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+@csrf_exempt
+@require_POST
+async def token_obtain_async(request):
+    """Same contract as simplejwt's `TokenObtainPairView`, verifying the password in the hashing pool."""
+    data = _json_body(request)
+    if data is None:
+        return _bad_request()
+
+    missing = {
+        field: ["This field is required."]
+        for field in (User.USERNAME_FIELD, "password")
+        if not data.get(field)
+    }
+    if missing:
+        return JsonResponse(missing, status=400)
+
+    user = await User._default_manager.filter(
+        **{User.USERNAME_FIELD: data[User.USERNAME_FIELD]}
+    ).afirst()
+    # An unknown or inactive user still pays for one hash (same as ModelBackend)
+    encoded = user.password if user is not None and user.is_active else ""
+
+    try:
+        valid, new_hash = await acheck_password(data["password"], encoded)
+    except HashingPoolFull:
+        return _busy()
+    if not valid:
+        return JsonResponse(
+            {"detail": "No active account found with the given credentials"},
+            status=401,
+        )
+
+    if new_hash:
+        user.password = new_hash
+        await user.asave(update_fields=["password"])
+    return JsonResponse(await sync_to_async(_issue_tokens)(user))